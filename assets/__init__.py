@@ -0,0 +1,5 @@
+"""Front-end asset build for the Husky Interview Prep app.
+
+`python -m assets.build` compiles the Tailwind CSS used by the templates, vendors Alpine.js, Font
+Awesome and the Inter font, and writes content-hashed files plus a manifest to static/dist/.
+"""
@@ -0,0 +1,178 @@
+"""Build self-hosted, fingerprinted front-end assets into static/dist/.
+
+    python -m assets.build                  # needs the Tailwind CLI and network access for the vendored files
+    python -m assets.build --tailwind ./tailwindcss-linux-x64
+
+Outputs, each named <stem>.<content hash><ext> so they can be cached forever:
+
+    app.css          Tailwind, purged to the classes used in templates/ and minified
+    alpine.js        Alpine.js, pinned
+    fontawesome.css  Font Awesome, reduced to the icons used in templates/, woff2 fonts only
+    inter.css        the Inter font from Google Fonts, woff2 files included
+
+CSS and JS also get .gz and (with the optional `brotli` package) .br variants, which the app serves
+to clients that accept them. manifest.json maps each logical name to its hashed file name.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from urllib.parse import urljoin
+
+import requests
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ASSETS_DIR = os.path.join(ROOT, "assets")
+TEMPLATES_DIR = os.path.join(ROOT, "templates")
+OUTPUT_DIR = os.path.join(ROOT, "static", "dist")
+
+TAILWIND_VERSION = "3.4.17"
+ALPINE_URL = "https://cdn.jsdelivr.net/npm/alpinejs@3.14.1/dist/cdn.min.js"
+FONT_AWESOME_URL = "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css"
+INTER_URL = "https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap"
+# Google Fonts picks the font format from the User-Agent; this one gets woff2
+BROWSER_USER_AGENT = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                      "Chrome/124.0 Safari/537.36")
+
+COMPRESSIBLE = (".css", ".js", ".svg", ".json")
+_ICON_RULE = re.compile(r"((?:\.fa-[\w-]+:(?::)?before,?)+)\{content:(\"[^\"]*\")\}")
+_ICON_NAME = re.compile(r"\bfa-[a-z0-9-]+")
+_TTF_SOURCE = re.compile(r",\s*url\([^)]*\.ttf\)\s*format\(\"truetype\"\)")
+_CSS_URL = re.compile(r"url\(\s*['\"]?([^'\")]+)['\"]?\s*\)")
+
+
+class AssetWriter:
+    """Writes fingerprinted files and their compressed variants, and records them in the manifest."""
+
+    def __init__(self, out_dir):
+        self.out_dir = out_dir
+        self.manifest = {}
+
+    def emit(self, name, data):
+        stem, ext = os.path.splitext(name)
+        filename = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{ext}"
+        path = os.path.join(self.out_dir, filename)
+        with open(path, "wb") as f:
+            f.write(data)
+        if ext in COMPRESSIBLE:
+            variants = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants[".br"] = brotli.compress(data, quality=11)
+            for suffix, compressed in variants.items():
+                if len(compressed) < len(data):
+                    with open(path + suffix, "wb") as f:
+                        f.write(compressed)
+        self.manifest[name] = filename
+        print(f"  {name:18} -> {filename} ({len(data) / 1024:.1f} KiB)")
+        return filename
+
+    def write_manifest(self):
+        with open(os.path.join(self.out_dir, "manifest.json"), "w") as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+
+
+def fetch(url, headers=None):
+    response = requests.get(url, headers=headers, timeout=30)
+    response.raise_for_status()
+    return response.content
+
+
+def tailwind_command(binary=None):
+    """The Tailwind CLI: --tailwind, TAILWIND_BIN, a tailwindcss on PATH, or the pinned npm package."""
+    binary = binary or os.getenv("TAILWIND_BIN") or shutil.which("tailwindcss")
+    if binary:
+        return [binary]
+    if shutil.which("npx"):
+        return ["npx", "--yes", f"tailwindcss@{TAILWIND_VERSION}"]
+    raise SystemExit("Tailwind CLI not found: install the standalone tailwindcss binary or Node.js (npx), "
+                     "or pass --tailwind")
+
+
+def build_tailwind(command):
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "app.css")
+        subprocess.run(command + ["-c", os.path.join(ASSETS_DIR, "tailwind.config.js"),
+                                  "-i", os.path.join(ASSETS_DIR, "app.css"), "-o", output, "--minify"],
+                       cwd=ROOT, check=True)
+        with open(output, "rb") as f:
+            return f.read()
+
+
+def used_icons():
+    """Font Awesome class names referenced anywhere in the templates."""
+    names = set()
+    for dirpath, _, filenames in os.walk(TEMPLATES_DIR):
+        for filename in filenames:
+            with open(os.path.join(dirpath, filename), encoding="utf-8") as f:
+                names.update(_ICON_NAME.findall(f.read()))
+    return names
+
+
+def purge_icons(css, keep):
+    """Drop the ~2000 icon rules whose class is not used; base, sizing and animation rules stay."""
+    def rule(match):
+        selectors = [s for s in match.group(1).split(",") if s and s.split(":")[0][1:] in keep]
+        return f"{','.join(selectors)}{{content:{match.group(2)}}}" if selectors else ""
+    return _ICON_RULE.sub(rule, css)
+
+
+def vendor_css(writer, css, base_url, headers=None):
+    """Download every url() a stylesheet references, emit it fingerprinted and point the CSS at it."""
+    emitted = {}
+
+    def replace(match):
+        ref = match.group(1)
+        if ref.startswith("data:"):
+            return match.group(0)
+        url = urljoin(base_url, ref)
+        if url not in emitted:
+            name = os.path.basename(url.split("?", 1)[0].split("#", 1)[0])
+            emitted[url] = writer.emit(name, fetch(url, headers))
+        return f"url({emitted[url]})"
+
+    return _CSS_URL.sub(replace, css)
+
+
+def build(out_dir=OUTPUT_DIR, tailwind=None):
+    # Old fingerprints are removed: the manifest is the only way files are referenced
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir)
+    writer = AssetWriter(out_dir)
+
+    writer.emit("app.css", build_tailwind(tailwind_command(tailwind)))
+    writer.emit("alpine.js", fetch(ALPINE_URL))
+
+    font_awesome = fetch(FONT_AWESOME_URL).decode("utf-8")
+    font_awesome = _TTF_SOURCE.sub("", purge_icons(font_awesome, used_icons()))
+    writer.emit("fontawesome.css", vendor_css(writer, font_awesome, FONT_AWESOME_URL).encode("utf-8"))
+
+    headers = {"User-Agent": BROWSER_USER_AGENT}
+    inter = fetch(INTER_URL, headers).decode("utf-8")
+    writer.emit("inter.css", vendor_css(writer, inter, INTER_URL, headers).encode("utf-8"))
+
+    writer.write_manifest()
+    return writer.manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build fingerprinted front-end assets into static/dist/.")
+    parser.add_argument("--tailwind", help="Path to the Tailwind CLI (default: TAILWIND_BIN, PATH, then npx)")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="Output directory (default: static/dist)")
+    args = parser.parse_args()
+    print(f"Building assets into {args.out}")
+    manifest = build(args.out, args.tailwind)
+    print(f"Wrote {len(manifest)} assets and manifest.json" + ("" if brotli else " (no brotli: pip install brotli)"))
+
+
+if __name__ == "__main__":
+    main()
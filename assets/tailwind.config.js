@@ -0,0 +1,9 @@
+// Tailwind v3 config for `python -m assets.build`. Only classes that appear in the templates are kept,
+// including the ones inside Alpine :class bindings, which are plain strings in the HTML.
+module.exports = {
+  content: ["./templates/**/*.html"],
+  theme: {
+    extend: {},
+  },
+  plugins: [],
+};
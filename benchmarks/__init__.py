@@ -0,0 +1,5 @@
+"""Benchmark and load-test tooling for the Husky Interview Prep app.
+
+Everything here runs against local stand-ins for Together, Google speech recognition and gTTS
+(see benchmarks.stubs), so results are deterministic and no API keys or network access are needed.
+"""
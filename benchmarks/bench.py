@@ -0,0 +1,340 @@
+"""Per-endpoint latency, throughput and memory benchmarks against local upstream stand-ins.
+
+    python -m benchmarks.bench run                       # in-process via Flask's test client
+    python -m benchmarks.bench run --mode http           # real HTTP against a served app
+    python -m benchmarks.bench run --llm-latency fixed:0 --requests 200 --concurrency 16
+    python -m benchmarks.bench compare base.json new.json --threshold 0.1
+
+Results are written as JSON (default benchmarks/results/<commit>-<mode>.json) so runs on two
+commits can be compared; compare exits non-zero when any endpoint regresses past the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks import fixtures
+from benchmarks.stubs import add_latency_arguments, load_app, start_stubs
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _analyze_info(i):
+    return {"json": {"job_desc": fixtures.variant(fixtures.JOB_DESC, i), "company_info": fixtures.COMPANY_INFO,
+                     "resume": fixtures.RESUME}}
+
+
+def _analyze_answer(i):
+    return {"json": {"question": fixtures.QUESTIONS[i % len(fixtures.QUESTIONS)],
+                     "answer_text": fixtures.variant(fixtures.ANSWERS[i % len(fixtures.ANSWERS)], i),
+                     "job_desc": fixtures.JOB_DESC, "company_values": "Customer obsession, ownership"}}
+
+
+def _generate_model_answer(i):
+    return {"json": {"question": fixtures.QUESTIONS[i % len(fixtures.QUESTIONS)],
+                     "answer_text": fixtures.variant(fixtures.ANSWERS[i % len(fixtures.ANSWERS)], i),
+                     "job_desc": fixtures.JOB_DESC, "company_info": fixtures.COMPANY_INFO,
+                     "resume": fixtures.RESUME}}
+
+
+def _speech_to_text(i):
+    return {"data": fixtures.speech_pcm(), "params": {"question": fixtures.QUESTIONS[i % len(fixtures.QUESTIONS)]},
+            "headers": {"Content-Type": f"audio/pcm;rate={fixtures.PCM_SAMPLE_RATE};channels=1"}}
+
+
+def _text_to_speech(i):
+    return {"json": {"text": fixtures.variant(fixtures.QUESTIONS[i % len(fixtures.QUESTIONS)], i),
+                     "voice_option": "US English"}}
+
+
+def _save_to_html(i):
+    return {"json": {"job_desc": fixtures.JOB_DESC, "company_info": fixtures.COMPANY_INFO, "resume": fixtures.RESUME,
+                     "company_values": "Customer obsession, ownership", "tech_skills": "Python, PostgreSQL",
+                     "soft_skills": "Communication", "job_duties": "Build services",
+                     "selected_question": fixtures.QUESTIONS[0], "answer_text": fixtures.ANSWERS[0],
+                     "feedback": "Clarity: 8/10\nRelevance: 7/10\nConfidence: 8/10",
+                     "model_answer": fixtures.ANSWERS[1], "follow_up_questions": fixtures.QUESTIONS[1:4]}}
+
+
+ENDPOINTS = {
+    "/analyze-info": _analyze_info,
+    "/analyze-answer": _analyze_answer,
+    "/generate-model-answer": _generate_model_answer,
+    "/speech-to-text": _speech_to_text,
+    "/text-to-speech": _text_to_speech,
+    "/save-to-html": _save_to_html,
+}
+
+
+def percentile(sorted_values, q):
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    pos = (len(sorted_values) - 1) * q
+    lower = int(pos)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (pos - lower)
+
+
+def rss_mb(pid=None):
+    """Current resident set size of a process in MiB (Linux /proc), or peak RSS of this process elsewhere."""
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    if pid is None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return None
+
+
+class InProcessTarget:
+    """Drives the app through Flask's test client; one client (and so one session) per thread."""
+    mode = "inprocess"
+
+    def __init__(self, app):
+        self.app = app
+        self._local = threading.local()
+
+    def send(self, path, spec):
+        if not hasattr(self._local, "client"):
+            self._local.client = self.app.test_client()
+        response = self._local.client.post(path, json=spec.get("json"), data=spec.get("data"),
+                                           query_string=spec.get("params"), headers=spec.get("headers"))
+        return response.status_code, response.headers
+
+    def rss(self):
+        return rss_mb()
+
+    def close(self):
+        pass
+
+
+class HttpTarget:
+    """Drives a served app over HTTP; one connection pool (and so one session) per thread."""
+    mode = "http"
+
+    def __init__(self, base_url, server=None):
+        import requests
+        self._requests = requests
+        self.base_url = base_url.rstrip("/")
+        self.server = server
+        self._local = threading.local()
+
+    def send(self, path, spec):
+        if not hasattr(self._local, "session"):
+            self._local.session = self._requests.Session()
+        response = self._local.session.post(self.base_url + path, json=spec.get("json"), data=spec.get("data"),
+                                            params=spec.get("params"), headers=spec.get("headers"), timeout=300)
+        return response.status_code, response.headers
+
+    def rss(self):
+        return rss_mb(self.server.pid) if self.server else None
+
+    def close(self):
+        if self.server:
+            self.server.terminate()
+            self.server.wait(timeout=10)
+
+
+def start_http_server(stub_url, port, env_overrides):
+    """Launch benchmarks.serve in a subprocess and wait until it accepts requests."""
+    import requests
+    env = dict(os.environ, **env_overrides)
+    server = subprocess.Popen([sys.executable, "-m", "benchmarks.serve", "--stub-url", stub_url, "--port", str(port)],
+                              cwd=ROOT_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"App server exited with code {server.returncode}")
+        try:
+            requests.get(f"http://127.0.0.1:{port}/metrics", timeout=1)
+            return server
+        except requests.RequestException:
+            time.sleep(0.5)
+    server.terminate()
+    raise RuntimeError("App server did not start within 300 seconds")
+
+
+def bench_endpoint(target, path, build, requests_count, concurrency, warmup):
+    """Fire requests_count requests at path from concurrency threads and summarize latency."""
+    for i in range(warmup):
+        target.send(path, build(-1 - i))
+
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def one(i):
+        nonlocal errors
+        spec = build(i)
+        start = time.perf_counter()
+        try:
+            status, _ = target.send(path, spec)
+        except Exception:
+            status = None
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            if status is None or status >= 400:
+                errors += 1
+
+    rss_before = target.rss()
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests_count)))
+    wall = time.perf_counter() - wall_start
+    rss_after = target.rss()
+    latencies.sort()
+    ms = lambda s: round(s * 1000, 2) if s is not None else None
+    return {
+        "requests": requests_count,
+        "concurrency": concurrency,
+        "errors": errors,
+        "p50_ms": ms(percentile(latencies, 0.50)),
+        "p95_ms": ms(percentile(latencies, 0.95)),
+        "p99_ms": ms(percentile(latencies, 0.99)),
+        "mean_ms": ms(sum(latencies) / len(latencies)),
+        "max_ms": ms(latencies[-1]),
+        "throughput_rps": round(requests_count / wall, 2),
+        "rss_mb_before": round(rss_before, 1) if rss_before is not None else None,
+        "rss_mb_after": round(rss_after, 1) if rss_after is not None else None,
+    }
+
+
+def git_revision():
+    try:
+        commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, text=True).strip()
+        dirty = bool(subprocess.check_output(["git", "status", "--porcelain", "--untracked-files=no"],
+                                             cwd=ROOT_DIR, text=True).strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+
+
+def run(args):
+    endpoints = args.endpoints or list(ENDPOINTS)
+    unknown = [path for path in endpoints if path not in ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"Unknown endpoint(s): {', '.join(unknown)}")
+
+    # Keep each endpoint's numbers its own: no background pipeline work bleeding into the next endpoint
+    # Rate limits would turn a benchmark's back-to-back requests into 429s; the load test keeps them on
+    env_overrides = {"PIPELINE_PREFETCH": "1" if args.prefetch else "0", "ADMISSION_CONTROL": "0"}
+    os.environ.update(env_overrides)
+    stubs = start_stubs(args)
+    if args.mode == "http":
+        target = HttpTarget(f"http://127.0.0.1:{args.port}", start_http_server(stubs.url, args.port, env_overrides))
+    else:
+        target = InProcessTarget(load_app(stubs.url).app)
+
+    results = {}
+    try:
+        for path in endpoints:
+            results[path] = bench_endpoint(target, path, ENDPOINTS[path], args.requests, args.concurrency, args.warmup)
+            r = results[path]
+            print(f"{path:24} p50 {r['p50_ms']:>9.1f} ms  p95 {r['p95_ms']:>9.1f} ms  p99 {r['p99_ms']:>9.1f} ms  "
+                  f"{r['throughput_rps']:>7.1f} req/s  errors {r['errors']}  rss {r['rss_mb_after']} MiB", flush=True)
+    finally:
+        target.close()
+        stubs.stop()
+
+    commit, dirty = git_revision()
+    report = {
+        "meta": {
+            "commit": commit,
+            "dirty": dirty,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "mode": args.mode,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {k: getattr(args, k) for k in ("requests", "concurrency", "warmup", "prefetch", "llm_latency",
+                                                     "stt_latency", "tts_latency", "llm_error_rate", "seed")},
+            "upstream_calls": stubs.stats(),
+        },
+        "endpoints": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit}{'-dirty' if dirty else ''}-{args.mode}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+# Metrics compared between runs and whether a higher value is worse
+COMPARED_METRICS = {"p50_ms": True, "p95_ms": True, "p99_ms": True, "throughput_rps": False, "rss_mb_after": True}
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    print(f"baseline {baseline['meta']['commit']} ({baseline['meta']['mode']})  vs  "
+          f"candidate {candidate['meta']['commit']} ({candidate['meta']['mode']})")
+    if baseline["meta"]["config"] != candidate["meta"]["config"]:
+        print("warning: runs used different configurations; deltas may not be meaningful")
+
+    regressions = []
+    for path, new in candidate["endpoints"].items():
+        old = baseline["endpoints"].get(path)
+        if old is None:
+            print(f"{path}: new endpoint, nothing to compare")
+            continue
+        cells = []
+        for metric, higher_is_worse in COMPARED_METRICS.items():
+            before, after = old.get(metric), new.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = change > args.threshold if higher_is_worse else change < -args.threshold
+            cells.append(f"{metric} {before:g} -> {after:g} ({change:+.1%}){' !' if worse else ''}")
+            if worse:
+                regressions.append(f"{path} {metric}")
+        print(f"{path}\n    " + "\n    ".join(cells))
+
+    if regressions:
+        print(f"Regressions beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+    print("No regressions beyond threshold")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the app's endpoints against local upstream stand-ins.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Benchmark endpoints and write JSON results")
+    run_parser.add_argument("--mode", choices=("inprocess", "http"), default="inprocess")
+    run_parser.add_argument("--endpoints", nargs="+", help=f"Subset of: {' '.join(ENDPOINTS)}")
+    run_parser.add_argument("--requests", type=int, default=50, help="Measured requests per endpoint")
+    run_parser.add_argument("--concurrency", type=int, default=4, help="Concurrent clients")
+    run_parser.add_argument("--warmup", type=int, default=3, help="Unmeasured requests per endpoint")
+    run_parser.add_argument("--prefetch", action="store_true", help="Leave background answer prefetching on")
+    run_parser.add_argument("--port", type=int, default=5055, help="App port in http mode")
+    run_parser.add_argument("--output", help="Results file (default benchmarks/results/<commit>-<mode>.json)")
+    add_latency_arguments(run_parser)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = sub.add_parser("compare", help="Compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="Relative change counted as a regression")
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Request payloads shared by the benchmarks and the load test."""
+import array
+import functools
+import math
+import random
+
+PCM_SAMPLE_RATE = 16000
+
+JOB_DESC = """Senior Backend Engineer at Example Corp.
+We build the payments platform used by thousands of merchants. You will design, build and operate
+Python services on Kubernetes, own their reliability and performance, and mentor other engineers.
+Requirements: 5+ years of Python, experience with PostgreSQL and message queues, strong written
+communication. Our values: customer obsession, ownership, and bias for action."""
+
+COMPANY_INFO = """Example Corp is a fintech company founded in 2012 with 800 employees. It values
+customer obsession, ownership and frugality, and ships small changes to production many times a day."""
+
+RESUME = """Software engineer with six years of experience building backend systems in Python and Go.
+Led the migration of a monolith to services on Kubernetes, cutting p95 latency by 40 percent.
+Built an event pipeline on Kafka processing two million messages a day. Mentored four junior engineers.
+Education: BSc Computer Science, University of Washington."""
+
+QUESTIONS = [
+    "Tell me about yourself.",
+    "Describe a time you improved the performance of a system.",
+    "Tell me about a conflict with a teammate and how you resolved it.",
+    "How would you design a rate limiter for a public API?",
+    "Why do you want to work at Example Corp?",
+]
+
+ANSWERS = [
+    "I am a backend engineer with six years of experience. Most recently I led a migration of our monolith "
+    "to services on Kubernetes, which cut p95 latency by forty percent and let teams deploy independently.",
+    "Our checkout API was timing out at peak. I profiled it, found N+1 queries and a missing index, added "
+    "caching for merchant settings, and brought p95 from 900 to 250 milliseconds within two sprints.",
+    "A teammate and I disagreed about adopting a new queue. We wrote down the requirements together, ran a "
+    "small load test on both options, and picked the one the data supported. We still work closely today.",
+    "I would use a token bucket per API key stored in Redis, with a Lua script for atomic refill and take. "
+    "Limits would be configurable per plan, and responses would include Retry-After headers.",
+]
+
+
+def variant(text, index):
+    """Make text unique per request so caches and request coalescing do not hide upstream latency."""
+    return f"{text}\n(Reference {index})"
+
+
+@functools.lru_cache(maxsize=16)
+def speech_pcm(seconds=20.0, sample_rate=PCM_SAMPLE_RATE, seed=0):
+    """Little-endian 16-bit mono PCM that the app's voice activity detection treats as speech.
+
+    Voiced bursts of a harmonic tone with a wandering pitch alternate with short and long pauses,
+    so the recording is trimmed and split into several segments like a real answer.
+    """
+    rng = random.Random(seed)
+    samples = array.array("h")
+    t = 0.0
+    while t < seconds:
+        burst = rng.uniform(0.6, 2.5)
+        pitch = rng.uniform(110, 180)
+        for n in range(int(burst * sample_rate)):
+            x = n / sample_rate
+            envelope = min(1.0, x / 0.05, (burst - x) / 0.05)
+            f = pitch * (1 + 0.05 * math.sin(2 * math.pi * 3 * x))
+            value = sum(math.sin(2 * math.pi * f * k * x) / k for k in (1, 2, 3))
+            samples.append(int(6000 * envelope * value + rng.gauss(0, 150)))
+        pause = rng.choice((0.15, 0.3, 0.3, 0.9))
+        samples.extend(int(rng.gauss(0, 60)) for _ in range(int(pause * sample_rate)))
+        t += burst + pause
+    if array.array("h", [1]).tobytes() != b"\x01\x00":
+        samples.byteswap()
+    return samples.tobytes()
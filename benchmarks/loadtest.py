@@ -0,0 +1,416 @@
+"""Load test: concurrent virtual candidates running full mock-interview sessions.
+
+Each virtual user loops through a scenario (analyze the job, generate questions, listen to a
+question, record and transcribe an answer, get feedback, a model answer and follow-ups, export)
+with think times between steps. The user count is stepped up level by level to find the
+saturation point, and every request's latency is split into queueing and service time using the
+app's Server-Timing header:
+
+    front_queue   client latency minus the app's own time (listen backlog, worker hand-off, network)
+    admission_queue waiting in the app's fair queue for an LLM-backed request slot
+    llm_queue     waiting for a free upstream LLM slot inside the app
+    pipeline_wait waiting for a prefetched result that is still being computed
+    service       the rest of the app's time
+
+    python -m benchmarks.loadtest                               # app + stubs started locally
+    python -m benchmarks.loadtest --levels 10,25,50,100,200 --duration 120
+    python -m benchmarks.loadtest --url http://staging:5002 --scenario my_scenario.json
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from benchmarks import fixtures
+from benchmarks.bench import RESULTS_DIR, git_revision, percentile, rss_mb, start_http_server
+from benchmarks.stubs import LatencyModel, add_latency_arguments, start_stubs
+
+# Think times are milliseconds of user time before each request (LatencyModel specs).
+DEFAULT_SCENARIO = {
+    "questions_per_session": [2, 4],
+    "steps": [
+        {"name": "analyze_info", "path": "/analyze-info", "think": "uniform:20000:60000"},
+        {"name": "generate_questions", "path": "/generate-questions", "think": "uniform:1000:3000"},
+        {"repeat": "questions_per_session", "steps": [
+            {"name": "read_question", "path": "/text-to-speech", "think": "uniform:3000:10000", "probability": 0.5},
+            {"name": "transcribe", "path": "/speech-to-text", "think": "uniform:30000:90000"},
+            {"name": "evaluate", "path": "/analyze-answer", "think": "uniform:5000:15000"},
+            {"name": "model_answer", "path": "/generate-model-answer", "think": "uniform:5000:20000",
+             "probability": 0.7},
+            {"name": "follow_ups", "path": "/generate-follow-up-questions", "think": "uniform:5000:15000",
+             "probability": 0.6},
+        ]},
+        {"name": "export", "path": "/save-to-html", "think": "uniform:3000:10000", "probability": 0.5},
+    ],
+}
+
+QUEUE_STAGES = ("admission_queue", "llm_queue", "pipeline_wait")
+
+
+def _job_inputs(ctx):
+    return {"job_desc": ctx["job_desc"], "company_info": fixtures.COMPANY_INFO, "resume": fixtures.RESUME}
+
+
+def _answer_inputs(ctx):
+    return {"question": ctx["question"], "answer_text": ctx["answer_text"], "job_desc": ctx["job_desc"],
+            "company_info": fixtures.COMPANY_INFO, "resume": fixtures.RESUME,
+            "company_values": ctx.get("company_values", "")}
+
+
+def _pick_question(ctx, rng):
+    questions = [q for qs in ctx.get("questions", {}).values() for q in qs] or fixtures.QUESTIONS
+    ctx["question"] = rng.choice(questions)
+    ctx["answer_text"] = f"{rng.choice(fixtures.ANSWERS)} (candidate {ctx['user']}, session {ctx['session']})"
+
+
+# Per path: build the request from the session so far, then fold the response back into it
+REQUESTS = {
+    "/analyze-info": lambda ctx, rng: {"json": _job_inputs(ctx)},
+    "/generate-questions": lambda ctx, rng: {"json": _job_inputs(ctx)},
+    "/text-to-speech": lambda ctx, rng: {"json": {"text": ctx["question"], "voice_option": "US English"}},
+    "/speech-to-text": lambda ctx, rng: {
+        "data": fixtures.speech_pcm(seed=ctx["session"] % 8), "params": {"question": ctx["question"]},
+        "headers": {"Content-Type": f"audio/pcm;rate={fixtures.PCM_SAMPLE_RATE};channels=1"}},
+    "/analyze-answer": lambda ctx, rng: {"json": _answer_inputs(ctx)},
+    "/generate-model-answer": lambda ctx, rng: {"json": _answer_inputs(ctx)},
+    "/generate-follow-up-questions": lambda ctx, rng: {"json": _answer_inputs(ctx)},
+    "/save-to-html": lambda ctx, rng: {"json": dict(_answer_inputs(ctx), selected_question=ctx["question"],
+                                                    feedback=ctx.get("feedback", ""),
+                                                    model_answer=ctx.get("model_answer", ""),
+                                                    follow_up_questions=ctx.get("follow_up_questions", []))},
+}
+
+RESPONSE_FIELDS = {
+    "/analyze-info": {"company_values": "company_values"},
+    "/generate-questions": {"questions": "questions"},
+    "/analyze-answer": {"feedback": "feedback"},
+    "/generate-model-answer": {"model_answer": "model_answer"},
+    "/generate-follow-up-questions": {"follow_up_questions": "follow_up_questions"},
+}
+
+
+def parse_server_timing(header):
+    """{"app": 12.3, "llm": 10.0, ...} in milliseconds from a Server-Timing header."""
+    timings = {}
+    for entry in (header or "").split(","):
+        name, _, params = entry.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "dur" and name:
+                try:
+                    timings[name] = float(value)
+                except ValueError:
+                    pass
+    return timings
+
+
+def load_scenario(path):
+    if not path:
+        return DEFAULT_SCENARIO
+    with open(path) as f:
+        scenario = json.load(f)
+    _check_steps(scenario["steps"])
+    return scenario
+
+
+def _check_steps(steps):
+    for step in steps:
+        if "repeat" in step:
+            _check_steps(step["steps"])
+        elif step["path"] not in REQUESTS:
+            raise SystemExit(f"Scenario step {step.get('name')} uses unsupported path {step['path']}")
+
+
+class Recorder:
+    """Thread-safe store of completed requests and sessions."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = []
+        self.sessions = []
+
+    def add(self, sample):
+        with self._lock:
+            self.samples.append(sample)
+
+    def session_done(self, finished_at):
+        with self._lock:
+            self.sessions.append(finished_at)
+
+    def window(self, start, end):
+        with self._lock:
+            return ([s for s in self.samples if start <= s["finished_at"] < end],
+                    sum(1 for t in self.sessions if start <= t < end))
+
+
+class VirtualUser(threading.Thread):
+    """One candidate running scenario sessions back to back until stopped."""
+
+    def __init__(self, index, base_url, scenario, recorder, stop, think_scale, seed):
+        super().__init__(name=f"vu-{index}", daemon=True)
+        self.index = index
+        self.base_url = base_url
+        self.scenario = scenario
+        self.recorder = recorder
+        self.stop = stop
+        self.think_scale = think_scale
+        self.rng = random.Random(seed)
+        self.thinks = {}
+
+    def run(self):
+        session_number = 0
+        while not self.stop.is_set():
+            session_number += 1
+            if self.run_session(session_number):
+                self.recorder.session_done(time.monotonic())
+
+    def run_session(self, session_number):
+        import requests
+        http = requests.Session()
+        ctx = {"user": self.index, "session": session_number,
+               "job_desc": fixtures.variant(fixtures.JOB_DESC, f"{self.index}-{session_number}")}
+        try:
+            return self._run_steps(http, ctx, self.scenario["steps"])
+        finally:
+            http.close()
+
+    def _run_steps(self, http, ctx, steps):
+        for step in steps:
+            if "repeat" in step:
+                low, high = self.scenario[step["repeat"]]
+                for _ in range(self.rng.randint(low, high)):
+                    _pick_question(ctx, self.rng)
+                    if not self._run_steps(http, ctx, step["steps"]):
+                        return False
+                continue
+            if self.rng.random() >= step.get("probability", 1.0):
+                continue
+            if self.stop.wait(self._think(step)):
+                return False
+            self._request(http, ctx, step)
+        return True
+
+    def _think(self, step):
+        spec = step.get("think", "0")
+        if spec not in self.thinks:
+            self.thinks[spec] = LatencyModel(spec, self.rng.random())
+        return self.thinks[spec].sample() * self.think_scale
+
+    def _request(self, http, ctx, step):
+        ctx.setdefault("question", fixtures.QUESTIONS[0])
+        ctx.setdefault("answer_text", fixtures.ANSWERS[0])
+        spec = REQUESTS[step["path"]](ctx, self.rng)
+        started = time.perf_counter()
+        timings, status = {}, None
+        try:
+            response = http.post(self.base_url + step["path"], json=spec.get("json"), data=spec.get("data"),
+                                 params=spec.get("params"), headers=spec.get("headers"), timeout=300)
+            status = response.status_code
+            timings = parse_server_timing(response.headers.get("Server-Timing"))
+            if status < 400:
+                body = response.json()
+                for field, key in RESPONSE_FIELDS.get(step["path"], {}).items():
+                    if field in body:
+                        ctx[key] = body[field]
+                if step["path"] == "/speech-to-text" and body.get("text"):
+                    ctx["answer_text"] = body["text"]
+        except Exception:
+            pass
+        client_ms = (time.perf_counter() - started) * 1000
+        self.recorder.add({"step": step["name"], "status": status, "client_ms": client_ms,
+                           "timings": timings, "finished_at": time.monotonic()})
+
+
+def summarize(samples, sessions, seconds, users):
+    """Throughput, error rate and per-step queueing/service breakdown for one measurement window."""
+    errors = sum(1 for s in samples if s["status"] is None or s["status"] >= 400)
+    queue_ms = []
+    steps = {}
+    for sample in samples:
+        steps.setdefault(sample["step"], []).append(sample)
+
+    def dist(values):
+        values = sorted(values)
+        return {"p50": round(percentile(values, 0.5), 1), "p95": round(percentile(values, 0.95), 1),
+                "mean": round(sum(values) / len(values), 1)} if values else None
+
+    breakdown = {}
+    for name, step_samples in steps.items():
+        timed = [s for s in step_samples if "app" in s["timings"]]
+        front = [max(0.0, s["client_ms"] - s["timings"]["app"]) for s in timed]
+        inner = [sum(s["timings"].get(stage, 0.0) for stage in QUEUE_STAGES) for s in timed]
+        service = [max(0.0, s["timings"]["app"] - wait) for s, wait in zip(timed, inner)]
+        queue_ms += [f + i for f, i in zip(front, inner)]
+        stage_totals = {}
+        for s in timed:
+            for stage, ms in s["timings"].items():
+                if stage != "app":
+                    stage_totals[stage] = stage_totals.get(stage, 0.0) + ms
+        breakdown[name] = {
+            "requests": len(step_samples),
+            "errors": sum(1 for s in step_samples if s["status"] is None or s["status"] >= 400),
+            "latency_ms": dist([s["client_ms"] for s in step_samples]),
+            "front_queue_ms": dist(front),
+            "llm_queue_ms": dist([s["timings"].get("llm_queue", 0.0) for s in timed]),
+            "pipeline_wait_ms": dist([s["timings"].get("pipeline_wait", 0.0) for s in timed]),
+            "service_ms": dist(service),
+            "stage_mean_ms": {stage: round(total / len(timed), 1) for stage, total in sorted(stage_totals.items())},
+        }
+    queue_ms.sort()
+    return {
+        "users": users,
+        "requests": len(samples),
+        "sessions_completed": sessions,
+        "throughput_rps": round(len(samples) / seconds, 3),
+        "throughput_per_user": round(len(samples) / seconds / users, 4),
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "queue_p95_ms": round(percentile(queue_ms, 0.95), 1) if queue_ms else None,
+        "steps": breakdown,
+    }
+
+
+def run_level(base_url, scenario, users, args, server):
+    """Run users virtual candidates for args.duration seconds and summarize the steady-state window."""
+    recorder, stop = Recorder(), threading.Event()
+    vus = [VirtualUser(i, base_url, scenario, recorder, stop, args.think_scale, args.seed * 100003 + users * 7 + i)
+           for i in range(users)]
+    for vu in vus:
+        vu.start()
+        # Stagger arrivals across the ramp so sessions do not run in lockstep
+        time.sleep(args.ramp / users)
+    window_start = time.monotonic()
+    time.sleep(args.duration)
+    window_end = time.monotonic()
+    stop.set()
+    for vu in vus:
+        vu.join(timeout=args.drain)
+    samples, sessions = recorder.window(window_start, window_end)
+    summary = summarize(samples, sessions, window_end - window_start, users)
+    server_rss = rss_mb(server.pid) if server else None
+    summary["server_rss_mb"] = round(server_rss, 1) if server_rss is not None else None
+    return summary
+
+
+def saturation_reason(level, baseline, args):
+    """Why a level counts as saturated, or None while the app keeps up."""
+    if level["requests"] == 0:
+        return "no requests completed"
+    if level["error_rate"] > args.max_error_rate:
+        return f"error rate {level['error_rate']:.1%} > {args.max_error_rate:.1%}"
+    if level["queue_p95_ms"] is not None and level["queue_p95_ms"] > args.max_queue_p95_ms:
+        return f"queueing p95 {level['queue_p95_ms']:.0f} ms > {args.max_queue_p95_ms:.0f} ms"
+    if baseline and baseline["throughput_per_user"] and \
+            level["throughput_per_user"] < args.min_efficiency * baseline["throughput_per_user"]:
+        return (f"throughput per user fell to {level['throughput_per_user'] / baseline['throughput_per_user']:.0%} "
+                f"of the lightest level")
+    return None
+
+
+def print_level(level):
+    print(f"users {level['users']:>5}  {level['throughput_rps']:>8.2f} req/s  {level['sessions_completed']:>5} sessions  "
+          f"errors {level['error_rate']:.1%}  queue p95 {level['queue_p95_ms']} ms  "
+          f"rss {level['server_rss_mb']} MiB  {level.get('saturated') or 'ok'}", flush=True)
+
+
+def print_breakdown(level):
+    print(f"\nPer-stage latency at {level['users']} users (p95 ms: total = front_queue + llm_queue + "
+          f"pipeline_wait + service):")
+    for name, step in level["steps"].items():
+        p95 = lambda key: step[key]["p95"] if step[key] else "-"
+        print(f"  {name:20} total {p95('latency_ms'):>8}  front_queue {p95('front_queue_ms'):>8}  "
+              f"llm_queue {p95('llm_queue_ms'):>8}  pipeline_wait {p95('pipeline_wait_ms'):>8}  "
+              f"service {p95('service_ms'):>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find the session concurrency one app instance sustains.")
+    parser.add_argument("--url", help="Test an already running app instead of starting one with local stubs")
+    parser.add_argument("--port", type=int, default=5056, help="Port for the locally started app")
+    parser.add_argument("--scenario", help="JSON scenario file (default: the built-in full session)")
+    parser.add_argument("--levels", default="5,10,20,40,80,160,320", help="Comma-separated user counts to step through")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds per level")
+    parser.add_argument("--ramp", type=float, default=10, help="Seconds over which a level's users arrive")
+    parser.add_argument("--drain", type=float, default=30, help="Seconds to let in-flight requests finish per level")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="Multiply every think time (0.1 = 10x faster users)")
+    parser.add_argument("--refine", type=int, default=2, help="Bisection steps between the last good and first saturated level")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-queue-p95-ms", type=float, default=1000, help="Queueing (front + in-app waits) p95 limit")
+    parser.add_argument("--min-efficiency", type=float, default=0.8,
+                        help="Saturated when per-user throughput drops below this fraction of the lightest level")
+    parser.add_argument("--output", help="Results file (default benchmarks/results/loadtest-<commit>.json)")
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+
+    scenario = load_scenario(args.scenario)
+    levels = sorted({int(n) for n in args.levels.split(",")})
+    stubs = server = None
+    if args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        stubs = start_stubs(args)
+        # Every virtual user comes from 127.0.0.1, so the per-address rate limit must cover all of them
+        server = start_http_server(stubs.url, args.port, {"ADMISSION_IP_MULTIPLIER": str(max(levels[-1], 4))})
+        base_url = f"http://127.0.0.1:{args.port}"
+
+    results, baseline, last_good, saturated_at = [], None, None, None
+    refine = args.refine
+    try:
+        pending = list(levels)
+        while pending:
+            users = pending.pop(0)
+            level = run_level(base_url, scenario, users, args, server)
+            level["saturated"] = saturation_reason(level, baseline, args)
+            baseline = baseline or level
+            results.append(level)
+            print_level(level)
+            if level["saturated"]:
+                saturated_at = min(saturated_at or users, users)
+            elif not last_good or users > last_good["users"]:
+                last_good = level
+            if saturated_at is not None:
+                # Stop climbing and bisect between the last level that kept up and the first that did not
+                low = last_good["users"] if last_good else 0
+                pending = [(low + saturated_at) // 2] if refine > 0 and saturated_at - low > 1 else []
+                refine -= 1
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+        if stubs:
+            stubs.stop()
+
+    saturated = min((r for r in results if r["saturated"]), key=lambda r: r["users"], default=None)
+    good = [r for r in results if not r["saturated"] and (not saturated or r["users"] < saturated["users"])]
+    last_good = max(good, key=lambda r: r["users"], default=None)
+    if last_good:
+        print_breakdown(last_good)
+    if saturated:
+        print_breakdown(saturated)
+        print(f"\nSaturation at {saturated['users']} users ({saturated['saturated']}); one instance sustains "
+              f"{last_good['users'] if last_good else 0} concurrent sessions at "
+              f"{last_good['throughput_rps'] if last_good else 0} req/s.")
+    else:
+        print(f"\nNo saturation up to {levels[-1]} users; raise --levels to find the limit.")
+
+    commit, dirty = git_revision()
+    report = {
+        "meta": {"commit": commit, "dirty": dirty, "timestamp": datetime.now(timezone.utc).isoformat(),
+                 "target": args.url or "local", "scenario": scenario,
+                 "config": {k: v for k, v in vars(args).items() if k not in ("url", "output", "scenario")}},
+        "capacity_users": last_good["users"] if last_good else 0,
+        "capacity_rps": last_good["throughput_rps"] if last_good else 0,
+        "saturation_users": saturated["users"] if saturated else None,
+        "levels": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest-{commit}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
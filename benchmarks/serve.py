@@ -0,0 +1,21 @@
+"""Serve the app wired to a StubUpstream, for HTTP benchmarks and load tests.
+
+    python -m benchmarks.serve --stub-url http://127.0.0.1:8099 --port 5002
+"""
+import argparse
+
+from benchmarks.stubs import load_app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stub-url", required=True, help="Base URL of a running StubUpstream")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5002)
+    args = parser.parse_args()
+    app_module = load_app(args.stub_url)
+    app_module.app.run(host=args.host, port=args.port, threaded=True, debug=False, use_reloader=False)
+
+
+if __name__ == "__main__":
+    main()
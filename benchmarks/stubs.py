@@ -0,0 +1,264 @@
+"""Local stand-ins for the app's upstream services, with configurable latency.
+
+StubUpstream serves three routes on one port:
+
+    POST /inference   Together-compatible completions (the app reaches it through TOGETHER_COMPLETE_URL)
+    POST /recognize   speech recognition: WAV in, {"transcript": ...} out
+    POST /tts         text to speech: {"text", "lang", "tld"} in, MP3-sized bytes out
+
+load_app() imports flask_app wired to a StubUpstream; STT and gTTS calls are redirected to the
+stub routes, so every upstream call is still a real HTTP round trip with the configured latency.
+
+Latency specs are in milliseconds: "0", "fixed:200", "uniform:100:400", "normal:300:50" or
+"lognormal:800:0.5" (median and sigma of the underlying normal).
+"""
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import random
+import threading
+import time
+import types
+import wave
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LatencyModel:
+    """A latency distribution parsed from a spec string; sample() returns seconds."""
+    SHAPES = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+
+    def __init__(self, spec="0", seed=None):
+        self.spec = str(spec)
+        kind, _, args = self.spec.partition(":")
+        if not args:
+            kind, args = "fixed", kind
+        if kind not in self.SHAPES:
+            raise ValueError(f"Unknown latency distribution: {self.spec}")
+        self.kind = kind
+        self.args = [float(a) for a in args.split(":")]
+        if len(self.args) != self.SHAPES[kind]:
+            raise ValueError(f"{kind} latency takes {self.SHAPES[kind]} parameter(s): {self.spec}")
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def sample(self):
+        with self._lock:
+            if self.kind == "fixed":
+                ms = self.args[0]
+            elif self.kind == "uniform":
+                ms = self._random.uniform(*self.args)
+            elif self.kind == "normal":
+                ms = self._random.gauss(*self.args)
+            else:
+                median, sigma = self.args
+                ms = median * math.exp(sigma * self._random.gauss(0, 1))
+        return max(0.0, ms) / 1000
+
+    def __repr__(self):
+        return f"LatencyModel({self.spec!r})"
+
+
+def completion_text(prompt):
+    """Deterministic completion in the shape every parser in flask_app expects: FakeBackend's canned text."""
+    # Imported here, not at the top: configure_environment() must run before flask_app is first imported
+    from flask_app import FakeBackend
+    return FakeBackend.completion_text(prompt)
+
+
+def _complete(body):
+    request = json.loads(body or b"{}")
+    prompt = request.get("prompt", "")
+    text = completion_text(prompt)
+    prompt_tokens, completion_tokens = len(prompt) // 4 + 1, len(text) // 4 + 1
+    return 200, {
+        "output": {
+            "choices": [{"text": text}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+    }
+
+
+def _recognize(body):
+    with wave.open(io.BytesIO(body), "rb") as wav_file:
+        seconds = wav_file.getnframes() / wav_file.getframerate()
+    # Roughly 2.5 words per second of audio, like conversational speech
+    words = ("I designed and shipped the service then measured latency with my team").split()
+    count = max(1, int(seconds * 2.5))
+    return 200, {"transcript": " ".join(words[i % len(words)] for i in range(count))}
+
+
+def _synthesize(body):
+    request = json.loads(body or b"{}")
+    text = request.get("text", "")
+    # About 32 kbps MP3 at ~15 characters per second of speech
+    size = 1024 + len(text) * 270
+    seed = hashlib.sha256(text.encode("utf-8")).digest()
+    return 200, b"ID3" + (seed * (size // len(seed) + 1))[:size]
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = self.path.split("?", 1)[0]
+        route = self.server.routes.get(path)
+        if route is None:
+            return self._reply(404, {"error": f"No stub for {path}"})
+        latency, handler, error_rate = route
+        time.sleep(latency.sample())
+        if error_rate and self.server.random.random() < error_rate:
+            self.server.record(path, ok=False)
+            return self._reply(503, {"error": "Injected upstream failure"})
+        status, payload = handler(body)
+        self.server.record(path, ok=status < 400)
+        self._reply(status, payload)
+
+    def _reply(self, status, payload):
+        if isinstance(payload, bytes):
+            data, content_type = payload, "audio/mpeg"
+        else:
+            data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubUpstream:
+    """Threaded HTTP server standing in for Together, Google STT and gTTS."""
+
+    def __init__(self, host="127.0.0.1", port=0, llm_latency="0", stt_latency="0", tts_latency="0",
+                 llm_error_rate=0.0, seed=None):
+        self._server = ThreadingHTTPServer((host, port), _StubHandler)
+        self._server.daemon_threads = True
+        self._server.random = random.Random(seed)
+        self._server.routes = {
+            "/inference": (LatencyModel(llm_latency, seed), _complete, llm_error_rate),
+            "/recognize": (LatencyModel(stt_latency, seed), _recognize, 0.0),
+            "/tts": (LatencyModel(tts_latency, seed), _synthesize, 0.0),
+        }
+        self._counts = {}
+        self._counts_lock = threading.Lock()
+        self._server.record = self._record
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _record(self, path, ok):
+        with self._counts_lock:
+            key = (path, "ok" if ok else "error")
+            self._counts[key] = self._counts.get(key, 0) + 1
+
+    def stats(self):
+        """Calls served per route and outcome, e.g. {"/inference": {"ok": 12, "error": 1}}."""
+        with self._counts_lock:
+            stats = {}
+            for (path, outcome), count in self._counts.items():
+                stats.setdefault(path, {})[outcome] = count
+            return stats
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, name="stub-upstream", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def configure_environment(stub_url):
+    """Point the app's Together client at the stub. Must run before flask_app is imported."""
+    os.environ["TOGETHER_COMPLETE_URL"] = f"{stub_url}/inference"
+    os.environ.setdefault("TOGETHER_API_KEY", "benchmark")
+    os.environ.setdefault("LLM_BACKEND", "together")
+
+
+def install_app_stubs(app_module, stub_url):
+    """Redirect the app's Google speech recognition and gTTS calls to the stub routes."""
+    import requests
+
+    local = threading.local()
+
+    def http():
+        if not hasattr(local, "session"):
+            local.session = requests.Session()
+        return local.session
+
+    def recognize_google(recognizer, audio_data, *args, **kwargs):
+        response = http().post(f"{stub_url}/recognize", data=audio_data.get_wav_data(),
+                               headers={"Content-Type": "audio/wav"}, timeout=30)
+        response.raise_for_status()
+        transcript = response.json().get("transcript", "")
+        if not transcript:
+            raise app_module.sr.UnknownValueError()
+        return transcript
+
+    class StubTTS:
+        def __init__(self, text, lang="en", tld="com", **kwargs):
+            self.text, self.lang, self.tld = text, lang, tld
+
+        def save(self, path):
+            response = http().post(f"{stub_url}/tts", json={"text": self.text, "lang": self.lang, "tld": self.tld},
+                                   timeout=30)
+            response.raise_for_status()
+            with open(path, "wb") as f:
+                f.write(response.content)
+
+    app_module.sr.Recognizer.recognize_google = recognize_google
+    app_module.gtts = types.SimpleNamespace(gTTS=StubTTS)
+    app_module.llm_client.url = f"{stub_url}/inference"
+
+
+def load_app(stub_url):
+    """Import flask_app wired to the StubUpstream at stub_url and return the module."""
+    configure_environment(stub_url)
+    import flask_app
+    install_app_stubs(flask_app, stub_url)
+    return flask_app
+
+
+def add_latency_arguments(parser):
+    parser.add_argument("--llm-latency", default="lognormal:800:0.4", help="Together completion latency spec (ms)")
+    parser.add_argument("--stt-latency", default="lognormal:400:0.3", help="Speech recognition latency spec (ms)")
+    parser.add_argument("--tts-latency", default="lognormal:300:0.3", help="Text-to-speech latency spec (ms)")
+    parser.add_argument("--llm-error-rate", type=float, default=0.0, help="Fraction of completions answered with 503")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for latency sampling")
+
+
+def start_stubs(args, port=0):
+    return StubUpstream(port=port, llm_latency=args.llm_latency, stt_latency=args.stt_latency,
+                        tts_latency=args.tts_latency, llm_error_rate=args.llm_error_rate, seed=args.seed).start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the upstream stand-ins on their own.")
+    parser.add_argument("--port", type=int, default=8099)
+    add_latency_arguments(parser)
+    args = parser.parse_args()
+    stubs = start_stubs(args, args.port)
+    print(f"Stub upstream listening on {stubs.url}", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stubs.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,70 +1,1037 @@
-from flask import Flask, render_template, request, jsonify, send_file, session
-import numpy as np
-import speech_recognition as sr
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from flask import Flask, render_template, request, jsonify, send_file, session, g, Response, has_request_context, copy_current_request_context, url_for
+from flask.sessions import SecureCookieSessionInterface
+from werkzeug.http import parse_options_header
 import requests
-import together
 import json
 import re
 from dotenv import load_dotenv
 import os
+import sys
+import types
+import importlib
 import tempfile
+import mimetypes
 from datetime import datetime
 import threading
-from gtts import gTTS
 import uuid
 import base64
 import io
+import textwrap
+import wave
+import zlib
+import gzip
+import sqlite3
+import atexit
+import time
+import random
+import copy
+import logging
+import functools
+import hashlib
+import itertools
+import heapq
+import math
+import queue
+from collections import Counter, defaultdict, OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError:  # optional: responses are gzip-compressed only
+    brotli = None
+
+
+class LazyModule(types.ModuleType):
+    """Stand-in for a heavy module that is imported on first attribute access.
+
+    Workers start without paying for numpy, torch, scikit-learn or the speech libraries; a request
+    that needs one imports it once. After loading, the real module's namespace is copied in, so
+    later attribute lookups are as fast as on the module itself.
+    """
+    registry = []
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+        LazyModule.registry.append(self)
+
+    @property
+    def is_loaded(self):
+        return self.__dict__["_lazy_module"] is not None
+
+    def load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is not None:
+            return module
+        with self.__dict__["_lazy_lock"]:
+            module = self.__dict__["_lazy_module"]
+            if module is None:
+                start = time.perf_counter()
+                module = importlib.import_module(self.__name__)
+                elapsed = time.perf_counter() - start
+                self.__dict__.update(module.__dict__)
+                self.__dict__["_lazy_module"] = module
+                metrics.set_gauge("husky_lazy_import_seconds", elapsed, module=self.__name__)
+                log_event("lazy_import", module=self.__name__, duration_ms=round(elapsed * 1000, 1))
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __dir__(self):
+        return dir(self.load())
+
+    def __repr__(self):
+        return f"<lazy module {self.__name__!r} ({'loaded' if self.is_loaded else 'not loaded'})>"
+
+# Heavy dependencies, imported when a request first needs them
+np = LazyModule("numpy")
+sklearn_pairwise = LazyModule("sklearn.metrics.pairwise")
+sr = LazyModule("speech_recognition")
+gtts = LazyModule("gtts")
+sentence_transformers = LazyModule("sentence_transformers")
 
 load_dotenv()
 
 app = Flask(__name__)
 app.secret_key = os.urandom(24)
 
-# Initialize Together client
+# Together API credentials
 your_api_key = os.getenv("TOGETHER_API_KEY")
-together.api_key = your_api_key
 
 
-def prompt_llm(prompt, show_cost=True):
-    """Function to send prompt to an LLM via the Together API."""
-    model = "meta-llama/Meta-Llama-3-8B-Instruct-Lite"
-    tokens = len(prompt.split())
+class JsonLogFormatter(logging.Formatter):
+    """Formats log records as one JSON object per line."""
+    def format(self, record):
+        payload = {
+            "ts": datetime.utcfromtimestamp(record.created).isoformat(timespec="milliseconds") + "Z",
+            "level": record.levelname,
+            "event": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+logger = logging.getLogger("huskyinterviewprep")
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(JsonLogFormatter())
+logger.addHandler(_log_handler)
+logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+logger.propagate = False
+
+def log_event(event, level=logging.INFO, **fields):
+    """Emit a structured log line, tagged with the current request id when there is one."""
+    if has_request_context() and "request_id" in g:
+        fields.setdefault("request_id", g.request_id)
+    logger.log(level, event, extra={"fields": fields})
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class MetricsRegistry:
+    """Thread-safe in-memory counters, gauges and histograms exported in Prometheus text format."""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._meta = {}
+        self._counters = defaultdict(float)
+        self._gauges = defaultdict(float)
+        self._histograms = {}
+
+    def describe(self, name, kind, help_text):
+        self._meta[name] = (kind, help_text)
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        with self._lock:
+            self._counters[self._key(name, labels)] += value
+
+    def set_gauge(self, name, value, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] = value
+
+    def add_gauge(self, name, delta, **labels):
+        with self._lock:
+            self._gauges[self._key(name, labels)] += delta
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist[0][i] += 1
+            hist[1] += value
+            hist[2] += 1
 
-    if show_cost:
-        print(f"\nNumber of tokens: {tokens}")
-        cost = (0.1 / 1_000_000) * tokens
-        print(f"Estimated cost for {model}: ${cost:.10f}\n")
+    @staticmethod
+    def _format_labels(labels, extra=()):
+        pairs = list(labels) + list(extra)
+        if not pairs:
+            return ""
+        escaped = []
+        for k, v in pairs:
+            v = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            escaped.append(f'{k}="{v}"')
+        return "{" + ",".join(escaped) + "}"
 
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = dict(self._counters)
+            gauges = dict(self._gauges)
+            histograms = {k: (list(v[0]), v[1], v[2]) for k, v in self._histograms.items()}
+
+        by_name = defaultdict(list)
+        for (name, labels), value in counters.items():
+            by_name[name].append(("counter", labels, value))
+        for (name, labels), value in gauges.items():
+            by_name[name].append(("gauge", labels, value))
+        for (name, labels), value in histograms.items():
+            by_name[name].append(("histogram", labels, value))
+
+        lines = []
+        for name in sorted(by_name):
+            samples = by_name[name]
+            kind, help_text = self._meta.get(name, (samples[0][0], name))
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for sample_kind, labels, value in sorted(samples, key=lambda s: s[1]):
+                if sample_kind != "histogram":
+                    lines.append(f"{name}{self._format_labels(labels)} {value:g}")
+                    continue
+                bucket_counts, total, count = value
+                for bound, bucket_count in zip(self.buckets, bucket_counts):
+                    lines.append(f"{name}_bucket{self._format_labels(labels, [('le', f'{bound:g}')])} {bucket_count}")
+                lines.append(f"{name}_bucket{self._format_labels(labels, [('le', '+Inf')])} {count}")
+                lines.append(f"{name}_sum{self._format_labels(labels)} {total:.6f}")
+                lines.append(f"{name}_count{self._format_labels(labels)} {count}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+metrics.describe("husky_requests_total", "counter", "HTTP requests handled, by endpoint and status.")
+metrics.describe("husky_request_duration_seconds", "histogram", "End-to-end HTTP request latency by endpoint.")
+metrics.describe("husky_stage_duration_seconds", "histogram", "Latency of internal stages (llm, llm_queue, pipeline_wait, admission_queue, ffmpeg, stt, tts, html_render, session_io, history_db, compress) by endpoint.")
+metrics.describe("husky_lazy_import_seconds", "gauge", "Time taken by the first import of each lazily loaded dependency.")
+
+class LRUCache:
+    """Small thread-safe least-recently-used cache."""
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._items:
+                return default
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._items.pop(key, default)
+
+    def items(self):
+        with self._lock:
+            return list(self._items.items())
+
+    def __len__(self):
+        return len(self._items)
+
+def text_hash(*parts):
+    """Stable short hash of one or more strings, used as a cache key."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or "").encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()[:32]
+
+# The request a background thread is working for, so its LLM usage is booked to that endpoint and session
+_background_owner = threading.local()
+
+@contextmanager
+def accounted_to(endpoint, session_id):
+    """Attribute work done in this (non-request) thread to the request that started it."""
+    _background_owner.endpoint, _background_owner.session_id = endpoint, session_id
     try:
-        response = together.Complete.create(
-            prompt=prompt,
-            model=model,
-            max_tokens=512,
-            temperature=0.7,
-            top_k=50,
-            top_p=0.7,
-            repetition_penalty=1.1,
+        yield
+    finally:
+        _background_owner.endpoint = _background_owner.session_id = None
+
+def _current_endpoint():
+    if has_request_context() and request.url_rule is not None:
+        return request.url_rule.rule
+    if not has_request_context():
+        return getattr(_background_owner, "endpoint", None) or "background"
+    return "unmatched"
+
+@contextmanager
+def stage_timer(stage):
+    """Time a block of work and record it as a stage of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe("husky_stage_duration_seconds", elapsed, stage=stage, endpoint=_current_endpoint())
+        if has_request_context() and "stage_timings" in g:
+            g.stage_timings[stage] += elapsed
+
+class TimedSessionInterface(SecureCookieSessionInterface):
+    """Cookie session interface that records session load/save time as the session_io stage."""
+    def open_session(self, app, request):
+        with stage_timer("session_io"):
+            return super().open_session(app, request)
+
+    def save_session(self, app, session, response):
+        with stage_timer("session_io"):
+            return super().save_session(app, session, response)
+
+app.session_interface = TimedSessionInterface()
+
+# A client-supplied X-Request-ID is echoed into logs and the response only if it looks like an id
+_REQUEST_ID_PATTERN = re.compile(r"[A-Za-z0-9._-]{1,64}")
+
+@app.before_request
+def start_request_timer():
+    request_id = request.headers.get("X-Request-ID", "")
+    g.request_id = request_id if _REQUEST_ID_PATTERN.fullmatch(request_id) else uuid.uuid4().hex
+    g.request_start = time.perf_counter()
+    g.stage_timings = defaultdict(float)
+
+@app.after_request
+def record_request_metrics(response):
+    if "request_start" not in g:
+        return response
+    elapsed = time.perf_counter() - g.request_start
+    endpoint = _current_endpoint()
+    metrics.observe("husky_request_duration_seconds", elapsed, endpoint=endpoint, method=request.method)
+    metrics.inc("husky_requests_total", endpoint=endpoint, method=request.method, status=response.status_code)
+
+    response.headers["X-Request-ID"] = g.request_id
+    timings = [f"app;dur={elapsed * 1000:.1f}"]
+    timings += [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in g.stage_timings.items()]
+    response.headers["Server-Timing"] = ", ".join(timings)
+
+    log_event("request", method=request.method, path=request.path, endpoint=endpoint,
+              status=response.status_code, duration_ms=round(elapsed * 1000, 1),
+              stages_ms={stage: round(seconds * 1000, 1) for stage, seconds in g.stage_timings.items()})
+    return response
+
+
+LLM_MODEL = os.getenv("LLM_MODEL", "meta-llama/Meta-Llama-3-8B-Instruct-Lite")
+# The hosted "Lite" model shares its vocabulary with Llama 3; this ungated copy downloads without an HF_TOKEN
+TOKENIZER_NAME = os.getenv("TOKENIZER_NAME", "NousResearch/Meta-Llama-3-8B-Instruct")
+TOKENIZER_RETRY_SECONDS = float(os.getenv("TOKENIZER_RETRY_SECONDS", "60"))
+TOKENIZER_RETRY_MAX_SECONDS = 3600
+LLM_INPUT_PRICE_PER_M = float(os.getenv("LLM_INPUT_PRICE_PER_M", "0.1"))
+LLM_OUTPUT_PRICE_PER_M = float(os.getenv("LLM_OUTPUT_PRICE_PER_M", "0.1"))
+
+metrics.describe("husky_llm_calls_total", "counter", "LLM completions by endpoint and model.")
+metrics.describe("husky_llm_tokens_total", "counter", "LLM tokens by endpoint, model and kind (prompt/completion).")
+metrics.describe("husky_llm_cost_usd_total", "counter", "Estimated LLM spend in USD by endpoint and model.")
+
+_tokenizers = {}
+_tokenizer_retries = {}  # name -> (monotonic time of the next attempt, backoff after that one fails)
+_tokenizer_lock = threading.Lock()
+
+def get_tokenizer(name=TOKENIZER_NAME):
+    """Load a tokenizer once per process. Returns None while it cannot be loaded (e.g. offline).
+
+    A failed load is retried after TOKENIZER_RETRY_SECONDS, doubling up to an hour; callers arriving
+    while another thread is loading get None (the character estimate) instead of waiting for it.
+    """
+    tokenizer = _tokenizers.get(name)
+    if tokenizer is not None:
+        return tokenizer
+    retry_at, backoff = _tokenizer_retries.get(name, (0.0, TOKENIZER_RETRY_SECONDS))
+    if time.monotonic() < retry_at or not _tokenizer_lock.acquire(blocking=False):
+        return None
+    try:
+        if name not in _tokenizers:
+            from transformers import AutoTokenizer
+            _tokenizers[name] = AutoTokenizer.from_pretrained(name, token=os.getenv("HF_TOKEN"))
+            _tokenizer_retries.pop(name, None)
+        return _tokenizers[name]
+    except Exception as e:
+        log_event("tokenizer_unavailable", logging.WARNING, tokenizer=name, error=str(e), retry_in_s=backoff)
+        _tokenizer_retries[name] = (time.monotonic() + backoff, min(backoff * 2, TOKENIZER_RETRY_MAX_SECONDS))
+        return None
+    finally:
+        _tokenizer_lock.release()
+
+def count_tokens(text):
+    """Count tokens with the model tokenizer, falling back to ~4 characters per token."""
+    if not text:
+        return 0
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return max(1, len(text) // 4)
+    return len(tokenizer.encode(text, add_special_tokens=False))
+
+def truncate_tokens(text, budget):
+    """Cut text to at most budget tokens, with the same tokenizer fallback as count_tokens."""
+    tokenizer = get_tokenizer()
+    if tokenizer is None:
+        return text[:budget * 4].strip()
+    token_ids = tokenizer.encode(text, add_special_tokens=False)
+    return tokenizer.decode(token_ids[:budget], skip_special_tokens=True).strip()
+
+def get_session_id():
+    """Return a stable id for the current browser session, creating one if needed."""
+    if not has_request_context():
+        return getattr(_background_owner, "session_id", None)
+    if 'sid' not in session:
+        session['sid'] = uuid.uuid4().hex
+    return session['sid']
+
+class TokenLedger:
+    """In-memory token and cost totals per endpoint and per session."""
+    def __init__(self, max_sessions=10000):
+        self.max_sessions = max_sessions
+        self._lock = threading.Lock()
+        self._by_endpoint = defaultdict(self._empty)
+        self._by_session = OrderedDict()
+
+    @staticmethod
+    def _empty():
+        return {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0}
+
+    @staticmethod
+    def _add(totals, prompt_tokens, completion_tokens, cost):
+        totals["calls"] += 1
+        totals["prompt_tokens"] += prompt_tokens
+        totals["completion_tokens"] += completion_tokens
+        totals["cost_usd"] += cost
+
+    def record(self, endpoint, session_id, prompt_tokens, completion_tokens, cost):
+        with self._lock:
+            self._add(self._by_endpoint[endpoint], prompt_tokens, completion_tokens, cost)
+            if session_id:
+                totals = self._by_session.pop(session_id, None) or self._empty()
+                self._add(totals, prompt_tokens, completion_tokens, cost)
+                self._by_session[session_id] = totals
+                # Keep memory bounded by evicting the least recently active sessions
+                while len(self._by_session) > self.max_sessions:
+                    self._by_session.popitem(last=False)
+
+    def session_totals(self, session_id):
+        with self._lock:
+            return dict(self._by_session.get(session_id) or self._empty())
+
+    def endpoint_totals(self):
+        with self._lock:
+            return {endpoint: dict(totals) for endpoint, totals in self._by_endpoint.items()}
+
+token_ledger = TokenLedger()
+
+def record_llm_usage(model, prompt, completion, usage=None):
+    """Account prompt/completion tokens for one LLM call, preferring the usage the API reports."""
+    usage = usage or {}
+    prompt_tokens = usage.get("prompt_tokens")
+    completion_tokens = usage.get("completion_tokens")
+    source = "api" if prompt_tokens is not None and completion_tokens is not None else "tokenizer"
+    if prompt_tokens is None:
+        prompt_tokens = count_tokens(prompt)
+    if completion_tokens is None:
+        completion_tokens = count_tokens(completion)
+    cost = (prompt_tokens * LLM_INPUT_PRICE_PER_M + completion_tokens * LLM_OUTPUT_PRICE_PER_M) / 1_000_000
+
+    endpoint = _current_endpoint()
+    token_ledger.record(endpoint, get_session_id(), prompt_tokens, completion_tokens, cost)
+    metrics.inc("husky_llm_calls_total", endpoint=endpoint, model=model)
+    metrics.inc("husky_llm_tokens_total", prompt_tokens, endpoint=endpoint, model=model, kind="prompt")
+    metrics.inc("husky_llm_tokens_total", completion_tokens, endpoint=endpoint, model=model, kind="completion")
+    metrics.inc("husky_llm_cost_usd_total", cost, endpoint=endpoint, model=model)
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "cost_usd": cost, "source": source}
+
+TOGETHER_COMPLETE_URL = os.getenv("TOGETHER_COMPLETE_URL", "https://api.together.xyz/inference")
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "3.05"))
+LLM_READ_TIMEOUT = float(os.getenv("LLM_READ_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "5"))
+
+metrics.describe("husky_llm_retries_total", "counter", "LLM request retries by model and reason.")
+metrics.describe("husky_llm_rejections_total", "counter", "LLM calls failed fast by model and reason (circuit_open, concurrency).")
+metrics.describe("husky_llm_circuit_state", "gauge", "Circuit breaker state per model: 0 closed, 1 half-open, 2 open.")
+metrics.describe("husky_llm_inflight", "gauge", "LLM requests currently in flight per model.")
+
+class LLMError(Exception):
+    """Raised when the LLM upstream cannot produce a completion."""
+
+class CircuitOpenError(LLMError):
+    """Raised without calling the upstream while its circuit breaker is open."""
+
+class _RetryableUpstreamError(LLMError):
+    """Transient upstream failure (throttling or 5xx) that is worth retrying."""
+
+class CircuitBreaker:
+    """Opens after consecutive failures, then lets a single probe through once the reset timeout has passed."""
+    CLOSED, HALF_OPEN, OPEN = 0, 1, 2
+
+    def __init__(self, name, failure_threshold=LLM_BREAKER_FAILURES, reset_timeout=LLM_BREAKER_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+
+    def _set_state(self, state):
+        self._state = state
+        metrics.set_gauge("husky_llm_circuit_state", state, model=self.name)
+
+    def allow(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._set_state(self.HALF_OPEN)
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state != self.CLOSED:
+                self._set_state(self.CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                if self._state != self.OPEN:
+                    log_event("llm_circuit_open", logging.WARNING, model=self.name, failures=self._failures)
+                self._set_state(self.OPEN)
+
+class TogetherClient:
+    """Together completion client with timeouts, bounded retries, a circuit breaker and a concurrency cap per model."""
+    RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+    def __init__(self, api_key, url=TOGETHER_COMPLETE_URL, connect_timeout=LLM_CONNECT_TIMEOUT,
+                 read_timeout=LLM_READ_TIMEOUT, max_retries=LLM_MAX_RETRIES, max_concurrency=LLM_MAX_CONCURRENCY,
+                 queue_timeout=LLM_QUEUE_TIMEOUT):
+        self.api_key = api_key
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._http = requests.Session()
+        self._lock = threading.Lock()
+        self._breakers = {}
+        self._slots = {}
+
+    def _upstream(self, model):
+        with self._lock:
+            if model not in self._breakers:
+                self._breakers[model] = CircuitBreaker(model)
+                self._slots[model] = threading.BoundedSemaphore(self.max_concurrency)
+            return self._breakers[model], self._slots[model]
+
+    @staticmethod
+    def _backoff(attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), LLM_BACKOFF_MAX)
+            except ValueError:
+                pass
+        # Full jitter keeps synchronized clients from retrying in lockstep
+        return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * 2 ** attempt))
+
+    def complete(self, prompt, model, **params):
+        """POST a completion request and return the decoded JSON response."""
+        breaker, slots = self._upstream(model)
+        with stage_timer("llm_queue"):
+            acquired = slots.acquire(timeout=self.queue_timeout)
+        if not acquired:
+            metrics.inc("husky_llm_rejections_total", model=model, reason="concurrency")
+            raise LLMError(f"Too many concurrent requests to {model}")
+        if not breaker.allow():
+            slots.release()
+            metrics.inc("husky_llm_rejections_total", model=model, reason="circuit_open")
+            raise CircuitOpenError(f"Circuit open for {model}")
+
+        metrics.add_gauge("husky_llm_inflight", 1, model=model)
+        try:
+            last_error = None
+            for attempt in range(self.max_retries + 1):
+                retry_after = None
+                try:
+                    response = self._http.post(
+                        self.url,
+                        json={"model": model, "prompt": prompt, **params},
+                        headers={"Authorization": f"Bearer {self.api_key}"},
+                        timeout=self.timeout,
+                    )
+                    if response.status_code in self.RETRYABLE_STATUS:
+                        retry_after = response.headers.get("Retry-After")
+                        raise _RetryableUpstreamError(f"HTTP {response.status_code}")
+                    if response.status_code >= 400:
+                        # Client errors (bad key, bad request) will not succeed on retry
+                        # and say nothing about upstream health
+                        breaker.record_success()
+                        raise LLMError(f"HTTP {response.status_code}: {response.text[:200]}")
+                    try:
+                        data = response.json()
+                    except ValueError:
+                        breaker.record_failure()
+                        raise LLMError("Upstream returned a non-JSON response")
+                    breaker.record_success()
+                    return data
+                except (requests.RequestException, _RetryableUpstreamError) as e:
+                    last_error = e
+                    if attempt == self.max_retries:
+                        break
+                    metrics.inc("husky_llm_retries_total", model=model, reason=type(e).__name__)
+                    time.sleep(self._backoff(attempt, retry_after))
+            breaker.record_failure()
+            raise LLMError(f"LLM request failed after {self.max_retries + 1} attempts: {last_error}")
+        finally:
+            metrics.add_gauge("husky_llm_inflight", -1, model=model)
+            slots.release()
+
+llm_client = TogetherClient(your_api_key)
+
+LOCAL_LLM_MODEL = os.getenv("LOCAL_LLM_MODEL", "Qwen/Qwen2.5-0.5B-Instruct")
+LOCAL_LLM_THREADS = int(os.getenv("LOCAL_LLM_THREADS", "0"))
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "0"))
+LLM_TASKS = ("analysis", "drafting", "evaluation", "follow_ups")
+
+class LLMBackend:
+    """Completion backend interface. complete() returns the generated text and a usage dict (or None)."""
+    name = "base"
+    model = None
+
+    def complete(self, prompt, max_tokens=512, temperature=0.7, top_k=50, top_p=0.7, repetition_penalty=1.1):
+        raise NotImplementedError
+
+class TogetherBackend(LLMBackend):
+    """Hosted completions through the Together API."""
+    name = "together"
+
+    def __init__(self, client, model=LLM_MODEL):
+        self.client = client
+        self.model = model
+
+    def complete(self, prompt, max_tokens=512, temperature=0.7, top_k=50, top_p=0.7, repetition_penalty=1.1):
+        response = self.client.complete(
+            prompt,
+            self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_k=top_k,
+            top_p=top_p,
+            repetition_penalty=repetition_penalty,
         )
+        output = response.get('output') or response
+        return output['choices'][0]['text'], output.get('usage') or response.get('usage')
+
+class LocalTransformersBackend(LLMBackend):
+    """Small instruct model on CPU with int8 dynamic quantization and KV-cache reuse across shared prompt prefixes."""
+    name = "local"
+    MIN_SHARED_PREFIX = 32
+
+    def __init__(self, model=LOCAL_LLM_MODEL, prefix_cache_size=8):
+        self.model = model
+        self._lock = threading.Lock()
+        self._loaded = None
+        # token ids of a previous prompt -> its KV cache, cropped to the prompt length
+        self._prefix_cache = LRUCache(prefix_cache_size)
+
+    def _load(self):
+        if self._loaded is None:
+            import torch
+            from transformers import AutoModelForCausalLM, AutoTokenizer
+            if LOCAL_LLM_THREADS:
+                torch.set_num_threads(LOCAL_LLM_THREADS)
+            tokenizer = AutoTokenizer.from_pretrained(self.model)
+            model = AutoModelForCausalLM.from_pretrained(self.model, torch_dtype=torch.float32)
+            model.eval()
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            self._loaded = (torch, tokenizer, model)
+            log_event("local_llm_loaded", model=self.model)
+        return self._loaded
+
+    def _longest_cached_prefix(self, input_ids):
+        """Find the cached KV state sharing the longest token prefix with input_ids."""
+        best_cache, best_length = None, 0
+        for cached_ids, cache in self._prefix_cache.items():
+            limit = min(len(cached_ids), len(input_ids))
+            mismatches = np.flatnonzero(np.asarray(cached_ids[:limit]) != np.asarray(input_ids[:limit]))
+            shared = int(mismatches[0]) if mismatches.size else limit
+            if shared > best_length:
+                best_cache, best_length = cache, shared
+        return best_cache, best_length
+
+    def complete(self, prompt, max_tokens=512, temperature=0.7, top_k=50, top_p=0.7, repetition_penalty=1.1):
+        with self._lock:
+            torch, tokenizer, model = self._load()
+            chat = tokenizer.apply_chat_template(
+                [{"role": "user", "content": prompt}], tokenize=False, add_generation_prompt=True
+            )
+            input_ids = tokenizer(chat, return_tensors="pt").input_ids
+            ids = tuple(input_ids[0].tolist())
+
+            cached, shared = self._longest_cached_prefix(ids)
+            past_key_values = None
+            if cached is not None and shared >= self.MIN_SHARED_PREFIX:
+                # At least one prompt token must be left for the model to process
+                past_key_values = copy.deepcopy(cached)
+                past_key_values.crop(min(shared, len(ids) - 1))
+
+            with torch.inference_mode():
+                output = model.generate(
+                    input_ids,
+                    attention_mask=torch.ones_like(input_ids),
+                    past_key_values=past_key_values,
+                    max_new_tokens=max_tokens,
+                    do_sample=temperature > 0,
+                    temperature=temperature,
+                    top_k=top_k,
+                    top_p=top_p,
+                    repetition_penalty=repetition_penalty,
+                    return_dict_in_generate=True,
+                )
+            prompt_cache = output.past_key_values
+            prompt_cache.crop(len(ids))
+            self._prefix_cache.set(ids, prompt_cache)
+
+        completion_ids = output.sequences[0][len(ids):]
+        text = tokenizer.decode(completion_ids, skip_special_tokens=True)
+        return text, {"prompt_tokens": len(ids), "completion_tokens": len(completion_ids)}
+
+# The "ANSWER N" headers evaluate_packed writes into its prompt
+_FAKE_PACKED_ANSWER = re.compile(r"^\s*ANSWER (\d+)\s*$", re.MULTILINE)
+
+class FakeBackend(LLMBackend):
+    """Deterministic canned completions for tests and benchmarks; needs no network or model."""
+    name = "fake"
+    model = "fake"
+
+    def __init__(self, latency_ms=FAKE_LLM_LATENCY_MS):
+        self.latency_ms = latency_ms
+
+    def complete(self, prompt, max_tokens=512, temperature=0.7, top_k=50, top_p=0.7, repetition_penalty=1.1):
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return self.completion_text(prompt), None
+
+    @staticmethod
+    def completion_text(prompt):
+        """The canned completion for prompt; benchmarks.stubs serves the same text from its stub upstream."""
+        digest = hashlib.sha256(prompt.encode("utf-8")).digest()
+
+        def scores(offset):
+            clarity, relevance, confidence = (5 + digest[(offset + i) % len(digest)] % 5 for i in range(3))
+            return f"Clarity: {clarity}/10\nRelevance: {relevance}/10\nConfidence: {confidence}/10\n\n"
+
+        packed = _FAKE_PACKED_ANSWER.findall(prompt)
+        if packed:
+            # evaluate_packed prompts get one section per answer, as the real model is asked to write them
+            return "\n\n".join(
+                f"### Answer {number}\n{scores(int(number) * 3)}"
+                "Clear structure and a relevant example. Add a measurable result to make it stronger."
+                for number in packed
+            ) + f"\n[{digest.hex()[:12]}]"
+        # One response that satisfies every other parser in this module
+        return (
+            "**Company Name:**\nExample Corp\n\n"
+            "**Position Title:**\nSoftware Engineer\n\n"
+            "**Key Company Values:**\n- Customer focus\n- Ownership\n\n"
+            "**Essential Technical Skills:**\n- Python\n- Distributed systems\n\n"
+            "**Necessary Soft Skills:**\n- Communication\n- Teamwork\n\n"
+            "**Summary of Key Job Duties:**\n- Build and operate services\n\n"
+            f"{scores(0)}"
+            "1. Can you walk me through the technical decisions you made?\n"
+            "2. How did you measure the impact of your work?\n"
+            "3. What would you do differently next time?\n"
+            f"[{digest.hex()[:12]}]"
+        )
+
+class BackendRouter:
+    """Picks the LLM backend per task from LLM_BACKEND_<TASK>, falling back to LLM_BACKEND."""
+    FACTORIES = {
+        "together": lambda: TogetherBackend(llm_client),
+        "local": LocalTransformersBackend,
+        "fake": FakeBackend,
+    }
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._instances = {}
+        default = os.getenv("LLM_BACKEND", "together")
+        self.routes = {task: os.getenv(f"LLM_BACKEND_{task.upper()}", default) for task in LLM_TASKS}
+        self.default = default
+
+    def for_task(self, task=None):
+        name = self.routes.get(task, self.default)
+        with self._lock:
+            if name not in self._instances:
+                if name not in self.FACTORIES:
+                    raise ValueError(f"Unknown LLM backend: {name}")
+                self._instances[name] = self.FACTORIES[name]()
+            return self._instances[name]
+
+llm_backends = BackendRouter()
+
+LLM_SINGLEFLIGHT_DIR = os.getenv("LLM_SINGLEFLIGHT_DIR", "")
+LLM_SINGLEFLIGHT_TTL = float(os.getenv("LLM_SINGLEFLIGHT_TTL", "30"))
+
+metrics.describe("husky_llm_coalesced_total", "counter", "LLM calls served by another in-flight identical call, by scope (thread, process).")
+
+class _FlightCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key so only one does the work and every waiter gets its result.
+
+    Within a process waiters block on the leader's event. When lock_dir is set, leaders in different
+    worker processes also serialize on a file lock and reuse a result another worker wrote in the last
+    result_ttl seconds.
+    """
+    PRUNE_EVERY = 100
+
+    def __init__(self, lock_dir="", result_ttl=LLM_SINGLEFLIGHT_TTL):
+        self.lock_dir = lock_dir
+        self.result_ttl = result_ttl
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._writes = 0
+
+    def do(self, key, fn, cacheable=lambda result: True):
+        """Run fn() once per key at a time. Returns (result, shared) where shared means another caller did the work.
+
+        Only results that pass cacheable(result) are written for other workers to reuse.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _FlightCall()
+
+        if not leader:
+            call.done.wait()
+            metrics.inc("husky_llm_coalesced_total", scope="thread")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result, shared = self._lead(key, fn, cacheable)
+            return call.result, shared
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _lead(self, key, fn, cacheable):
+        if not self.lock_dir:
+            return fn(), False
+
+        from filelock import FileLock
+        os.makedirs(self.lock_dir, exist_ok=True)
+        result_path = os.path.join(self.lock_dir, f"{key}.json")
+        with FileLock(f"{result_path}.lock"):
+            try:
+                if time.time() - os.path.getmtime(result_path) < self.result_ttl:
+                    with open(result_path) as f:
+                        result = json.load(f)
+                    metrics.inc("husky_llm_coalesced_total", scope="process")
+                    return result, True
+            except (OSError, ValueError):
+                pass
+
+            result = fn()
+            if not cacheable(result):
+                return result, False
+            temp_path = f"{result_path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as f:
+                json.dump(result, f)
+            os.replace(temp_path, result_path)
+
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune()
+        return result, False
+
+    def _prune(self):
+        """Delete expired results, and lock files that no call could still be holding."""
+        now = time.time()
+        lock_ttl = max(self.result_ttl, 600)
+        for name in os.listdir(self.lock_dir):
+            path = os.path.join(self.lock_dir, name)
+            ttl = lock_ttl if name.endswith(".lock") else self.result_ttl
+            try:
+                if now - os.path.getmtime(path) > ttl:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+llm_singleflight = SingleFlight(LLM_SINGLEFLIGHT_DIR)
+
+LLM_SHORT_REPLY = "The LLM response was too short or empty. Please try again with more detailed input."
+LLM_UNAVAILABLE_REPLY = "The AI service is temporarily unavailable. Please try again in a minute."
+LLM_ERROR_REPLY = "An error occurred while generating content. Please check your API key and try again."
+
+def is_short_completion(content):
+    """True for completions prompt_llm replaces with LLM_SHORT_REPLY."""
+    return not content or len(content.strip()) < 10
 
-        content = response['output']['choices'][0]['text']
+def is_llm_fallback(text):
+    """True if text is one of prompt_llm's canned replies rather than model output."""
+    return text in (LLM_SHORT_REPLY, LLM_UNAVAILABLE_REPLY, LLM_ERROR_REPLY)
 
-        if not content or len(content.strip()) < 10:
-            print(f"Warning: LLM returned empty or very short response: '{content}'")
-            return "The LLM response was too short or empty. Please try again with more detailed input."
+class PipelineCancelled(Exception):
+    """Raised in a speculative pipeline stage whose pipeline was superseded, instead of calling the LLM."""
+
+# The cancel event of the pipeline stage running on this thread, if any
+_pipeline_stage = threading.local()
+
+def check_pipeline_cancelled():
+    cancelled = getattr(_pipeline_stage, "cancelled", None)
+    if cancelled is not None and cancelled.is_set():
+        raise PipelineCancelled()
+
+def prompt_llm(prompt, show_cost=True, task=None, max_tokens=512):
+    """Function to send prompt to the LLM backend configured for the task."""
+    check_pipeline_cancelled()
+    backend = llm_backends.for_task(task)
+    model = backend.model
+    params = dict(max_tokens=max_tokens, temperature=0.7, top_k=50, top_p=0.7, repetition_penalty=1.1)
+    flight_key = text_hash(backend.name, model, json.dumps(params, sort_keys=True), prompt)
+
+    try:
+        with stage_timer("llm"):
+            (content, usage), shared = llm_singleflight.do(
+                flight_key, lambda: list(backend.complete(prompt, **params)),
+                # Other workers must not be served an empty or truncated completion for the whole TTL
+                cacheable=lambda result: not is_short_completion(result[0]),
+            )
+
+        # Coalesced callers spent no tokens of their own
+        if not shared:
+            accounting = record_llm_usage(model, prompt, content or "", usage)
+            if show_cost:
+                log_event("llm_usage", model=model, backend=backend.name, task=task, **accounting)
+
+        if is_short_completion(content):
+            log_event("llm_short_response", logging.WARNING, model=model, content=content)
+            return LLM_SHORT_REPLY
         return content.strip()
+    except CircuitOpenError as e:
+        log_event("llm_unavailable", logging.WARNING, model=model, error=str(e))
+        return LLM_UNAVAILABLE_REPLY
     except Exception as e:
-        print(f"Error calling LLM API: {str(e)}")
-        return "An error occurred while generating content. Please check your API key and try again."
+        log_event("llm_error", logging.ERROR, model=model, backend=backend.name, error=str(e))
+        return LLM_ERROR_REPLY
 
-class Analyzer:
+def run_parallel(fn, args_list, max_workers):
+    """Map fn over args_list with bounded parallelism, keeping the request context for accounting."""
+    if len(args_list) <= 1 or max_workers <= 1:
+        return [fn(*args) for args in args_list]
+    if has_request_context():
+        # Each worker thread needs its own copy of the request context, taken here in the request thread
+        calls = [copy_current_request_context(functools.partial(fn, *args)) for args in args_list]
+    else:
+        calls = [functools.partial(fn, *args) for args in args_list]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as pool:
+        futures = [pool.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+class PromptTemplate:
+    """A versioned prompt laid out as a static instruction block followed by labelled variable sections.
+
+    Keeping everything that never changes at the front lets upstream prefix caching (and the local
+    backend's KV cache) reuse it; variable sections are ordered from most to least stable.
+    """
+    def __init__(self, name, version, instructions, fields, footer=""):
+        self.name = name
+        self.version = version
+        self.fields = tuple(fields)
+        # Compiled once: the prefix is a finished string and each section header is preformatted
+        self.prefix = textwrap.dedent(instructions).strip() + "\n\n"
+        self._headers = tuple(f"{label}:\n" for label, _ in self.fields)
+        self.footer = f"\n\n{footer.strip()}" if footer else ""
+
+    # Counted on first use: the tokenizer is too slow to load at import time
+    @functools.cached_property
+    def prefix_tokens(self):
+        return count_tokens(self.prefix)
+
+    @functools.cached_property
+    def footer_tokens(self):
+        return count_tokens(self.footer)
+
+    @property
+    def id(self):
+        return f"{self.name}@v{self.version}"
+
+    def render(self, **values):
+        sections = [header + str(values[key]).strip() for header, (_, key) in zip(self._headers, self.fields)]
+        return self.prefix + "\n\n".join(sections) + self.footer
+
+class PromptRegistry:
+    """Named, versioned prompt templates, compiled once at startup."""
     def __init__(self):
-        self.encoder = SentenceTransformer("all-MiniLM-L6-v2")
+        self._templates = {}
 
-    def parse_job_info(self, job_description, company_values):
-        """Extracts key insights and fills relevant fields."""
-        prompt = f"""
+    def register(self, template):
+        self._templates[template.name] = template
+        return template
+
+    def record_sizes(self):
+        """Export the static token count of every template (first call loads the tokenizer)."""
+        for template in self._templates.values():
+            metrics.set_gauge("husky_prompt_template_tokens", template.prefix_tokens + template.footer_tokens,
+                              template=template.name, version=template.version)
+
+    def get(self, name):
+        return self._templates[name]
+
+    def render(self, name, **values):
+        return self._templates[name].render(**values)
+
+    def __iter__(self):
+        return iter(self._templates.values())
+
+metrics.describe("husky_prompt_template_tokens", "gauge", "Tokens in the static part of each prompt template.")
+
+PROMPTS = PromptRegistry()
+
+PROMPTS.register(PromptTemplate(
+    "parse_job_info", 1,
+    """
         SYSTEM: You are an expert career coach and interviewer with over 30 years of experience in the tech industry. Your task is to thoroughly analyze the job description and company values to extract and classify all relevant information.
 
         INSTRUCTIONS:
@@ -113,29 +1080,220 @@ class Analyzer:
 
         **Position Title:**
         [position title]
-        
+
         **Key Company Values:**
         - [value 1]
         - [value 2]
-        
+
         **Essential Technical Skills:**
         - [skill 1]
         - [skill 2]
-        
+
         **Necessary Soft Skills:**
         - [skill 1]
         - [skill 2]
-        
+
         **Summary of Key Job Duties:**
         - [duty 1]
         - [duty 2]
 
         Keep each bullet point concise (under 10 words).
+    """,
+    fields=[("JOB DESCRIPTION", "job_description"), ("COMPANY VALUES", "company_values")],
+))
 
-        JOB DESCRIPTION: {job_description}
-        COMPANY VALUES: {company_values}
-        """
-        response = prompt_llm(prompt)
+PROMPTS.register(PromptTemplate(
+    "generate_answer", 1,
+    """
+        SYSTEM: You are a professional interview coach and writer with over 30 years of experience in the tech industry. Draft a strong, structured answer to get this user hired by a top tech company, based on the following inputs:
+
+        INSTRUCTIONS:
+        - Ensure clarity and logical flow.
+        - Incorporate company values where relevant.
+        - Highlight technical and soft skills from the job description.
+        - Use Amazon Leadership Principles to guide the answer.
+        - Use user's voice answer, experience and skills in the resume to answer the question.
+        - Use the situation, task, action, and result (STAR) method to structure the answer.
+        - Improve conciseness while maintaining completeness.
+        - Maintain a confident and positive tone.
+        - Keep the answer in 90 seconds to 2 minutes long.
+        - If possible, use the same language as the user's voice answer.
+        - If there is no information, just output "Not found".
+    """,
+    fields=[
+        ("COMPANY INFO", "company_info"),
+        ("JOB DESCRIPTION", "job_description"),
+        ("USER RESUME", "resume"),
+        ("QUESTION", "question"),
+        ("USER VOICE ANSWER", "voice_answer"),
+    ],
+))
+
+PROMPTS.register(PromptTemplate(
+    "answer_skeleton", 1,
+    """
+        SYSTEM: You are a professional interview coach with over 30 years of experience in the tech industry. Before the candidate has answered, prepare a model answer to a standard interview question for this job, grounded in their resume.
+
+        INSTRUCTIONS:
+        - Use the situation, task, action, and result (STAR) method where the question calls for an example.
+        - Draw on real experience and skills from the resume that match the job; do not invent employers or numbers.
+        - Put details the candidate should adjust to their own story in [square brackets].
+        - Keep the answer in 90 seconds to 2 minutes long, with a confident and positive tone.
+        - Also write one sentence of advice on what this interviewer will listen for in the answer.
+
+        FORMAT YOUR RESPONSE EXACTLY AS FOLLOWS:
+        HINT: [one sentence of advice]
+        ANSWER:
+        [model answer]
+    """,
+    fields=[
+        ("JOB SUMMARY", "job_description"),
+        ("USER RESUME", "resume"),
+        ("QUESTION", "question"),
+    ],
+))
+
+PROMPTS.register(PromptTemplate(
+    "personalize_answer", 1,
+    """
+        SYSTEM: You are a professional interview coach. Rewrite the prepared model answer so it tells the candidate's own story from their answer.
+
+        INSTRUCTIONS:
+        - Keep the structure and strengths of the prepared answer.
+        - Replace bracketed placeholders and generic details with specifics from the candidate's answer.
+        - Do not invent facts that appear in neither text.
+        - If possible, use the same language as the candidate's answer.
+        - Output only the rewritten answer, 90 seconds to 2 minutes long.
+    """,
+    fields=[
+        ("QUESTION", "question"),
+        ("PREPARED ANSWER", "skeleton"),
+        ("USER VOICE ANSWER", "voice_answer"),
+    ],
+))
+
+PROMPTS.register(PromptTemplate(
+    "evaluate_answer", 2,
+    """
+        SYSTEM: You are an experienced interviewer in the tech industry for over 30 years. Also you are an expert evaluator for interview responses. Assess the answer based on the following criteria:
+
+        INSTRUCTIONS:
+        - Clarity: Is the response structured and easy to understand?
+        - Relevance: Does it address the job's required skills and reflect company values?
+        - Confidence: Does the tone convey certainty and professionalism?
+        - Consider that the user could be nervous, so don't be too strict.
+        - Consider that the user is not a native English speaker, so don't be too strict.
+        - Provide constructive feedback and a score out of 10 for each category.
+        - Always give some positive feedback at the begining, then give some feedback on what to improve.
+        - Use a friendly and professional tone and encourage the user to do better.
+        - Keep the feedback concise and to the point.
+        - Keep the feedback in 150 words to 250 words.
+        - When delivery metrics are available, use them (speaking rate, pauses, filler words, pitch and loudness variation) to judge confidence, and mention the most useful one in the feedback.
+    """,
+    fields=[
+        ("JOB DESCRIPTION", "job_description"),
+        ("COMPANY VALUES", "company_values"),
+        ("USER VOICE ANSWER", "voice_answer"),
+        ("DELIVERY METRICS", "speech_metrics"),
+    ],
+))
+
+PROMPTS.register(PromptTemplate(
+    "evaluate_packed", 1,
+    """
+        SYSTEM: You are an experienced interviewer in the tech industry for over 30 years. Also you are an expert evaluator for interview responses. Assess each of the numbered answers below separately, based on the following criteria:
+
+        INSTRUCTIONS:
+        - Clarity: Is the response structured and easy to understand?
+        - Relevance: Does it address the question and the job's required skills and reflect company values?
+        - Confidence: Does the tone convey certainty and professionalism?
+        - Consider that the user could be nervous and is not a native English speaker, so don't be too strict.
+        - Start each evaluation with a line "### Answer N" where N is the answer number.
+        - Under it, give "Clarity: X/10", "Relevance: X/10" and "Confidence: X/10" on separate lines.
+        - Then give friendly, constructive feedback in 60 to 100 words: something positive first, then what to improve.
+    """,
+    fields=[
+        ("JOB DESCRIPTION", "job_description"),
+        ("COMPANY VALUES", "company_values"),
+        ("ANSWERS", "answers"),
+    ],
+))
+
+PROMPTS.register(PromptTemplate(
+    "extract_scores", 1,
+    """
+        SYSTEM: You read interview feedback and report the scores it gives.
+
+        INSTRUCTIONS:
+        - Return only a JSON object with an integer score from 1 to 10 for each requested criterion, e.g. {"clarity": 7}.
+        - If the feedback does not state a score for a criterion, infer it from the feedback.
+        - Do not write anything else.
+    """,
+    fields=[("CRITERIA", "criteria"), ("FEEDBACK", "feedback")],
+))
+
+PROMPTS.register(PromptTemplate(
+    "generate_follow_up_questions", 1,
+    """
+        SYSTEM: You are an expert interviewer with 30 years of experience hiring for top tech companies. Your task is to generate 2-3 thoughtful follow-up questions based on a candidate's interview answer.
+
+        INSTRUCTIONS:
+        - Analyze the candidate's answer for areas that could be explored further
+        - Look for opportunities to dive deeper into their experience, skills, or thought process
+        - Consider the job requirements and the candidate's resume when crafting questions
+        - Generate questions that allow the candidate to elaborate on strengths
+        - Include questions that help address potential weaknesses in a constructive way
+        - Each question should be specific and related to the candidate's response
+        - Keep questions concise and direct
+        - Format the output with a numbered list (1., 2., 3.)
+    """,
+    fields=[
+        ("JOB DESCRIPTION", "job_description"),
+        ("RESUME", "resume"),
+        ("INTERVIEW QUESTION", "question"),
+        ("CANDIDATE'S ANSWER", "answer"),
+    ],
+    footer="FOLLOW-UP QUESTIONS (generate exactly 2-3):",
+))
+
+PROMPTS.register(PromptTemplate(
+    "more_follow_up_questions", 1,
+    """
+        SYSTEM: You are an expert interviewer. Write additional follow-up questions for a candidate's interview answer.
+
+        INSTRUCTIONS:
+        - Each question must explore a different angle from every question under ALREADY ASKED
+        - Each question should be specific to the candidate's answer
+        - Keep questions concise and direct
+        - Format the output as a numbered list (1., 2., ...) and write nothing else
+    """,
+    fields=[
+        ("INTERVIEW QUESTION", "question"),
+        ("CANDIDATE'S ANSWER", "answer"),
+        ("ALREADY ASKED", "asked"),
+        ("NUMBER OF QUESTIONS", "count"),
+    ],
+    footer="NEW FOLLOW-UP QUESTIONS:",
+))
+
+class Analyzer:
+    def __init__(self):
+        self._encoder = None
+        self._encoder_lock = threading.Lock()
+
+    @property
+    def encoder(self):
+        """The MiniLM sentence encoder, loaded on first use rather than at startup."""
+        if self._encoder is None:
+            with self._encoder_lock:
+                if self._encoder is None:
+                    self._encoder = sentence_transformers.SentenceTransformer("all-MiniLM-L6-v2")
+        return self._encoder
+
+    def parse_job_info(self, job_description, company_values):
+        """Extracts key insights and fills relevant fields."""
+        prompt = PROMPTS.render("parse_job_info", job_description=job_description, company_values=company_values)
+        response = prompt_llm(prompt, task="analysis")
         
         # Add new regex patterns for company name and position title
         company_name_match = re.search(r"\*\*Company Name:\*\*(.*?)\*\*Position Title:\*\*", response, re.DOTALL)
@@ -162,142 +1320,929 @@ class Analyzer:
         }
         return parsed_info
 
+_SKELETON_HINT = re.compile(r"^\s*\**HINT:?\**:?\s*(.+)$", re.MULTILINE | re.IGNORECASE)
+_SKELETON_ANSWER = re.compile(r"^\s*\**ANSWER:?\**:?\s*(.+)", re.MULTILINE | re.IGNORECASE | re.DOTALL)
+
+class AnswerSkeleton:
+    """A model answer prepared before the candidate answers, plus a hint tailored to the job."""
+    def __init__(self, question, text, hint=None):
+        self.question = question
+        self.text = text
+        self.hint = hint
+
 class Drafter:
     def generate_answer(self, question, company_info, job_description, resume, voice_answer):
         """Drafts a model answer based on user inputs."""
-        prompt = f"""
-        SYSTEM: You are a professional interview coach and writer with over 30 years of experience in the tech industry. Draft a strong, structured answer to get this user hired by a top tech company, based on the following inputs:
-        
-        INSTRUCTIONS:
-        - Ensure clarity and logical flow.
-        - Incorporate company values where relevant.
-        - Highlight technical and soft skills from the job description.
-        - Use Amazon Leadership Principles to guide the answer.
-        - Use user's voice answer, experience and skills in the resume to answer the question.
-        - Use the situation, task, action, and result (STAR) method to structure the answer.
-        - Improve conciseness while maintaining completeness.
-        - Maintain a confident and positive tone.
-        - Keep the answer in 90 seconds to 2 minutes long.
-        - If possible, use the same language as the user's voice answer.
-        - If there is no information, just output "Not found".
-        
-        QUESTION: {question}
-        COMPANY INFO: {company_info}
-        JOB DESCRIPTION: {job_description}
-        USER RESUME: {resume}
-        USER VOICE ANSWER: {voice_answer}
-        """
-        return prompt_llm(prompt)
+        prompt = PROMPTS.render(
+            "generate_answer",
+            company_info=company_info,
+            job_description=job_description,
+            resume=resume,
+            question=question,
+            voice_answer=voice_answer,
+        )
+        return prompt_llm(prompt, task="drafting")
+
+    def draft_skeleton(self, question, job_description, resume):
+        """Draft an answer-independent model answer and a tailored hint for a standard question (None on failure)."""
+        prompt = PROMPTS.render("answer_skeleton", job_description=job_description, resume=resume, question=question)
+        response = prompt_llm(prompt, task="drafting")
+        if is_llm_fallback(response):
+            return None
+        hint_match = _SKELETON_HINT.search(response)
+        answer_match = _SKELETON_ANSWER.search(response)
+        if answer_match:
+            answer = answer_match.group(1)
+        else:
+            answer = _SKELETON_HINT.sub("", response)
+        return AnswerSkeleton(question, answer.strip(), hint_match.group(1).strip() if hint_match else None)
+
+    def personalize_answer(self, question, skeleton, voice_answer):
+        """Adapt a pre-generated model answer to the candidate's own answer with a much smaller prompt."""
+        prompt = PROMPTS.render("personalize_answer", question=question, skeleton=skeleton, voice_answer=voice_answer)
+        return prompt_llm(prompt, task="drafting")
+
+EVAL_BATCH_MAX_ITEMS = int(os.getenv("EVAL_BATCH_MAX_ITEMS", "50"))
+EVAL_BATCH_CONCURRENCY = int(os.getenv("EVAL_BATCH_CONCURRENCY", str(LLM_MAX_CONCURRENCY)))
+EVAL_PACK_TOKEN_BUDGET = int(os.getenv("EVAL_PACK_TOKEN_BUDGET", "900"))
+EVAL_PACK_MAX_ANSWERS = int(os.getenv("EVAL_PACK_MAX_ANSWERS", "4"))
+
+SCORE_CRITERIA = ("clarity", "relevance", "confidence")
+# Tolerates "Clarity: 8/10", "**Clarity:** 8 / 10", "Clarity - 8 out of 10", "Clarity score (8/10)"
+SCORE_PATTERN = re.compile(
+    r"\b(clarity|relevance|confidence)\b[^\d\n]{0,24}?(\d{1,2}(?:\.\d+)?)\s*(?:/|out\s+of)\s*10\b",
+    re.IGNORECASE,
+)
+SCORE_JSON_PATTERN = re.compile(r"\{[^{}]*\}")
+
+metrics.describe("husky_score_reasks_total", "counter", "Score-only follow-up prompts sent when evaluator output lacked scores, by outcome.")
+
+def extract_scores(text):
+    """Single pass over evaluator output. Returns {criterion: score} for the criteria it found."""
+    found = {}
+    for match in SCORE_PATTERN.finditer(text or ""):
+        criterion = match.group(1).lower()
+        if criterion not in found:
+            found[criterion] = min(10, max(0, int(float(match.group(2)) + 0.5)))
+    if len(found) < len(SCORE_CRITERIA):
+        # JSON replies, e.g. from the score-only re-ask
+        for candidate in SCORE_JSON_PATTERN.findall(text or ""):
+            try:
+                values = json.loads(candidate)
+            except ValueError:
+                continue
+            if not isinstance(values, dict):
+                continue
+            for key, value in values.items():
+                criterion = str(key).lower()
+                if criterion in SCORE_CRITERIA and criterion not in found and isinstance(value, (int, float)):
+                    found[criterion] = min(10, max(0, int(value + 0.5)))
+    return found
 
 class Evaluator:
-    def evaluate_answer(self, voice_answer, job_description, company_values):
+    def evaluate_answer(self, voice_answer, job_description, company_values, speech_metrics=None):
         """Evaluates the user's voice answer based on clarity, relevance, and confidence."""
-        prompt = f"""
-        SYSTEM: You are an experienced interviewer in the tech industry for over 30 years. Also you are an expert evaluator for interview responses. Assess the answer based on the following criteria:
+        prompt = PROMPTS.render(
+            "evaluate_answer",
+            job_description=job_description,
+            company_values=company_values,
+            voice_answer=voice_answer,
+            speech_metrics=format_speech_metrics(speech_metrics),
+        )
+        response = prompt_llm(prompt, task="evaluation")
+        if is_llm_fallback(response):
+            return self.parse_scores(""), response
+
+        found = extract_scores(response)
+        if len(found) < len(SCORE_CRITERIA):
+            found = self.rescore(response, found)
+        return {criterion: found.get(criterion, 0) for criterion in SCORE_CRITERIA}, response
+
+    def parse_scores(self, response):
+        """Extract the clarity, relevance and confidence scores from evaluator output (0 when missing)."""
+        found = extract_scores(response)
+        return {criterion: found.get(criterion, 0) for criterion in SCORE_CRITERIA}
+
+    def rescore(self, feedback, found):
+        """Ask only for the scores the feedback is missing instead of re-running the whole evaluation."""
+        missing = [criterion for criterion in SCORE_CRITERIA if criterion not in found]
+        prompt = PROMPTS.render("extract_scores", criteria=", ".join(missing), feedback=feedback)
+        response = prompt_llm(prompt, task="evaluation", max_tokens=48)
+        recovered = extract_scores(response)
+        found = dict(found, **{criterion: recovered[criterion] for criterion in missing if criterion in recovered})
+        outcome = "recovered" if all(criterion in found for criterion in SCORE_CRITERIA) else "failed"
+        metrics.inc("husky_score_reasks_total", outcome=outcome)
+        return found
+
+    def evaluate_packed(self, pairs, job_description, company_values):
+        """Evaluates several short (question, answer) pairs in one prompt. Returns None for answers it could not parse."""
+        answers_block = "\n\n".join(
+            f"ANSWER {number}\nQUESTION: {question}\nUSER VOICE ANSWER: {answer}"
+            for number, (question, answer) in enumerate(pairs, start=1)
+        )
+        prompt = PROMPTS.render(
+            "evaluate_packed",
+            job_description=job_description,
+            company_values=company_values,
+            answers=answers_block,
+        )
+        response = prompt_llm(prompt, task="evaluation")
+
+        sections = {}
+        for match in re.finditer(r"###\s*Answer\s*(\d+)(.*?)(?=###\s*Answer\s*\d+|\Z)", response, re.DOTALL | re.IGNORECASE):
+            sections[int(match.group(1))] = match.group(2).strip()
+
+        results = []
+        for number in range(1, len(pairs) + 1):
+            section = sections.get(number)
+            found = extract_scores(section) if section else {}
+            complete = len(found) == len(SCORE_CRITERIA)
+            results.append((self.parse_scores(section), section) if complete else None)
+        return results
+
+    def evaluate_batch(self, items, job_description, company_values, max_workers=EVAL_BATCH_CONCURRENCY):
+        """Evaluates many (question, answer) pairs: dedupes them, packs short answers together and runs prompts in parallel.
+
+        Returns one {"scores", "feedback"} dict per input item, in input order.
+        """
+        unique, index_of = [], {}
+        for question, answer in items:
+            key = (" ".join(question.split()).lower(), " ".join(answer.split()).lower())
+            if key not in index_of:
+                index_of[key] = len(unique)
+                unique.append((question, answer))
+
+        # Greedily pack short answers up to the token budget; long answers get a prompt of their own
+        groups, current, current_tokens = [], [], 0
+        for position, (question, answer) in enumerate(unique):
+            tokens = count_tokens(question) + count_tokens(answer)
+            if tokens > EVAL_PACK_TOKEN_BUDGET // 2:
+                groups.append([position])
+                continue
+            if current and (current_tokens + tokens > EVAL_PACK_TOKEN_BUDGET or len(current) >= EVAL_PACK_MAX_ANSWERS):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(position)
+            current_tokens += tokens
+        if current:
+            groups.append(current)
+
+        def run_group(group):
+            if len(group) > 1:
+                packed = self.evaluate_packed([unique[i] for i in group], job_description, company_values)
+            else:
+                packed = [None]
+            results = []
+            for position, result in zip(group, packed):
+                if result is None:
+                    # Single answers, and packed answers the model skipped, get the full evaluation
+                    result = self.evaluate_answer(unique[position][1], job_description, company_values)
+                results.append(result)
+            return list(zip(group, results))
+
+        unique_results = {}
+        for group_results in run_parallel(run_group, [(group,) for group in groups], max_workers):
+            unique_results.update(group_results)
+
+        batch = []
+        for question, answer in items:
+            key = (" ".join(question.split()).lower(), " ".join(answer.split()).lower())
+            scores, feedback = unique_results[index_of[key]]
+            batch.append({"scores": scores, "feedback": feedback})
+        return batch
+
+FOLLOW_UP_COUNT = 3
+FOLLOW_UP_DEDUPE = os.getenv("FOLLOW_UP_DEDUPE", "1") == "1"
+# Cosine similarity (MiniLM) at which a follow-up counts as a paraphrase of an earlier question
+FOLLOW_UP_SIMILARITY_THRESHOLD = float(os.getenv("FOLLOW_UP_SIMILARITY_THRESHOLD", "0.82"))
+FOLLOW_UP_HISTORY_SIZE = int(os.getenv("FOLLOW_UP_HISTORY_SIZE", "40"))
+FOLLOW_UP_MAX_REFILLS = int(os.getenv("FOLLOW_UP_MAX_REFILLS", "1"))
+_FOLLOW_UP_LINE = re.compile(r"^\s*\d+[.)]\s*(.+?)\s*$")
+
+metrics.describe("husky_follow_up_questions_total", "counter", "Generated follow-up questions by outcome (kept, duplicate_history, duplicate_batch).")
+metrics.describe("husky_follow_up_refills_total", "counter", "Smaller prompts sent to replace follow-ups dropped as near-duplicates.")
+
+class _QuestionHistory:
+    """The most recent questions shown in one session, with their normalized embeddings."""
+    def __init__(self, size):
+        self.size = size
+        self.texts = []
+        self.vectors = None
+
+    def add(self, texts, vectors):
+        if not texts:
+            return
+        self.texts = (self.texts + list(texts))[-self.size:]
+        self.vectors = vectors if self.vectors is None else np.vstack([self.vectors, vectors])
+        self.vectors = self.vectors[-self.size:]
+
+class _AcceptedFollowUps:
+    """Follow-ups kept so far in one generation, with their embeddings and the interview question's."""
+    def __init__(self):
+        self.texts = []
+        self.vectors = []
+        self.question_vector = None
+
+class FollowUpQuestioner:
+    """Generates follow-up questions and drops near-duplicates of questions the session has already seen."""
+    def __init__(self, encoder_provider=None, similarity_threshold=FOLLOW_UP_SIMILARITY_THRESHOLD,
+                 history_size=FOLLOW_UP_HISTORY_SIZE):
+        self._encoder_provider = encoder_provider
+        self.similarity_threshold = similarity_threshold
+        self.history_size = history_size
+        self._history = LRUCache(4096)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _parse(response):
+        """Return (questions, numbered): numbered-list items without their numbers, or the raw lines."""
+        lines = [line.strip() for line in response.strip().split('\n') if line.strip()]
+        questions = [match.group(1) for match in map(_FOLLOW_UP_LINE.match, lines) if match]
+        if questions:
+            return questions, True
+        # If no questions were extracted, return the full response, limited to the usual count
+        return lines[:FOLLOW_UP_COUNT], False
+
+    @staticmethod
+    def _numbered(questions):
+        return [f"{number}. {question}" for number, question in enumerate(questions, 1)]
+
+    def generate_follow_up_questions(self, job_description, resume, question, answer, session_id=None, record=True):
+        """Generates insightful follow-up questions based on the user's answer.
+
+        With a session id, paraphrases of questions the session has already been shown are dropped. When
+        record is False (speculative prefetch) the result is not added to that history; the caller must
+        call remember() if the questions are shown after all.
+        """
+        prompt = PROMPTS.render(
+            "generate_follow_up_questions",
+            job_description=job_description,
+            resume=resume,
+            question=question,
+            answer=answer,
+        )
         
-        INSTRUCTIONS:
-        - Clarity: Is the response structured and easy to understand?
-        - Relevance: Does it address the job's required skills and reflect company values?
-        - Confidence: Does the tone convey certainty and professionalism?
-        - Consider that the user could be nervous, so don't be too strict.
-        - Consider that the user is not a native English speaker, so don't be too strict.
-        - Provide constructive feedback and a score out of 10 for each category.
-        - Always give some positive feedback at the begining, then give some feedback on what to improve.
-        - Use a friendly and professional tone and encourage the user to do better.
-        - Keep the feedback concise and to the point.
-        - Keep the feedback in 150 words to 250 words.
+        response = prompt_llm(prompt, task="follow_ups")
+        questions, numbered = self._parse(response)
+        if not numbered or is_llm_fallback(response):
+            return questions
+        if not FOLLOW_UP_DEDUPE or self._encoder_provider is None or session_id is None:
+            return self._numbered(questions[:FOLLOW_UP_COUNT])
+        
+        # Refill only what was dropped: the prompt allows 2-3 questions, so 2 unique ones are a full answer
+        target = min(FOLLOW_UP_COUNT, len(questions))
+        accepted = _AcceptedFollowUps()
+        self._novel(session_id, question, questions, target, accepted)
+        for _ in range(FOLLOW_UP_MAX_REFILLS):
+            missing = target - len(accepted.texts)
+            if missing <= 0:
+                break
+            metrics.inc("husky_follow_up_refills_total")
+            self._novel(session_id, question, self._more(session_id, question, answer, missing, accepted.texts),
+                        missing, accepted)
+        if not accepted.texts:
+            # Repeating an earlier question beats showing none
+            return self._numbered(list(dict.fromkeys(questions))[:FOLLOW_UP_COUNT])
+        if record:
+            self._remember(session_id, question, accepted)
+        return self._numbered(accepted.texts)
+
+    def _embed(self, texts):
+        vectors = np.asarray(self._encoder_provider().encode(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms > 0, norms, 1.0)
+
+    def remember(self, session_id, question, questions):
+        """Add questions that were shown to the user (e.g. a prefetched result) to the session history."""
+        if not FOLLOW_UP_DEDUPE or self._encoder_provider is None or session_id is None or not questions:
+            return
+        texts = [match.group(1) if match else line.strip()
+                 for line, match in ((line, _FOLLOW_UP_LINE.match(line)) for line in questions)]
+        accepted = _AcceptedFollowUps()
+        accepted.texts = texts
+        accepted.vectors = list(self._embed(texts))
+        self._remember(session_id, question, accepted)
+
+    def _remember(self, session_id, question, accepted):
+        with self._lock:
+            history = self._history.get(session_id)
+            if history is None:
+                history = _QuestionHistory(self.history_size)
+                self._history.set(session_id, history)
+            if question and question not in history.texts:
+                vector = accepted.question_vector if accepted.question_vector is not None else self._embed([question])[0]
+                history.add([question], vector[None, :])
+            history.add(accepted.texts, np.vstack(accepted.vectors))
+
+    def _more(self, session_id, question, answer, count, kept):
+        """Ask for only the missing questions, without the job description and resume."""
+        with self._lock:
+            history = self._history.get(session_id)
+            asked = history.texts[-10:] if history is not None else []
+        prompt = PROMPTS.render(
+            "more_follow_up_questions",
+            question=question,
+            answer=answer,
+            asked="\n".join(f"- {text}" for text in list(dict.fromkeys(asked + kept))),
+            count=count,
+        )
+        response = prompt_llm(prompt, task="follow_ups", max_tokens=64 * count)
+        if is_llm_fallback(response):
+            return []
+        questions, numbered = self._parse(response)
+        return questions[:count] if numbered else []
+
+    def _novel(self, session_id, question, candidates, limit, accepted):
+        """Move up to limit candidates that are not paraphrases of earlier questions into accepted.
+
+        Candidates are compared with the session history, the interview question, the questions already
+        accepted in this call and one another in a single matrix product. The history is only read here.
+        """
+        if not candidates:
+            return
+        with self._lock:
+            history = self._history.get(session_id)
+            known = history is not None and question in history.texts
+            prior = history.vectors if history is not None and history.vectors is not None else None
+        embed_question = bool(question) and not known and accepted.question_vector is None
+        vectors = self._embed(candidates + ([question] if embed_question else []))
+        candidate_vectors = vectors[:len(candidates)]
+        if embed_question:
+            accepted.question_vector = vectors[-1]
+
+        reference = [block for block in (
+            prior,
+            accepted.question_vector[None, :] if accepted.question_vector is not None and not known else None,
+            np.vstack(accepted.vectors) if accepted.vectors else None,
+        ) if block is not None]
+        seen = sum(len(block) for block in reference)
+        similarity = candidate_vectors @ np.vstack(reference + [candidate_vectors]).T
+        nearest_prior = similarity[:, :seen].max(axis=1) if seen else np.zeros(len(candidates))
+        kept = []
+        for index in range(len(candidates)):
+            if len(kept) >= limit:
+                break
+            if nearest_prior[index] >= self.similarity_threshold:
+                outcome = "duplicate_history"
+            elif kept and similarity[index, [seen + j for j in kept]].max() >= self.similarity_threshold:
+                outcome = "duplicate_batch"
+            else:
+                outcome = "kept"
+                kept.append(index)
+            metrics.inc("husky_follow_up_questions_total", outcome=outcome)
+        accepted.texts.extend(candidates[i] for i in kept)
+        accepted.vectors.extend(candidate_vectors[i] for i in kept)
+
+RESUME_TOKEN_BUDGET = int(os.getenv("RESUME_TOKEN_BUDGET", "600"))
+JOB_DESC_TOKEN_BUDGET = int(os.getenv("JOB_DESC_TOKEN_BUDGET", "400"))
+
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n+")
+
+def format_job_summary(parsed_info):
+    """Render the output of parse_job_info as a compact block for downstream prompts."""
+    return "\n".join([
+        f"Company: {parsed_info.get('company_name', '')}",
+        f"Position: {parsed_info.get('position_title', '')}",
+        f"Company values: {parsed_info.get('company_values', '')}",
+        f"Technical skills: {parsed_info.get('tech_skills', '')}",
+        f"Soft skills: {parsed_info.get('soft_skills', '')}",
+        f"Duties: {parsed_info.get('job_duties', '')}",
+    ])
+
+class ContextBudgeter:
+    """Trims long resumes and job descriptions to a token budget, keeping the sentences most relevant to the question."""
+    def __init__(self, encoder_provider, cache_size=2048):
+        self._encoder_provider = encoder_provider
+        self._cache = LRUCache(cache_size)
+
+    def compress(self, text, query, budget, session_id=None):
+        """Return text unchanged if it fits the budget, otherwise its most query-relevant sentences in original order."""
+        if not text or count_tokens(text) <= budget:
+            return text
+
+        key = (session_id, text_hash(text, query), budget)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        sentences = [part.strip() for part in _SENTENCE_BOUNDARY.split(text) if part and part.strip()]
+        token_counts = [count_tokens(sentence) for sentence in sentences]
+        if query:
+            embeddings = self._encoder_provider().encode([query] + sentences)
+            relevance = sklearn_pairwise.cosine_similarity(embeddings[1:], embeddings[:1]).ravel()
+        else:
+            # Without a query prefer the opening sentences, which usually carry the summary
+            relevance = -np.arange(len(sentences), dtype=float)
+
+        chosen, used = [], 0
+        for index in np.argsort(-relevance):
+            if used + token_counts[index] <= budget:
+                chosen.append(index)
+                used += token_counts[index]
+        if chosen:
+            compressed = " ".join(sentences[index] for index in sorted(chosen))
+        else:
+            # Every sentence is longer than the budget (e.g. a resume without punctuation): keep the start of the best one
+            compressed = truncate_tokens(sentences[int(np.argmax(relevance))], budget)
+
+        self._cache.set(key, compressed)
+        return compressed
+
+class JobProfile:
+    """Structured analysis of one job posting, computed once and shared by downstream prompts."""
+    def __init__(self, key, job_desc_hash, parsed_info):
+        self.key = key
+        self.job_desc_hash = job_desc_hash
+        self.parsed_info = parsed_info
+        self.summary = format_job_summary(parsed_info)
+
+    @property
+    def is_complete(self):
+        """False when the LLM output could not be parsed into any of the sections."""
+        fields = ("company_values", "tech_skills", "soft_skills", "job_duties")
+        return any(self.parsed_info.get(field) != "Not found" for field in fields)
+
+class JobProfileStore:
+    """Memoizes Analyzer.parse_job_info results keyed by the hash of the job description and company info."""
+    def __init__(self, analyzer, max_size=1024):
+        self.analyzer = analyzer
+        self._cache = LRUCache(max_size)
+
+    def get(self, key):
+        return self._cache.get(key) if key else None
+
+    @staticmethod
+    def key_for(job_description, company_values):
+        return text_hash(job_description, company_values)
+
+    def restore(self, job_description, company_values, parsed_info):
+        """Re-seed the cache with a profile parsed earlier, e.g. after eviction or on another worker."""
+        key = self.key_for(job_description, company_values)
+        profile = self._cache.get(key)
+        if profile is None:
+            profile = JobProfile(key, text_hash(job_description), parsed_info)
+            self._cache.set(key, profile)
+        return profile
+
+    def get_or_create(self, job_description, company_values, refresh_incomplete=False):
+        key = self.key_for(job_description, company_values)
+        profile = self._cache.get(key)
+        if profile is None or (refresh_incomplete and not profile.is_complete):
+            parsed_info = self.analyzer.parse_job_info(job_description, company_values)
+            profile = JobProfile(key, text_hash(job_description), parsed_info)
+            self._cache.set(key, profile)
+        return profile
+
+ANSWER_SKELETONS_ENABLED = os.getenv("ANSWER_SKELETONS", "0") == "1"
+ANSWER_SKELETON_QUESTIONS = int(os.getenv("ANSWER_SKELETON_QUESTIONS", "6"))
+ANSWER_SKELETON_WORKERS = int(os.getenv("ANSWER_SKELETON_WORKERS", "2"))
+ANSWER_SKELETON_MAX_PENDING = int(os.getenv("ANSWER_SKELETON_MAX_PENDING", "60"))
+
+metrics.describe("husky_answer_skeletons_total", "counter", "Background model-answer skeleton generations by outcome.")
+metrics.describe("husky_answer_skeleton_pending", "gauge", "Skeleton generations queued or running.")
+metrics.describe("husky_model_answers_total", "counter", "Model answers by source (skeleton, personalized, full).")
+
+def standard_questions(limit=ANSWER_SKELETON_QUESTIONS):
+    """The first standard practice questions, in the order generate_sample_questions presents them."""
+    questions = [q for qs in generate_sample_questions("", "", "").values() for q in qs]
+    return questions[:limit]
+
+class AnswerSkeletonStore:
+    """Model answers for the standard questions, prepared per job profile and resume by a small worker pool.
+
+    Generation starts once a job profile is parsed; /generate-model-answer then serves the prepared
+    answer directly, or personalizes it with a short prompt once the candidate has answered.
+    """
+    def __init__(self, drafter, prepare_context, max_size=4096, workers=ANSWER_SKELETON_WORKERS,
+                 max_pending=ANSWER_SKELETON_MAX_PENDING):
+        self.drafter = drafter
+        self._prepare_context = prepare_context
+        self.max_pending = max_pending
+        self._skeletons = LRUCache(max_size)
+        self._scheduled = LRUCache(max_size)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="skeletons")
+
+    @staticmethod
+    def key_for(profile, resume, question):
+        return (profile.key, text_hash(resume), question)
+
+    def get(self, profile, resume, question):
+        return self._skeletons.get(self.key_for(profile, resume, question)) if profile is not None else None
+
+    def hints(self, profile, resume, questions):
+        """Tailored hints for the questions whose skeletons are ready."""
+        skeletons = (self.get(profile, resume, question) for question in questions)
+        return {skeleton.question: skeleton.hint for skeleton in skeletons if skeleton is not None and skeleton.hint}
+
+    def schedule(self, profile, resume, questions):
+        """Queue generation of the questions that are neither ready nor queued; returns how many were queued.
+
+        Questions left out because the queue is full, or whose generation failed, are picked up by a later call.
+        """
+        if not ANSWER_SKELETONS_ENABLED or profile is None or not profile.is_complete:
+            return 0
+        with self._lock:
+            todo = [q for q in questions
+                    if self.get(profile, resume, q) is None and not self._scheduled.get(self.key_for(profile, resume, q))]
+            todo = todo[:max(0, self.max_pending - self._pending)]
+            if not todo:
+                return 0
+            self._pending += len(todo)
+            for question in todo:
+                self._scheduled.set(self.key_for(profile, resume, question), True)
+            metrics.set_gauge("husky_answer_skeleton_pending", self._pending)
+        for question in todo:
+            self._pool.submit(self._generate, profile, resume, question)
+        log_event("answer_skeletons_scheduled", job_profile=profile.key, questions=len(todo))
+        return len(todo)
+
+    def _generate(self, profile, resume, question):
+        try:
+            job_context, resume_context = self._prepare_context(profile.summary, resume, question, profile)
+            skeleton = self.drafter.draft_skeleton(question, job_context, resume_context)
+            if skeleton is not None and skeleton.text:
+                self._skeletons.set(self.key_for(profile, resume, question), skeleton)
+                metrics.inc("husky_answer_skeletons_total", outcome="generated")
+            else:
+                metrics.inc("husky_answer_skeletons_total", outcome="failed")
+        except Exception as e:
+            log_event("answer_skeleton_failed", logging.WARNING, job_profile=profile.key, error=str(e))
+            metrics.inc("husky_answer_skeletons_total", outcome="failed")
+        finally:
+            with self._lock:
+                # A stored skeleton now answers get(); a failed one may be queued again
+                self._scheduled.pop(self.key_for(profile, resume, question))
+                self._pending -= 1
+                metrics.set_gauge("husky_answer_skeleton_pending", self._pending)
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "1") == "1"
+# Per-kind cosine similarity a re-submitted answer needs to reuse an earlier result
+SEMANTIC_CACHE_THRESHOLDS = {
+    "evaluation": float(os.getenv("SEMANTIC_CACHE_THRESHOLD_EVALUATION", "0.97")),
+    "model_answer": float(os.getenv("SEMANTIC_CACHE_THRESHOLD_MODEL_ANSWER", "0.95")),
+}
+SEMANTIC_CACHE_PARTITION_SIZE = int(os.getenv("SEMANTIC_CACHE_PARTITION_SIZE", "64"))
+SEMANTIC_CACHE_PARTITIONS = int(os.getenv("SEMANTIC_CACHE_PARTITIONS", "4096"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", "3600"))
+# Edits that flip meaning or change the length a lot must not be treated as trivial
+SEMANTIC_CACHE_MIN_LENGTH_RATIO = 0.85
+NEGATION_WORDS = frozenset({"not", "no", "never", "nothing", "none", "cannot", "can't", "don't", "didn't",
+                            "doesn't", "won't", "wasn't", "isn't", "aren't", "weren't", "haven't", "hasn't"})
+_CACHE_NORMALIZE_PATTERN = re.compile(r"[^\w\s']+")
+
+metrics.describe("husky_semantic_cache_lookups_total", "counter", "Semantic cache lookups by kind and outcome (exact, semantic, miss).")
+
+def normalize_for_cache(text):
+    """Lowercase text and drop punctuation and filler words, so trivially edited answers compare equal."""
+    text = FILLER_WORDS.sub(" ", (text or "").lower())
+    return " ".join(_CACHE_NORMALIZE_PATTERN.sub(" ", text).split())
+
+class _SemanticEntry:
+    __slots__ = ("text", "words", "value", "created")
+
+    def __init__(self, text, value, created):
+        self.text = text
+        self.words = text.split()
+        self.value = value
+        self.created = created
+
+class _SemanticPartition:
+    """Fixed-size ring of cached results for one prompt context, with their unit-length embeddings."""
+    def __init__(self, size):
+        self.size = size
+        self.lock = threading.Lock()
+        self.vectors = None
+        self.entries = [None] * size
+        self.slots_by_text = {}
+        self.next_slot = 0
+
+    def _live(self, entry, now, ttl):
+        return entry is not None and now - entry.created < ttl
+
+    def find_exact(self, text, now, ttl):
+        slot = self.slots_by_text.get(text)
+        entry = self.entries[slot] if slot is not None else None
+        return entry if self._live(entry, now, ttl) else None
+
+    def find_nearest(self, vector, now, ttl):
+        """(similarity, entry) of the most similar live entry, or (None, None). One matrix-vector product."""
+        if self.vectors is None:
+            return None, None
+        live = np.fromiter((self._live(entry, now, ttl) for entry in self.entries), dtype=bool, count=self.size)
+        if not live.any():
+            return None, None
+        similarities = np.where(live, self.vectors @ vector, -1.0)
+        best = int(np.argmax(similarities))
+        return float(similarities[best]), self.entries[best]
+
+    def add(self, text, vector, value, now):
+        """Store value in the oldest slot; vector is None for empty text, which can only match exactly."""
+        if self.vectors is None and vector is not None:
+            self.vectors = np.zeros((self.size, len(vector)), dtype=np.float32)
+        slot = self.next_slot
+        evicted = self.entries[slot]
+        if evicted is not None and self.slots_by_text.get(evicted.text) == slot:
+            del self.slots_by_text[evicted.text]
+        if self.vectors is not None:
+            # A zero row never clears a similarity threshold
+            self.vectors[slot] = vector if vector is not None else 0.0
+        self.entries[slot] = _SemanticEntry(text, value, now)
+        self.slots_by_text[text] = slot
+        self.next_slot = (slot + 1) % self.size
+
+class SemanticCache:
+    """Reuses LLM results for near-duplicate free text, e.g. an answer re-submitted with trivial edits.
+
+    Everything else that goes into the prompt selects a partition by exact hash, so only the free text
+    is compared: normalized, embedded with the MiniLM encoder, and matched by cosine similarity against
+    every vector in the partition at once. Semantic (non-exact) hits are written to the log for audit.
+    """
+    def __init__(self, encoder_provider, thresholds=SEMANTIC_CACHE_THRESHOLDS, partition_size=SEMANTIC_CACHE_PARTITION_SIZE,
+                 max_partitions=SEMANTIC_CACHE_PARTITIONS, ttl=SEMANTIC_CACHE_TTL):
+        self._encoder_provider = encoder_provider
+        self.thresholds = thresholds
+        self.partition_size = partition_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._partitions = LRUCache(max_partitions)
 
-        USER VOICE ANSWER: {voice_answer}
-        JOB DESCRIPTION: {job_description}
-        COMPANY VALUES: {company_values}
-        """
-        response = prompt_llm(prompt)
-        
-        clarity_match = re.search(r"Clarity: (\d+)/10", response)
-        relevance_match = re.search(r"Relevance: (\d+)/10", response)
-        confidence_match = re.search(r"Confidence: (\d+)/10", response)
-        
-        clarity_score = int(clarity_match.group(1)) if clarity_match else 0
-        relevance_score = int(relevance_match.group(1)) if relevance_match else 0
-        confidence_score = int(confidence_match.group(1)) if confidence_match else 0
-        feedback = response
-        
-        scores = {
-            "clarity": clarity_score,
-            "relevance": relevance_score,
-            "confidence": confidence_score
-        }
-        
-        return scores, feedback
+    def _partition(self, kind, context):
+        key = (kind, text_hash(*context))
+        with self._lock:
+            partition = self._partitions.get(key)
+            if partition is None:
+                partition = _SemanticPartition(self.partition_size)
+                self._partitions.set(key, partition)
+            return partition
 
-class FollowUpQuestioner:
-    def generate_follow_up_questions(self, job_description, resume, question, answer):
-        """Generates insightful follow-up questions based on the user's answer."""
-        prompt = f"""
-        SYSTEM: You are an expert interviewer with 30 years of experience hiring for top tech companies. Your task is to generate 2-3 thoughtful follow-up questions based on a candidate's interview answer.
+    def _embed(self, text):
+        vector = np.asarray(self._encoder_provider().encode([text])[0], dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else vector
 
-        INSTRUCTIONS:
-        - Analyze the candidate's answer for areas that could be explored further
-        - Look for opportunities to dive deeper into their experience, skills, or thought process
-        - Consider the job requirements and the candidate's resume when crafting questions
-        - Generate questions that allow the candidate to elaborate on strengths
-        - Include questions that help address potential weaknesses in a constructive way
-        - Each question should be specific and related to the candidate's response
-        - Keep questions concise and direct
-        - Format the output with a numbered list (1., 2., 3.)
+    @staticmethod
+    def _comparable(words, cached_words):
+        """Guard against near-identical embeddings for answers that differ in substance."""
+        shorter, longer = sorted((len(words), len(cached_words)))
+        if longer and shorter / longer < SEMANTIC_CACHE_MIN_LENGTH_RATIO:
+            return False
+        return NEGATION_WORDS.intersection(words) == NEGATION_WORDS.intersection(cached_words)
 
-        JOB DESCRIPTION:
-        {job_description}
+    def get_or_compute(self, kind, context, text, compute, cacheable=lambda value: True):
+        """Return a cached result for text in this context if one is close enough, otherwise compute() and cache it."""
+        if not SEMANTIC_CACHE_ENABLED or kind not in self.thresholds:
+            return compute()
+        normalized = normalize_for_cache(text)
+        partition = self._partition(kind, context)
+        now = time.monotonic()
+        with partition.lock:
+            entry = partition.find_exact(normalized, now, self.ttl)
+        if entry is not None:
+            metrics.inc("husky_semantic_cache_lookups_total", kind=kind, outcome="exact")
+            return entry.value
 
-        RESUME:
-        {resume}
+        vector = None
+        if normalized:
+            vector = self._embed(normalized)
+            with partition.lock:
+                similarity, entry = partition.find_nearest(vector, now, self.ttl)
+            words = normalized.split()
+            if entry is not None and similarity >= self.thresholds[kind] and self._comparable(words, entry.words):
+                metrics.inc("husky_semantic_cache_lookups_total", kind=kind, outcome="semantic")
+                log_event("semantic_cache_hit", kind=kind, similarity=round(similarity, 4),
+                          threshold=self.thresholds[kind], query_hash=text_hash(normalized),
+                          cached_hash=text_hash(entry.text), age_seconds=round(now - entry.created, 1),
+                          added_words=sorted((Counter(words) - Counter(entry.words)).elements())[:10],
+                          removed_words=sorted((Counter(entry.words) - Counter(words)).elements())[:10])
+                return entry.value
 
-        INTERVIEW QUESTION:
-        {question}
+        metrics.inc("husky_semantic_cache_lookups_total", kind=kind, outcome="miss")
+        value = compute()
+        if cacheable(value):
+            with partition.lock:
+                partition.add(normalized, vector, value, time.monotonic())
+        return value
 
-        CANDIDATE'S ANSWER:
-        {answer}
+PIPELINE_PREFETCH = os.getenv("PIPELINE_PREFETCH", "1") == "1"
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", "4"))
+PIPELINE_WAIT_SECONDS = float(os.getenv("PIPELINE_WAIT_SECONDS", "60"))
+# Speculative stages queued or running across all sessions; new pipelines are skipped beyond it
+PIPELINE_MAX_PENDING = int(os.getenv("PIPELINE_MAX_PENDING", "16"))
+PIPELINE_STAGES = ("evaluation", "model_answer", "follow_ups")
 
-        FOLLOW-UP QUESTIONS (generate exactly 2-3):
-        """
-        
-        response = prompt_llm(prompt)
-        
-        # Extract the questions as a list
-        questions = []
-        for line in response.strip().split('\n'):
-            line = line.strip()
-            if line and (line.startswith('1.') or line.startswith('2.') or line.startswith('3.')):
-                questions.append(line)
-        
-        # If no questions were extracted, return the full response
-        if not questions:
-            # Split by newlines and filter out empty lines
-            questions = [line.strip() for line in response.strip().split('\n') if line.strip()]
-            # Limit to 3 questions
-            questions = questions[:3]
-        
-        return questions
+metrics.describe("husky_pipeline_lookups_total", "counter", "Pipeline result lookups by stage and outcome (hit, miss, queued, stale, failed).")
+metrics.describe("husky_pipeline_starts_total", "counter", "Pipeline start requests by outcome (started, reused, overloaded).")
+metrics.describe("husky_pipeline_pending", "gauge", "Speculative pipeline stages queued or running.")
+
+def _normalize_answer(text):
+    return " ".join((text or "").split())
+
+def pipeline_stage_key(stage, question, answer, job_description, company_info, resume, company_values='',
+                       speech_metrics=None):
+    """Hash of every input a stage's result depends on; a prefetched result is served only for the same key."""
+    if stage == "evaluation":
+        return text_hash(stage, _normalize_answer(answer), job_description, company_info, company_values,
+                         json.dumps(speech_metrics, sort_keys=True) if speech_metrics else "")
+    return text_hash(stage, _normalize_answer(answer), job_description, company_info, resume, question)
+
+class InterviewPipeline:
+    """Background evaluation, model answer and follow-ups for one transcript of one question."""
+    def __init__(self, question, answer, job_description, company_info, resume, company_values='',
+                 speech_metrics=None):
+        self.keys = {stage: pipeline_stage_key(stage, question, answer, job_description, company_info, resume,
+                                               company_values, speech_metrics)
+                     for stage in PIPELINE_STAGES}
+        self.futures = {}
+        self.cancelled = threading.Event()
+        # Prefetched LLM calls are booked to the endpoint that started the pipeline
+        self.endpoint = _current_endpoint()
+        self.started_at = time.time()
+
+    def matches(self, stage, *inputs):
+        """True if the stage was computed from exactly these inputs (pipeline_stage_key's arguments)."""
+        return self.keys[stage] == pipeline_stage_key(stage, *inputs)
+
+    def cancel(self):
+        """Drop stages that have not started; running ones stop before their next LLM call."""
+        self.cancelled.set()
+        for future in self.futures.values():
+            future.cancel()
+
+    def status(self):
+        return {stage: ("cancelled" if future.cancelled() or self.cancelled.is_set() else
+                        "done" if future.done() else "running")
+                for stage, future in self.futures.items()}
 
 class InterviewAgentManager:
     def __init__(self):
         self.analyzer = Analyzer()
         self.drafter = Drafter()
         self.evaluator = Evaluator()
-        self.follow_up_questioner = FollowUpQuestioner()
+        self.follow_up_questioner = FollowUpQuestioner(lambda: self.analyzer.encoder)
+        self.context_budgeter = ContextBudgeter(lambda: self.analyzer.encoder)
+        self.job_profiles = JobProfileStore(self.analyzer)
+        self.semantic_cache = SemanticCache(lambda: self.analyzer.encoder)
+        self.answer_skeletons = AnswerSkeletonStore(self.drafter, self.prepare_context)
+        self._pipeline_pool = ThreadPoolExecutor(max_workers=PIPELINE_WORKERS, thread_name_prefix="pipeline")
+        self._pipeline_lock = threading.Lock()
+        self._pipeline_pending = 0
+        self._pipelines = LRUCache(4096)
+
+    def prepare_context(self, job_description, resume, query, job_profile=None, session_id=None):
+        """Shrink the job description and resume that go into downstream prompts to their token budgets."""
+        if job_profile is not None and job_profile.is_complete:
+            job_description = job_profile.summary
+        job_context = self.context_budgeter.compress(job_description, query, JOB_DESC_TOKEN_BUDGET, session_id)
+        resume_context = self.context_budgeter.compress(resume, query, RESUME_TOKEN_BUDGET, session_id)
+        return job_context, resume_context
     
+    def evaluate(self, answer, job_description, company_values, speech_metrics=None, job_profile=None, session_id=None):
+        """Score an answer, reusing the evaluation of a near-identical earlier answer in the same job context."""
+        def compute():
+            job_context, _ = self.prepare_context(job_description, '', answer, job_profile, session_id)
+            return self.evaluator.evaluate_answer(answer, job_context, company_values, speech_metrics)
+        context = (job_description, company_values, json.dumps(speech_metrics, sort_keys=True) if speech_metrics else "")
+        return self.semantic_cache.get_or_compute(
+            "evaluation", context, answer, compute,
+            cacheable=lambda result: not is_llm_fallback(result[1]) and all(result[0].values()),
+        )
+
+    def draft_model_answer(self, question, answer, job_description, company_info, resume, job_profile=None,
+                           session_id=None):
+        """Draft a model answer, reusing the draft for a near-identical earlier answer to the same question."""
+        def compute():
+            skeleton = self.answer_skeletons.get(job_profile, resume, question)
+            if skeleton is not None and not normalize_for_cache(answer):
+                metrics.inc("husky_model_answers_total", source="skeleton")
+                return skeleton.text
+            if skeleton is not None:
+                metrics.inc("husky_model_answers_total", source="personalized")
+                return self.drafter.personalize_answer(question, skeleton.text, answer)
+            metrics.inc("husky_model_answers_total", source="full")
+            job_context, resume_context = self.prepare_context(job_description, resume, question, job_profile, session_id)
+            return self.drafter.generate_answer(question, company_info, job_context, resume_context, answer)
+        return self.semantic_cache.get_or_compute(
+            "model_answer", (job_description, company_info, resume, question), answer, compute,
+            cacheable=lambda result: bool(result) and not is_llm_fallback(result),
+        )
+
     def process_interview(self, job_description, company_values, question, company_info, resume, voice_answer):
         """Manages the full process from analysis to evaluation."""
-        parsed_info = self.analyzer.parse_job_info(job_description, company_values)
-        model_answer = self.drafter.generate_answer(question, company_info, job_description, resume, voice_answer)
-        evaluation = self.evaluator.evaluate_answer(voice_answer, job_description, company_values)
+        job_profile = self.job_profiles.get_or_create(job_description, company_values)
+        job_context, resume_context = self.prepare_context(job_description, resume, question, job_profile)
+        model_answer = self.drafter.generate_answer(question, company_info, job_context, resume_context, voice_answer)
+        evaluation = self.evaluator.evaluate_answer(voice_answer, job_context, company_values)
         
         return {
-            "parsed_info": parsed_info,
+            "parsed_info": job_profile.parsed_info,
             "model_answer": model_answer,
             "evaluation": evaluation
         }
 
+    def _run_stage(self, pipeline, stage, session_id, question, answer, job_description, company_info, resume,
+                   company_values, speech_metrics=None):
+        """Compute one pipeline stage in a worker thread, giving up once the pipeline is cancelled."""
+        _pipeline_stage.cancelled = pipeline.cancelled
+        try:
+            with accounted_to(pipeline.endpoint, session_id):
+                check_pipeline_cancelled()
+                return self._compute_stage(stage, session_id, question, answer, job_description, company_info,
+                                           resume, company_values, speech_metrics)
+        finally:
+            _pipeline_stage.cancelled = None
+
+    def _compute_stage(self, stage, session_id, question, answer, job_description, company_info, resume,
+                       company_values, speech_metrics=None):
+        """Compute one pipeline stage the same way its endpoint would."""
+        job_profile = self.job_profiles.get_or_create(job_description, company_info) if job_description else None
+        check_pipeline_cancelled()
+        if stage == "evaluation":
+            return self.evaluate(answer, job_description, company_values, speech_metrics, job_profile, session_id)
+        if stage == "model_answer":
+            return self.draft_model_answer(question, answer, job_description, company_info, resume, job_profile,
+                                           session_id)
+        job_context, resume_context = self.prepare_context(
+            job_description, resume, f"{question} {answer}", job_profile, session_id
+        )
+        # Speculative: the endpoint records the questions in the session history if it serves them
+        return self.follow_up_questioner.generate_follow_up_questions(job_context, resume_context, question, answer,
+                                                                      session_id, record=False)
+
+    def start_pipeline(self, session_id, question, answer, job_description, company_info, resume, company_values='',
+                       speech_metrics=None):
+        """Speculatively compute every post-answer stage in the background as soon as a transcript is known."""
+        pipeline = InterviewPipeline(question, answer, job_description, company_info, resume, company_values,
+                                     speech_metrics)
+        current = self._pipelines.get(session_id)
+        if current is not None and not current.cancelled.is_set() and current.keys == pipeline.keys:
+            metrics.inc("husky_pipeline_starts_total", outcome="reused")
+            return current
+        if current is not None:
+            current.cancel()
+
+        stages = [stage for stage in PIPELINE_STAGES if stage == "evaluation" or question]
+        with self._pipeline_lock:
+            if self._pipeline_pending + len(stages) > PIPELINE_MAX_PENDING:
+                # The endpoints compute everything on demand anyway; speculation must not build a backlog
+                self._pipelines.pop(session_id)
+                metrics.inc("husky_pipeline_starts_total", outcome="overloaded")
+                return None
+            self._pipeline_pending += len(stages)
+            metrics.set_gauge("husky_pipeline_pending", self._pipeline_pending)
+        for stage in stages:
+            future = self._pipeline_pool.submit(
+                self._run_stage, pipeline, stage, session_id, question, answer, job_description, company_info, resume,
+                company_values, speech_metrics
+            )
+            future.add_done_callback(self._stage_finished)
+            pipeline.futures[stage] = future
+        self._pipelines.set(session_id, pipeline)
+        metrics.inc("husky_pipeline_starts_total", outcome="started")
+        log_event("pipeline_started", session_id=session_id, stages=list(pipeline.futures))
+        return pipeline
+
+    def _stage_finished(self, future):
+        with self._pipeline_lock:
+            self._pipeline_pending -= 1
+            metrics.set_gauge("husky_pipeline_pending", self._pipeline_pending)
+
+    def pipeline_result(self, session_id, stage, question, answer, job_description, company_info, resume,
+                        company_values='', speech_metrics=None, timeout=PIPELINE_WAIT_SECONDS):
+        """Return a stage result prefetched from exactly these inputs, or None if the caller must compute it."""
+        pipeline = self._pipelines.get(session_id) if session_id else None
+        future = pipeline.futures.get(stage) if pipeline is not None else None
+        if future is None:
+            metrics.inc("husky_pipeline_lookups_total", stage=stage, outcome="miss")
+            return None
+        if pipeline.cancelled.is_set() or not pipeline.matches(stage, question, answer, job_description, company_info,
+                                                               resume, company_values, speech_metrics):
+            metrics.inc("husky_pipeline_lookups_total", stage=stage, outcome="stale")
+            return None
+        if future.cancel():
+            # Still waiting behind other sessions' stages: computing it in this request is faster
+            metrics.inc("husky_pipeline_lookups_total", stage=stage, outcome="queued")
+            return None
+        try:
+            with stage_timer("pipeline_wait"):
+                result = future.result(timeout=timeout)
+        except Exception as e:
+            log_event("pipeline_stage_failed", logging.WARNING, stage=stage, error=str(e))
+            metrics.inc("husky_pipeline_lookups_total", stage=stage, outcome="failed")
+            return None
+        metrics.inc("husky_pipeline_lookups_total", stage=stage, outcome="hit")
+        return result
+
+    def pipeline_status(self, session_id):
+        pipeline = self._pipelines.get(session_id) if session_id else None
+        return pipeline.status() if pipeline is not None else {}
+
+    def cancel_pipeline(self, session_id):
+        pipeline = self._pipelines.pop(session_id)
+        if pipeline is not None:
+            pipeline.cancel()
+
 interview_manager = InterviewAgentManager()
 
 def get_question_hints():
@@ -390,13 +2335,278 @@ def generate_sample_questions(job_desc, company_info, resume):
     
     return categorized_questions
 
-def speech_to_text(audio_data):
-    """Convert speech to text using SpeechRecognition"""
+# Hesitation sounds always count; words that are also ordinary vocabulary ("I would like to lead")
+# count only when set off by commas, which transcripts without punctuation never have
+FILLER_WORDS = re.compile(
+    r"\b(?:u+m+|u+h+|e+r+m*|a+h+|hmm+)\b"
+    r"|(?:^|,)\s*(?:like|you know|i mean|sort of|kind of|basically|actually|literally)\s*(?=,)",
+    re.IGNORECASE,
+)
+SPEECH_FRAME_MS = 30
+LONG_PAUSE_SECONDS = 1.0
+# Pauses at least this long are always cut out; shorter ones are split only when a segment gets too long
+VAD_SPLIT_PAUSE_SECONDS = float(os.getenv("VAD_SPLIT_PAUSE_SECONDS", "2.0"))
+VAD_PADDING_SECONDS = 0.2
+VAD_TARGET_SEGMENT_SECONDS = float(os.getenv("VAD_TARGET_SEGMENT_SECONDS", "20"))
+VAD_MIN_SEGMENT_SECONDS = 3.0
+VAD_MAX_SEGMENT_SECONDS = float(os.getenv("VAD_MAX_SEGMENT_SECONDS", "30"))
+STT_MAX_PARALLEL = int(os.getenv("STT_MAX_PARALLEL", "4"))
+
+metrics.describe("husky_stt_audio_seconds_total", "counter", "Seconds of audio received and actually sent to recognition.")
+
+def _frame_rms(samples, frame):
+    """RMS energy of consecutive non-overlapping frames, as one array."""
+    n_frames = len(samples) // frame if frame else 0
+    frames = samples[: n_frames * frame].reshape(n_frames, frame)
+    return frames, np.sqrt(np.mean(frames ** 2, axis=1))
+
+def _voiced_mask(rms):
+    """A frame is voiced when it is well above the noise floor of the recording."""
+    noise_floor = np.percentile(rms, 10)
+    return rms > max(noise_floor * 3, np.percentile(rms, 95) * 0.1, 1e-4)
+
+def _split_runs(starts, ends, target, min_length):
+    """Group consecutive voiced runs into spans of at most target frames, cutting at the longest pauses.
+
+    Each span ends at the longest pause that keeps it within target frames, preferring pauses that
+    make it at least min_length long (and the later pause on ties); a single run longer than target
+    is returned as its own span.
+    """
+    spans, first, count = [], 0, len(starts)
+    while first < count:
+        length = ends[first:count] - starts[first]
+        if length[-1] <= target:
+            spans.append((first, count))
+            break
+        # Cutting before run first + 1 + i ends the span with run first + i
+        fits = np.flatnonzero(length[:-1] <= target)
+        if not len(fits):
+            spans.append((first, first + 1))
+            first += 1
+            continue
+        long_enough = fits[length[fits] >= min_length]
+        options = long_enough if len(long_enough) else fits
+        gaps = starts[first + 1 + options] - ends[first + options]
+        last = first + 1 + int(options[len(gaps) - 1 - int(np.argmax(gaps[::-1]))])
+        spans.append((first, last))
+        first = last
+    return spans
+
+def _cut_at_quiet_frames(start, end, rms, target, max_length):
+    """Cut one long stretch of speech into pieces of at most max_length frames, each at its quietest frame."""
+    pieces = []
+    while end - start > max_length:
+        window = rms[start + target // 2:start + max_length]
+        cut = start + target // 2 + int(np.argmin(window))
+        pieces.append((start, cut))
+        start = cut
+    pieces.append((start, end))
+    return pieces
+
+def detect_speech_segments(pcm, sample_rate, split_pause=VAD_SPLIT_PAUSE_SECONDS, padding=VAD_PADDING_SECONDS,
+                           target_segment=VAD_TARGET_SEGMENT_SECONDS, max_segment=VAD_MAX_SEGMENT_SECONDS):
+    """Energy-based VAD: (start, end) sample ranges of speech for recognition.
+
+    Long pauses are trimmed out. Between them, neighbouring utterances are kept together up to about
+    target_segment seconds (more context per request means better accuracy and fewer requests),
+    splitting at the longest pauses; speech with no pause at all is cut at its quietest frame.
+    """
+    frame = int(sample_rate * SPEECH_FRAME_MS / 1000)
+    if not frame or len(pcm) < frame:
+        return []
+    _, rms = _frame_rms(pcm.astype(np.float32) / 32768.0, frame)
+    voiced = _voiced_mask(rms)
+    if not voiced.any():
+        return []
+
+    to_frames = lambda seconds: max(1, int(seconds * 1000 / SPEECH_FRAME_MS))
+    edges = np.diff(np.concatenate(([0], voiced.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    # Groups separated by long pauses, which are always cut out
+    breaks = np.flatnonzero(starts[1:] - ends[:-1] >= to_frames(split_pause)) + 1
+    groups = zip(np.concatenate(([0], breaks)), np.concatenate((breaks, [len(starts)])))
+
+    pad = int(padding * sample_rate)
+    segments = []
+    for group_first, group_last in groups:
+        group_starts, group_ends = starts[group_first:group_last], ends[group_first:group_last]
+        for first, last in _split_runs(group_starts, group_ends, to_frames(target_segment),
+                                       to_frames(VAD_MIN_SEGMENT_SECONDS)):
+            for start, end in _cut_at_quiet_frames(group_starts[first], group_ends[last - 1], rms,
+                                                   to_frames(target_segment), to_frames(max_segment)):
+                segments.append((max(0, start * frame - pad), min(len(pcm), end * frame + pad)))
+    return segments
+
+def _recognize_segment(samples, sample_rate):
+    try:
+        return sr.Recognizer().recognize_google(sr.AudioData(samples.tobytes(), sample_rate, 2))
+    except sr.UnknownValueError:
+        return ""
+
+def recognize_pcm(pcm, sample_rate):
+    """Recognize only the speech in pcm: segments are sent in parallel and stitched back in order."""
+    segments = detect_speech_segments(pcm, sample_rate) or [(0, len(pcm))]
+    metrics.inc("husky_stt_audio_seconds_total", len(pcm) / sample_rate, kind="received")
+    metrics.inc("husky_stt_audio_seconds_total", sum(end - start for start, end in segments) / sample_rate,
+                kind="recognized")
+    with stage_timer("stt"):
+        texts = run_parallel(_recognize_segment, [(pcm[start:end], sample_rate) for start, end in segments],
+                             STT_MAX_PARALLEL)
+    text = " ".join(part.strip() for part in texts if part and part.strip())
+    if not text:
+        raise sr.UnknownValueError()
+    return text
+
+def transcribe_pcm(pcm, sample_rate):
+    """Transcript and delivery metrics for decoded PCM, or a failure message and None.
+
+    Decoded audio never goes to the raw-bytes fallback in speech_to_text: it would resend the whole
+    untrimmed buffer at an assumed sample rate.
+    """
+    try:
+        text = recognize_pcm(pcm, sample_rate)
+    except sr.UnknownValueError:
+        return "Speech recognition failed: no speech was recognized", None
+    except Exception as e:
+        return f"Speech recognition failed: {str(e)}", None
+    return text, analyze_speech(pcm, sample_rate, text)
+
+def analyze_speech(pcm, sample_rate, transcript):
+    """Delivery metrics from 16-bit mono PCM and its transcript, computed on whole frame arrays."""
+    samples = pcm.astype(np.float32) / 32768.0
+    duration = len(samples) / sample_rate if sample_rate else 0.0
+    words = len(transcript.split())
+    fillers = len(FILLER_WORDS.findall(transcript))
+    result = {
+        "duration_seconds": round(duration, 2),
+        "words": words,
+        "words_per_minute": round(words / (duration / 60), 1) if duration else 0.0,
+        "filler_words": fillers,
+        "filler_rate": round(fillers / words, 3) if words else 0.0,
+    }
+
+    frame = int(sample_rate * SPEECH_FRAME_MS / 1000)
+    if not frame or len(samples) < frame:
+        return result
+    frames, rms = _frame_rms(samples, frame)
+    voiced = _voiced_mask(rms)
+    rms_db = 20 * np.log10(rms[voiced] + 1e-10)
+
+    # Pauses: runs of unvoiced frames, ignoring leading and trailing silence
+    voiced_idx = np.flatnonzero(voiced)
+    pause_ratio, long_pauses = 0.0, 0
+    if voiced_idx.size:
+        inner = ~voiced[voiced_idx[0]: voiced_idx[-1] + 1]
+        pause_ratio = float(inner.mean())
+        edges = np.diff(np.concatenate(([0], inner.astype(np.int8), [0])))
+        run_lengths = np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)
+        long_pauses = int(np.sum(run_lengths * SPEECH_FRAME_MS / 1000 >= LONG_PAUSE_SECONDS))
+
+    # Pitch: autocorrelation of every voiced frame at once via FFT, searched over 75-400 Hz
+    pitch_median, pitch_std = 0.0, 0.0
+    lag_min, lag_max = sample_rate // 400, min(sample_rate // 75, frame - 1)
+    if voiced_idx.size and lag_max > lag_min:
+        windowed = frames[voiced] * np.hanning(frame)
+        spectrum = np.fft.rfft(windowed, n=2 * frame, axis=1)
+        autocorr = np.fft.irfft(np.abs(spectrum) ** 2, axis=1)[:, :frame]
+        lags = np.argmax(autocorr[:, lag_min:lag_max], axis=1) + lag_min
+        strength = autocorr[np.arange(len(lags)), lags] / (autocorr[:, 0] + 1e-10)
+        f0 = sample_rate / lags[strength > 0.3]
+        if f0.size:
+            pitch_median = float(np.median(f0))
+            pitch_std = float(np.std(12 * np.log2(f0 / pitch_median)))
+
+    result.update({
+        "pause_ratio": round(pause_ratio, 3),
+        "long_pauses": long_pauses,
+        "energy_mean_db": round(float(rms_db.mean()), 1) if rms_db.size else 0.0,
+        "energy_std_db": round(float(rms_db.std()), 1) if rms_db.size else 0.0,
+        "pitch_median_hz": round(pitch_median, 1),
+        "pitch_std_semitones": round(pitch_std, 2),
+    })
+    return result
+
+SPEECH_METRIC_KEYS = ("duration_seconds", "words", "words_per_minute", "filler_words", "filler_rate", "pause_ratio",
+                      "long_pauses", "energy_mean_db", "energy_std_db", "pitch_median_hz", "pitch_std_semitones")
+
+def sanitize_speech_metrics(speech_metrics):
+    """Keep only known analyze_speech keys with finite numeric values; None if nothing usable remains.
+
+    Clients send the metrics back with the answer, so they must never reach a prompt or the history as-is.
+    """
+    if not isinstance(speech_metrics, dict):
+        return None
+    clean = {}
+    for key in SPEECH_METRIC_KEYS:
+        value = speech_metrics.get(key)
+        if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+            clean[key] = value
+    return clean or None
+
+def format_speech_metrics(speech_metrics):
+    """One-line summary of analyze_speech output for the evaluator prompt."""
+    speech_metrics = sanitize_speech_metrics(speech_metrics)
+    if not speech_metrics:
+        return "Not available (typed answer)"
+    parts = [
+        f"speaking rate {speech_metrics.get('words_per_minute', 0)} words/min",
+        f"filler words {int(speech_metrics.get('filler_words', 0))} ({speech_metrics.get('filler_rate', 0):.1%} of words)",
+    ]
+    if "pause_ratio" in speech_metrics:
+        parts += [
+            f"pauses {speech_metrics['pause_ratio']:.0%} of speaking time ({int(speech_metrics.get('long_pauses', 0))} longer than {LONG_PAUSE_SECONDS:g}s)",
+            f"pitch variation {speech_metrics.get('pitch_std_semitones', 0)} semitones",
+            f"loudness variation {speech_metrics.get('energy_std_db', 0)} dB",
+        ]
+    return "; ".join(parts)
+
+PCM_MIME_TYPES = ("audio/pcm", "audio/x-pcm")
+WAV_MIME_TYPES = ("audio/wav", "audio/x-wav", "audio/wave")
+MAX_AUDIO_UPLOAD_BYTES = int(os.getenv("MAX_AUDIO_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+
+metrics.describe("husky_stt_uploads_total", "counter", "Speech uploads by format and whether ffmpeg transcoding was needed.")
+
+def decode_audio_upload(audio_bytes, content_type):
+    """Return (int16 mono PCM, sample rate) when the upload needs no transcoding, otherwise None.
+
+    Accepts raw little-endian 16-bit PCM ("audio/pcm;rate=16000;channels=1") and 16-bit mono WAV.
+    """
+    mime, options = parse_options_header(content_type or "")
+    if mime in PCM_MIME_TYPES and int(options.get("channels", 1)) == 1:
+        usable = len(audio_bytes) - len(audio_bytes) % 2
+        return np.frombuffer(audio_bytes[:usable], dtype="<i2"), int(options.get("rate", 16000))
+    if mime in WAV_MIME_TYPES or audio_bytes[:4] == b"RIFF":
+        try:
+            with wave.open(io.BytesIO(audio_bytes), 'rb') as wav_file:
+                if wav_file.getnchannels() == 1 and wav_file.getsampwidth() == 2:
+                    pcm = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype="<i2")
+                    return pcm, wav_file.getframerate()
+        except (wave.Error, EOFError):
+            pass
+    return None
+
+def speech_to_text(audio_data, content_type=None):
+    """Convert speech to text using SpeechRecognition. Returns the transcript and delivery metrics (or None).
+
+    audio_data is either a base64 data URL from the browser or raw bytes of the given content type.
+    """
     recognizer = sr.Recognizer()
     
     try:
-        # Save base64 audio data to a temporary file
-        audio_bytes = base64.b64decode(audio_data.split(',')[1])
+        if isinstance(audio_data, str):
+            header, _, payload = audio_data.partition(',')
+            content_type = header[len('data:'):].replace(';base64', '')
+            audio_bytes = base64.b64decode(payload)
+        else:
+            audio_bytes = audio_data
+        
+        # Browser-side 16 kHz capture arrives ready for recognition, skipping ffmpeg entirely
+        upload_format = parse_options_header(content_type or "")[0] or "unknown"
+        decoded = decode_audio_upload(audio_bytes, content_type)
+        metrics.inc("husky_stt_uploads_total", format=upload_format, transcoded=str(decoded is None).lower())
+        if decoded is not None:
+            pcm, sample_rate = decoded
+            return transcribe_pcm(pcm, sample_rate)
         
         # Save as webm file first
         with tempfile.NamedTemporaryFile(delete=False, suffix='.webm') as temp_audio_file:
@@ -407,22 +2617,25 @@ def speech_to_text(audio_data):
         try:
             import subprocess
             wav_path = temp_webm_path.replace('.webm', '.wav')
-            subprocess.call(['ffmpeg', '-i', temp_webm_path, '-ar', '16000', '-ac', '1', wav_path])
+            with stage_timer("ffmpeg"):
+                subprocess.call(['ffmpeg', '-i', temp_webm_path, '-ar', '16000', '-ac', '1', wav_path])
             os.unlink(temp_webm_path)  # Delete the webm file
             
-            with sr.AudioFile(wav_path) as source:
-                audio = recognizer.record(source)
-            text = recognizer.recognize_google(audio)
+            with wave.open(wav_path, 'rb') as wav_file:
+                sample_rate = wav_file.getframerate()
+                pcm = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype=np.int16)
             os.unlink(wav_path)  # Delete temp WAV file
-            return text
+            
+            return transcribe_pcm(pcm, sample_rate)
         except (ImportError, FileNotFoundError):
             # If FFmpeg is not available, try direct approach with the webm file
             # Note: This might not work perfectly but worth trying
             with sr.AudioFile(temp_webm_path) as source:
                 audio = recognizer.record(source)
-            text = recognizer.recognize_google(audio)
+            with stage_timer("stt"):
+                text = recognizer.recognize_google(audio)
             os.unlink(temp_webm_path)  # Delete temp file
-            return text
+            return text, None
     except Exception as e:
         # If an error occurs, try to delete any temporary files
         try:
@@ -433,14 +2646,14 @@ def speech_to_text(audio_data):
         except:
             pass
         
-        # Use a different approach as fallback - send directly to Google's API
+        # Use a different approach as fallback - send directly to Google's API (only reached for undecoded uploads)
         try:
-            audio_bytes = base64.b64decode(audio_data.split(',')[1])
             audio_data_obj = sr.AudioData(audio_bytes, 16000, 2)  # Using default values
-            text = recognizer.recognize_google(audio_data_obj)
-            return text
+            with stage_timer("stt"):
+                text = recognizer.recognize_google(audio_data_obj)
+            return text, None
         except Exception as inner_e:
-            return f"Speech recognition failed: {str(e)}. Second attempt: {str(inner_e)}"
+            return f"Speech recognition failed: {str(e)}. Second attempt: {str(inner_e)}", None
 
 def get_voice_options():
     return {
@@ -467,8 +2680,9 @@ def text_to_speech(text, voice_option="US English"):
             temp_filename = fp.name
         
         # Generate the speech audio file with the selected voice
-        tts = gTTS(text=text, lang=selected_voice["lang"], tld=selected_voice["tld"])
-        tts.save(temp_filename)
+        with stage_timer("tts"):
+            tts = gtts.gTTS(text=text, lang=selected_voice["lang"], tld=selected_voice["tld"])
+            tts.save(temp_filename)
         
         # Read the file and convert to base64
         with open(temp_filename, 'rb') as audio_file:
@@ -479,14 +2693,11 @@ def text_to_speech(text, voice_option="US English"):
         
         return f"data:audio/mp3;base64,{audio_data}"
     except Exception as e:
-        print(f"TTS Error: {e}")
+        log_event("tts_error", logging.ERROR, voice_option=voice_option, error=str(e))
         return None
 
 def save_to_html(job_desc, company_info, resume, company_name, position_title, company_values, tech_skills, soft_skills, job_duties, selected_question, answer_text, feedback, model_answer, follow_up_questions=None):
     """Generate HTML content for download."""
-    # Get current date and time
-    current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    
     html_content = f"""
     <html>
     <head>
@@ -718,24 +2929,933 @@ def save_to_html(job_desc, company_info, resume, company_name, position_title, c
     
     return tmp_file_path
 
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_QUEUE = int(os.getenv("JOB_MAX_QUEUE", "1000"))
+JOB_RESULT_TTL = float(os.getenv("JOB_RESULT_TTL", "600"))
+JOB_PRIORITY_HIGH, JOB_PRIORITY_NORMAL, JOB_PRIORITY_LOW = 0, 5, 10
+
+metrics.describe("husky_job_queue_depth", "gauge", "Background jobs waiting for a worker.")
+metrics.describe("husky_job_wait_seconds", "histogram", "Time background jobs spend queued before a worker picks them up.")
+metrics.describe("husky_job_run_seconds", "histogram", "Time background jobs spend running.")
+metrics.describe("husky_jobs_total", "counter", "Finished background jobs by kind and status.")
+
+class QueueFullError(Exception):
+    """Raised when the background job queue cannot accept more work."""
+
+class Job:
+    """One unit of background work and its outcome."""
+    def __init__(self, kind, fn, priority, owner=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.fn = fn
+        self.priority = priority
+        self.owner = owner
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+
+    def to_dict(self):
+        payload = {"job_id": self.id, "kind": self.kind, "status": self.status}
+        if self.status == "done":
+            payload["result"] = self.result
+        if self.status == "failed":
+            payload["error"] = self.error
+        return payload
+
+class JobQueue:
+    """Priority queue of background jobs served by a fixed pool of worker threads."""
+    def __init__(self, workers=JOB_WORKERS, max_queue=JOB_MAX_QUEUE, result_ttl=JOB_RESULT_TTL):
+        self.workers = workers
+        self.result_ttl = result_ttl
+        self._queue = queue.PriorityQueue(max_queue)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._threads = []
+
+    def _ensure_workers(self):
+        # Started lazily so forking servers don't inherit idle threads from the import
+        with self._lock:
+            if self._threads:
+                return
+            for number in range(self.workers):
+                thread = threading.Thread(target=self._work, name=f"job-worker-{number}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, kind, fn, priority=JOB_PRIORITY_NORMAL, owner=None):
+        """Queue fn() and return its Job; lower priority values run first, FIFO within a priority."""
+        self._ensure_workers()
+        self._expire()
+        job = Job(kind, fn, priority, owner)
+        try:
+            self._queue.put_nowait((priority, next(self._sequence), job))
+        except queue.Full:
+            metrics.inc("husky_jobs_total", kind=kind, status="rejected")
+            raise QueueFullError("Background job queue is full")
+        with self._lock:
+            self._jobs[job.id] = job
+        metrics.set_gauge("husky_job_queue_depth", self._queue.qsize())
+        return job
+
+    def get(self, job_id, owner=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None or (job.owner is not None and job.owner != owner):
+            return None
+        return job
+
+    def _expire(self):
+        cutoff = time.time() - self.result_ttl
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items() if job.finished_at and job.finished_at < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            _, _, job = self._queue.get()
+            metrics.set_gauge("husky_job_queue_depth", self._queue.qsize())
+            job.started_at = time.time()
+            job.status = "running"
+            metrics.observe("husky_job_wait_seconds", job.started_at - job.created_at, kind=job.kind)
+            try:
+                job.result = job.fn()
+                job.status = "done"
+            except Exception as e:
+                log_event("job_failed", logging.ERROR, job_id=job.id, kind=job.kind, error=str(e))
+                job.error = str(e)
+                job.status = "failed"
+            finally:
+                job.fn = None
+                job.finished_at = time.time()
+                metrics.observe("husky_job_run_seconds", job.finished_at - job.started_at, kind=job.kind)
+                metrics.inc("husky_jobs_total", kind=job.kind, status=job.status)
+                job.done.set()
+                self._queue.task_done()
+
+job_queue = JobQueue()
+
+def wants_async():
+    """Clients opt into background processing with {"async": true} or a Prefer: respond-async header."""
+    data = request.get_json(silent=True) or {}
+    return bool(data.get('async')) or 'respond-async' in request.headers.get('Prefer', '')
+
+def async_capable(kind, priority=JOB_PRIORITY_NORMAL, before_enqueue=None):
+    """Let an endpoint run as a background job that returns 202 and a job id when the client asks for it.
+
+    Session changes must happen in before_enqueue: the background copy of the request can read the
+    session but its writes never reach the cookie.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not wants_async():
+                return view(*args, **kwargs)
+            if before_enqueue is not None:
+                before_enqueue()
+            owner = get_session_id()
+
+            @copy_current_request_context
+            def run():
+                response = app.make_response(view(*args, **kwargs))
+                return {"status_code": response.status_code, "body": response.get_json(silent=True)}
+
+            try:
+                job = job_queue.submit(kind, run, priority=priority, owner=owner)
+            except QueueFullError:
+                return jsonify({'error': 'The server is busy. Please try again shortly.'}), 503
+            return jsonify({'job_id': job.id, 'status': job.status, 'status_url': f'/jobs/{job.id}'}), 202
+        return wrapper
+    return decorator
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1") == "1"
+ADMISSION_MAX_ACTIVE = int(os.getenv("ADMISSION_MAX_ACTIVE", str(2 * LLM_MAX_CONCURRENCY)))
+ADMISSION_MAX_WAITING = int(os.getenv("ADMISSION_MAX_WAITING", "64"))
+ADMISSION_MAX_WAITING_PER_CLIENT = int(os.getenv("ADMISSION_MAX_WAITING_PER_CLIENT", "2"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "3"))
+ADMISSION_TRACKED_CLIENTS = int(os.getenv("ADMISSION_TRACKED_CLIENTS", "10000"))
+# Every request is also charged to its address, with this many times the per-session allowance (shared NATs)
+ADMISSION_IP_MULTIPLIER = float(os.getenv("ADMISSION_IP_MULTIPLIER", "4"))
+# Per-endpoint token buckets as "requests per minute/burst"
+ADMISSION_LIMITS = {
+    "analyze_info": os.getenv("ADMISSION_LIMIT_ANALYZE_INFO", "10/4"),
+    "analyze_answer": os.getenv("ADMISSION_LIMIT_ANALYZE_ANSWER", "20/6"),
+    "analyze_answers_batch": os.getenv("ADMISSION_LIMIT_ANALYZE_ANSWERS_BATCH", "4/2"),
+    "generate_model_answer": os.getenv("ADMISSION_LIMIT_GENERATE_MODEL_ANSWER", "10/4"),
+    "generate_follow_up_questions": os.getenv("ADMISSION_LIMIT_GENERATE_FOLLOW_UP_QUESTIONS", "10/4"),
+    "pipeline_start": os.getenv("ADMISSION_LIMIT_PIPELINE_START", "20/6"),
+}
+
+metrics.describe("husky_admission_total", "counter", "Admission decisions for LLM-backed endpoints by outcome (admitted, rate_limited, client_busy, queue_full, timed_out).")
+metrics.describe("husky_admission_wait_seconds", "histogram", "Time admitted requests waited in the fair queue.")
+metrics.describe("husky_admission_active", "gauge", "LLM-backed requests currently being served.")
+metrics.describe("husky_admission_waiting", "gauge", "LLM-backed requests waiting in the fair queue.")
+
+def parse_rate_limit(spec):
+    """Parse "per_minute/burst" into (tokens per second, bucket capacity)."""
+    per_minute, _, burst = spec.partition("/")
+    per_minute = float(per_minute)
+    return per_minute / 60, float(burst) if burst else max(1.0, per_minute)
+
+class AdmissionRejected(Exception):
+    """A request turned away before doing any work; status is 429 (this client) or 503 (the server)."""
+    def __init__(self, status, reason, retry_after):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount=1.0):
+        """Seconds until amount tokens are available, 0 if they are now."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate if self.rate > 0 else float("inf")
+
+    def take(self, amount=1.0):
+        """Take amount tokens; returns 0 on success, otherwise the seconds until they would be available."""
+        retry_after = self.wait_time(amount)
+        if not retry_after:
+            self.tokens -= amount
+        return retry_after
+
+    def give_back(self, amount=1.0):
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+class _Waiter:
+    __slots__ = ("client", "ready", "granted", "cancelled")
+
+    def __init__(self, client):
+        self.client = client
+        self.ready = threading.Event()
+        self.granted = False
+        self.cancelled = False
+
+class AdmissionController:
+    """Token buckets per client and endpoint, then a weighted fair queue in front of a fixed number of slots.
+
+    Each client's waiting requests get start-time fair queuing tags (cost / weight past the later of the
+    client's previous tag and the queue's virtual time), so a client firing many requests only delays
+    itself. Requests are rejected instead of parked in worker threads: 429 when the client is over its
+    rate or already has requests waiting, 503 when the queue is full or the wait exceeds queue_timeout.
+    """
+    def __init__(self, max_active=ADMISSION_MAX_ACTIVE, max_waiting=ADMISSION_MAX_WAITING,
+                 max_waiting_per_client=ADMISSION_MAX_WAITING_PER_CLIENT, queue_timeout=ADMISSION_QUEUE_TIMEOUT,
+                 limits=ADMISSION_LIMITS, tracked_clients=ADMISSION_TRACKED_CLIENTS):
+        self.max_active = max_active
+        self.max_waiting = max_waiting
+        self.max_waiting_per_client = max_waiting_per_client
+        self.queue_timeout = queue_timeout
+        self.limits = {kind: parse_rate_limit(spec) for kind, spec in limits.items()}
+        self._lock = threading.Lock()
+        self._buckets = LRUCache(tracked_clients)
+        self._finish_tags = LRUCache(tracked_clients)
+        self._heap = []
+        self._sequence = itertools.count()
+        self._waiting = Counter()
+        self._active = 0
+        self._virtual_time = 0.0
+
+    def check_rate(self, keys, kind):
+        """Take one token from each (key, multiplier) bucket for this endpoint, or none if any bucket is empty.
+
+        A new session cannot buy a fresh allowance: the address bucket is shared by all of its sessions.
+        Returns the charged buckets, for refund() if the request is shed later.
+        """
+        limit = self.limits.get(kind)
+        if limit is None:
+            return []
+        rate, capacity = limit
+        with self._lock:
+            buckets = []
+            for key, multiplier in keys:
+                bucket = self._buckets.get((key, kind))
+                if bucket is None:
+                    bucket = TokenBucket(rate * multiplier, capacity * multiplier)
+                    self._buckets.set((key, kind), bucket)
+                buckets.append(bucket)
+            retry_after = max((bucket.wait_time() for bucket in buckets), default=0.0)
+            if retry_after:
+                raise AdmissionRejected(429, "rate_limited", retry_after)
+            for bucket in buckets:
+                bucket.take()
+        return buckets
+
+    def refund(self, buckets):
+        """Return the tokens check_rate took for a request that was then turned away without doing any work."""
+        with self._lock:
+            for bucket in buckets:
+                bucket.give_back()
+
+    def acquire(self, client, cost=1.0, weight=1.0):
+        """Block until a slot is granted to this request; returns the seconds spent waiting."""
+        with self._lock:
+            if self._active < self.max_active and not self._heap:
+                self._active += 1
+                metrics.set_gauge("husky_admission_active", self._active)
+                return 0.0
+            if self._waiting[client] >= self.max_waiting_per_client:
+                raise AdmissionRejected(429, "client_busy", self.queue_timeout)
+            if sum(self._waiting.values()) >= self.max_waiting:
+                raise AdmissionRejected(503, "queue_full", self.queue_timeout)
+            tag = max(self._virtual_time, self._finish_tags.get(client, 0.0)) + cost / weight
+            self._finish_tags.set(client, tag)
+            waiter = _Waiter(client)
+            heapq.heappush(self._heap, (tag, next(self._sequence), waiter))
+            self._waiting[client] += 1
+            metrics.add_gauge("husky_admission_waiting", 1)
+        start = time.perf_counter()
+        waiter.ready.wait(self.queue_timeout)
+        with self._lock:
+            if not waiter.granted:
+                waiter.cancelled = True
+                self._dequeued(client)
+                raise AdmissionRejected(503, "timed_out", self.queue_timeout)
+        return time.perf_counter() - start
+
+    def _dequeued(self, client):
+        self._waiting[client] -= 1
+        if not self._waiting[client]:
+            del self._waiting[client]
+        metrics.add_gauge("husky_admission_waiting", -1)
+
+    def release(self):
+        """Hand the finished request's slot to the waiter with the smallest tag, or free it."""
+        with self._lock:
+            while self._heap:
+                tag, _, waiter = heapq.heappop(self._heap)
+                if waiter.cancelled:
+                    continue
+                self._virtual_time = tag
+                waiter.granted = True
+                self._dequeued(waiter.client)
+                waiter.ready.set()
+                return
+            self._active -= 1
+            metrics.set_gauge("husky_admission_active", self._active)
+
+admission = AdmissionController()
+
+def admission_client():
+    """Fair-queue key: the session id when the browser already has one, otherwise the client address."""
+    sid = session.get('sid')
+    return f"sid:{sid}" if sid else f"ip:{request.remote_addr}"
+
+def admission_rate_keys():
+    """Token buckets charged for a request: always the address, plus the session when there is one."""
+    keys = [(f"ip:{request.remote_addr}", ADMISSION_IP_MULTIPLIER)]
+    sid = session.get('sid')
+    if sid:
+        keys.append((f"sid:{sid}", 1.0))
+    return keys
+
+def admission_controlled(kind, weight=1.0, cost=None):
+    """Apply per-client rate limits and fair queuing to an LLM-backed endpoint.
+
+    Goes above async_capable so background submissions are rate limited too; an async request holds
+    its slot only while it is enqueued, after which the job queue's workers bound its concurrency.
+    cost(data) estimates the LLM work of one request (default 1); weight gives the endpoint a larger
+    share of the queue.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not ADMISSION_CONTROL:
+                return view(*args, **kwargs)
+            client = admission_client()
+            charged = []
+            try:
+                charged = admission.check_rate(admission_rate_keys(), kind)
+                request_cost = max(1.0, float(cost(request.get_json(silent=True)))) if cost else 1.0
+                with stage_timer("admission_queue"):
+                    waited = admission.acquire(client, request_cost, weight)
+            except AdmissionRejected as e:
+                # Shed by the queue (client_busy, queue_full, timed_out): the request did nothing, so it costs nothing
+                admission.refund(charged)
+                metrics.inc("husky_admission_total", endpoint=kind, outcome=e.reason)
+                log_event("admission_rejected", logging.WARNING, endpoint=kind, client=client, reason=e.reason)
+                message = ('Too many requests. Please wait a moment and try again.' if e.status == 429
+                           else 'The server is busy. Please try again shortly.')
+                response = jsonify({'error': message, 'reason': e.reason})
+                response.status_code = e.status
+                response.headers['Retry-After'] = str(max(1, math.ceil(e.retry_after)))
+                return response
+            metrics.inc("husky_admission_total", endpoint=kind, outcome="admitted")
+            metrics.observe("husky_admission_wait_seconds", waited, endpoint=kind)
+            try:
+                return view(*args, **kwargs)
+            finally:
+                admission.release()
+        return wrapper
+    return decorator
+
+def admit_speculative(kind):
+    """Charge work a request starts on the side (prefetching after a transcription) to kind's rate limit.
+
+    Returns False when the client is over that limit; the speculative work is skipped, not the request.
+    """
+    if not ADMISSION_CONTROL:
+        return True
+    try:
+        admission.check_rate(admission_rate_keys(), kind)
+    except AdmissionRejected as e:
+        metrics.inc("husky_admission_total", endpoint=kind, outcome=e.reason)
+        return False
+    metrics.inc("husky_admission_total", endpoint=kind, outcome="admitted")
+    return True
+
+HISTORY_DB = os.getenv("HISTORY_DB", "history.db")
+HISTORY_BATCH_SIZE = int(os.getenv("HISTORY_BATCH_SIZE", "100"))
+HISTORY_FLUSH_SECONDS = float(os.getenv("HISTORY_FLUSH_SECONDS", "1.0"))
+HISTORY_MAX_QUEUE = int(os.getenv("HISTORY_MAX_QUEUE", "10000"))
+HISTORY_RECENT_HALF_LIFE = float(os.getenv("HISTORY_RECENT_HALF_LIFE", "10"))
+HISTORY_USER_COOKIE = "husky_user"
+HISTORY_USER_COOKIE_MAX_AGE = 365 * 24 * 3600
+
+metrics.describe("husky_history_writes_total", "counter", "Practice attempts by outcome (written, dropped, failed).")
+metrics.describe("husky_history_queue_depth", "gauge", "Practice attempts waiting to be written.")
+metrics.describe("husky_history_flush_seconds", "histogram", "Time to write one batch of practice attempts.")
+
+HISTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attempts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    question TEXT NOT NULL,
+    category TEXT NOT NULL,
+    job_profile TEXT,
+    clarity INTEGER NOT NULL,
+    relevance INTEGER NOT NULL,
+    confidence INTEGER NOT NULL,
+    answer_words INTEGER NOT NULL,
+    words_per_minute REAL,
+    filler_rate REAL,
+    feedback TEXT
+);
+CREATE INDEX IF NOT EXISTS attempts_user_time ON attempts (user_id, created_at);
+CREATE INDEX IF NOT EXISTS attempts_user_category_time ON attempts (user_id, category, created_at);
+CREATE INDEX IF NOT EXISTS attempts_user_question_time ON attempts (user_id, question, created_at);
+"""
+
+class HistoryStore:
+    """Practice attempts in SQLite. Requests only enqueue; one background thread writes them in batches."""
+    COLUMNS = ("user_id", "created_at", "question", "category", "job_profile", "clarity", "relevance", "confidence",
+               "answer_words", "words_per_minute", "filler_rate", "feedback")
+
+    def __init__(self, path, batch_size=HISTORY_BATCH_SIZE, flush_seconds=HISTORY_FLUSH_SECONDS, max_queue=HISTORY_MAX_QUEUE):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._writer = None
+        self._insert = (f"INSERT INTO attempts ({', '.join(self.COLUMNS)}) "
+                        f"VALUES ({', '.join('?' for _ in self.COLUMNS)})")
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=10)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    def _ensure_writer(self):
+        # Started on first use, like the job queue workers, so importing the app creates no files or threads
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                with self._connect() as connection:
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.executescript(HISTORY_SCHEMA)
+                self._writer = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._writer.start()
+
+    def record(self, **attempt):
+        """Queue one attempt for writing; never blocks the request. False if the queue is full."""
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(tuple(attempt.get(column) for column in self.COLUMNS))
+        except queue.Full:
+            metrics.inc("husky_history_writes_total", outcome="dropped")
+            return False
+        metrics.set_gauge("husky_history_queue_depth", self._queue.qsize())
+        return True
+
+    def _run(self):
+        connection = self._connect()
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            start = time.perf_counter()
+            try:
+                self._write(connection, batch)
+            finally:
+                metrics.observe("husky_history_flush_seconds", time.perf_counter() - start)
+                metrics.set_gauge("husky_history_queue_depth", self._queue.qsize())
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, connection, batch):
+        try:
+            with connection:
+                connection.executemany(self._insert, batch)
+            metrics.inc("husky_history_writes_total", len(batch), outcome="written")
+            return
+        except sqlite3.Error as e:
+            log_event("history_batch_failed", logging.WARNING, rows=len(batch), error=str(e))
+        # One bad row must not cost the other users' rows in the batch
+        for row in batch:
+            try:
+                with connection:
+                    connection.execute(self._insert, row)
+                metrics.inc("husky_history_writes_total", outcome="written")
+            except sqlite3.Error as e:
+                log_event("history_write_failed", logging.ERROR, user_id=row[0], error=str(e))
+                metrics.inc("husky_history_writes_total", outcome="failed")
+
+    def flush(self, timeout=5.0):
+        """Wait (up to timeout seconds) until every queued attempt has been written."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+        return not self._queue.unfinished_tasks
+
+    def attempts(self, user_id, question=None, category=None, before=None, limit=50):
+        """A user's attempts, newest first, optionally filtered by question or category."""
+        self._ensure_writer()
+        clauses, params = ["user_id = ?"], [user_id]
+        for column, value in (("question", question), ("category", category)):
+            if value:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if before is not None:
+            clauses.append("created_at < ?")
+            params.append(before)
+        sql = (f"SELECT id, created_at, question, category, clarity, relevance, confidence, answer_words, "
+               f"words_per_minute, filler_rate, feedback FROM attempts WHERE {' AND '.join(clauses)} "
+               f"ORDER BY created_at DESC LIMIT ?")
+        with stage_timer("history_db"), self._connect() as connection:
+            return [dict(row) for row in connection.execute(sql, params + [limit])]
+
+    def columns(self, user_id, since=None):
+        """Columnar extract of a user's attempts for analytics, oldest first: one NumPy array per column."""
+        self._ensure_writer()
+        # Non-numeric delivery values (written before inputs were validated) read as NULL
+        sql = ("SELECT created_at, category, clarity, relevance, confidence, "
+               "CASE WHEN typeof(words_per_minute) IN ('integer', 'real') THEN words_per_minute END, "
+               "CASE WHEN typeof(filler_rate) IN ('integer', 'real') THEN filler_rate END "
+               "FROM attempts WHERE user_id = ? AND created_at >= ? ORDER BY created_at")
+        with stage_timer("history_db"), self._connect() as connection:
+            rows = connection.execute(sql, (user_id, since or 0.0)).fetchall()
+        if not rows:
+            return None
+        created_at, category, clarity, relevance, confidence, words_per_minute, filler_rate = zip(*rows)
+        return {
+            "created_at": np.array(created_at, dtype=float),
+            "category": np.array(category, dtype=object),
+            "scores": np.column_stack([clarity, relevance, confidence]).astype(float),
+            # Typed answers have no delivery metrics: None becomes NaN
+            "words_per_minute": np.array(words_per_minute, dtype=float),
+            "filler_rate": np.array(filler_rate, dtype=float),
+        }
+
+history_store = HistoryStore(HISTORY_DB) if HISTORY_DB else None
+if history_store is not None:
+    atexit.register(history_store.flush)
+
+def _finite(value, digits=2):
+    """Round a NumPy scalar for JSON, mapping NaN to None."""
+    value = float(value)
+    return round(value, digits) if np.isfinite(value) else None
+
+def progress_report(columns, half_life=HISTORY_RECENT_HALF_LIFE):
+    """Score trends per category and weakest skills from a columnar extract.
+
+    Per-category sums come from np.bincount over category codes, so every statistic is one pass over
+    the columns. "Recent" scores weight attempts by 0.5 ** (attempts since / half_life); trends are the
+    least-squares slope of the average score in points per week.
+    """
+    if columns is None:
+        return {"attempts": 0, "categories": [], "weakest_skills": [], "weakest_categories": []}
+    created_at, scores = columns["created_at"], columns["scores"]
+    n = len(created_at)
+    categories, codes = np.unique(columns["category"], return_inverse=True)
+    k = len(categories)
+    average = scores.mean(axis=1)
+    weeks = (created_at - created_at[0]) / (7 * 86400)
+    weights = 0.5 ** (np.arange(n - 1, -1, -1) / half_life)
+
+    per_category = lambda values: np.bincount(codes, weights=values, minlength=k)
+    counts = np.bincount(codes, minlength=k).astype(float)
+    means = np.column_stack([per_category(scores[:, j]) for j in range(scores.shape[1])]) / counts[:, None]
+    recent = per_category(weights * average) / per_category(weights)
+    sum_t, sum_y = per_category(weeks), per_category(average)
+    sum_tt, sum_ty = per_category(weeks * weeks), per_category(weeks * average)
+    denominator = counts * sum_tt - sum_t ** 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = np.where(denominator > 1e-12, (counts * sum_ty - sum_t * sum_y) / denominator, np.nan)
+
+    overall_recent = (weights[:, None] * scores).sum(axis=0) / weights.sum()
+    centered = weeks - weeks.mean()
+    spread = (centered ** 2).sum()
+    overall_slope = (centered * (average - average.mean())).sum() / spread if spread > 1e-12 else np.nan
+    delivery = {}
+    for name in ("words_per_minute", "filler_rate"):
+        values = columns[name]
+        spoken = ~np.isnan(values)
+        delivery[name] = _finite((weights[spoken] * values[spoken]).sum() / weights[spoken].sum(), 3) if spoken.any() else None
+
+    category_rows = [
+        {
+            "category": str(categories[i]),
+            "attempts": int(counts[i]),
+            "mean": {criterion: _finite(means[i, j]) for j, criterion in enumerate(SCORE_CRITERIA)},
+            "recent_average": _finite(recent[i]),
+            "trend_per_week": _finite(slopes[i]),
+        }
+        for i in range(k)
+    ]
+    return {
+        "attempts": n,
+        "first_attempt": datetime.fromtimestamp(created_at[0]).isoformat(timespec="seconds"),
+        "last_attempt": datetime.fromtimestamp(created_at[-1]).isoformat(timespec="seconds"),
+        "overall": {
+            "mean": {criterion: _finite(value) for criterion, value in zip(SCORE_CRITERIA, scores.mean(axis=0))},
+            "recent": {criterion: _finite(value) for criterion, value in zip(SCORE_CRITERIA, overall_recent)},
+            "trend_per_week": _finite(overall_slope),
+        },
+        "categories": category_rows,
+        "weakest_skills": [SCORE_CRITERIA[j] for j in np.argsort(overall_recent, kind="stable")],
+        "weakest_categories": [str(categories[i]) for i in np.argsort(recent, kind="stable")],
+        "delivery": delivery,
+    }
+
+@functools.lru_cache(maxsize=1)
+def _question_categories():
+    return {question: category for category, questions in generate_sample_questions("", "", "").items()
+            for question in questions}
+
+def question_category(question):
+    """The practice category of a standard question; follow-ups and custom questions share one bucket."""
+    return _question_categories().get(question.strip(), "Follow-up & custom")
+
+def history_user_id():
+    """Anonymous long-lived id for practice history; unlike the session cookie it survives closing the browser."""
+    user_id = request.cookies.get(HISTORY_USER_COOKIE, '')
+    if re.fullmatch(r"[0-9a-f]{32}", user_id):
+        return user_id
+    if "history_user_id" not in g:
+        g.history_user_id = uuid.uuid4().hex
+    return g.history_user_id
+
+@app.after_request
+def persist_history_user(response):
+    if "history_user_id" in g:
+        response.set_cookie(HISTORY_USER_COOKIE, g.history_user_id, max_age=HISTORY_USER_COOKIE_MAX_AGE,
+                            httponly=True, samesite="Lax")
+    return response
+
+def _finite_number(value):
+    """value as a float if it is a finite real number (not a bool), otherwise None."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return float(value) if math.isfinite(value) else None
+
+def record_attempt(question, answer_text, scores, feedback, speech_metrics=None):
+    """Queue a scored practice attempt for the history store (no-op when history is disabled)."""
+    if history_store is None or not question or not isinstance(question, str):
+        return
+    speech_metrics = speech_metrics if isinstance(speech_metrics, dict) else {}
+    history_store.record(
+        user_id=history_user_id(),
+        created_at=time.time(),
+        question=question,
+        category=question_category(question),
+        job_profile=session.get('job_profile_key'),
+        clarity=int(_finite_number(scores.get('clarity')) or 0),
+        relevance=int(_finite_number(scores.get('relevance')) or 0),
+        confidence=int(_finite_number(scores.get('confidence')) or 0),
+        answer_words=len(answer_text.split()),
+        # speech_metrics comes from the client: only finite numbers are stored
+        words_per_minute=_finite_number(speech_metrics.get('words_per_minute')),
+        filler_rate=_finite_number(speech_metrics.get('filler_rate')),
+        feedback=feedback,
+    )
+
+def remember_job_profile(profile):
+    """Point the session at a job profile; it stays valid until the job description changes."""
+    session['job_profile_key'] = profile.key
+    session['parsed_info'] = profile.parsed_info
+
+def cached_job_profile(job_desc):
+    """Return the session's job profile if it has already been parsed for this job description, else None.
+
+    A profile evicted from the store (or parsed by another worker) is rebuilt from the session's parsed_info
+    rather than parsed again.
+    """
+    if not job_desc:
+        return None
+    key = session.get('job_profile_key')
+    profile = interview_manager.job_profiles.get(key)
+    if profile is None and session.get('parsed_info'):
+        company_info = session.get('company_info', '')
+        if key == JobProfileStore.key_for(job_desc, company_info):
+            profile = interview_manager.job_profiles.restore(job_desc, company_info, session['parsed_info'])
+    if profile is None or profile.job_desc_hash != text_hash(job_desc):
+        return None
+    return profile
+
+def current_job_profile(job_desc):
+    """Return the session's job profile for this job description, parsing it once if needed."""
+    if not job_desc:
+        return None
+    profile = cached_job_profile(job_desc)
+    if profile is None:
+        profile = interview_manager.job_profiles.get_or_create(job_desc, session.get('company_info', ''))
+        remember_job_profile(profile)
+    return profile
+
+ASSET_DIR = os.path.join(app.static_folder, "dist")
+ASSET_MAX_AGE = 365 * 24 * 3600
+# Used when static/dist has not been built (python -m assets.build), e.g. in a fresh checkout
+ASSET_CDN_FALLBACK = {
+    "alpine.js": "https://cdn.jsdelivr.net/npm/alpinejs@3.14.1/dist/cdn.min.js",
+    "fontawesome.css": "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css",
+    "inter.css": "https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap",
+}
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+mimetypes.add_type("font/woff2", ".woff2")
+
+class AssetManifest:
+    """Logical asset names mapped to fingerprinted files, reloaded when the build rewrites manifest.json."""
+    def __init__(self, directory):
+        self.path = os.path.join(directory, "manifest.json")
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._names = {}
+        self._files = frozenset()
+
+    def _load(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._mtime:
+            return
+        with self._lock:
+            names = {}
+            if mtime is not None:
+                try:
+                    with open(self.path) as f:
+                        names = json.load(f)
+                except (OSError, ValueError) as e:
+                    log_event("asset_manifest_invalid", logging.ERROR, path=self.path, error=str(e))
+            self._names, self._files, self._mtime = names, frozenset(names.values()), mtime
+
+    def get(self, name):
+        self._load()
+        return self._names.get(name)
+
+    def __contains__(self, filename):
+        self._load()
+        return filename in self._files
+
+asset_manifest = AssetManifest(ASSET_DIR)
+
+@app.template_global()
+def assets_built():
+    return asset_manifest.get("app.css") is not None
+
+@app.template_global()
+def asset_url(name):
+    """URL of a built asset, or its CDN equivalent when static/dist has not been built."""
+    filename = asset_manifest.get(name)
+    if filename is None:
+        return ASSET_CDN_FALLBACK.get(name, "")
+    return url_for('asset', filename=filename)
+
+@app.route('/assets/<filename>')
+def asset(filename):
+    """Serve a fingerprinted asset; its name changes with its content, so it can be cached forever."""
+    if filename not in asset_manifest:
+        return jsonify({'error': 'Not found'}), 404
+    path = os.path.join(ASSET_DIR, filename)
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    encoding = None
+    variants = [(name, suffix) for name, suffix in PRECOMPRESSED_ENCODINGS if os.path.exists(path + suffix)]
+    for name, suffix in variants:
+        if request.accept_encodings[name]:
+            encoding, path = name, path + suffix
+            break
+    response = send_file(path, mimetype=mimetype, conditional=True, max_age=ASSET_MAX_AGE)
+    response.headers['Cache-Control'] = f'public, max-age={ASSET_MAX_AGE}, immutable'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if variants:
+        response.vary.add('Accept-Encoding')
+    return response
+
+COMPRESS_RESPONSES = os.getenv("COMPRESS_RESPONSES", "1") == "1"
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+COMPRESS_MAX_SIZE = int(os.getenv("COMPRESS_MAX_SIZE", str(16 * 1024 * 1024)))
+COMPRESS_LEVEL = int(os.getenv("COMPRESS_LEVEL", "6"))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", "5"))
+# Text formats only: audio, images and archives are already compressed
+COMPRESSIBLE_MIMETYPES = frozenset({"text/html", "text/plain", "text/css", "text/csv", "application/json",
+                                    "application/javascript", "text/javascript", "image/svg+xml"})
+
+metrics.describe("husky_compression_bytes_total", "counter", "Response bytes before (identity) and after compression, by encoding.")
+
+def _compress(data, encoding):
+    if encoding == "br":
+        return brotli.compress(data, quality=COMPRESS_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+
+@app.after_request
+def compress_response(response):
+    """Compress text responses for clients that accept it.
+
+    Skips small bodies, media, streams, partial content and anything already encoded (such as the
+    precompressed /assets/ files). A strong ETag becomes weak, so a client revalidating the compressed
+    copy still gets a 304 from the identity representation's validator.
+    """
+    if (not COMPRESS_RESPONSES or request.method == "HEAD" or response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES or "Content-Encoding" in response.headers
+            or response.cache_control.no_transform):
+        return response
+    length = response.content_length
+    if response.direct_passthrough:
+        # Files from send_file, e.g. /download-html, are read into memory when they are of reasonable size
+        if length is None or length > COMPRESS_MAX_SIZE:
+            return response
+    elif response.is_streamed:
+        return response
+    if length is not None and length < COMPRESS_MIN_SIZE:
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = request.accept_encodings.best_match(["br", "gzip"] if brotli is not None else ["gzip"])
+    if encoding is None:
+        return response
+    response.direct_passthrough = False
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_SIZE:
+        return response
+    with stage_timer("compress"):
+        compressed = _compress(data, encoding)
+    metrics.inc("husky_compression_bytes_total", len(data), encoding="identity")
+    metrics.inc("husky_compression_bytes_total", len(compressed), encoding=encoding)
+    if len(compressed) >= len(data):
+        return response
+    response.set_data(compressed)
+    response.headers["Content-Encoding"] = encoding
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def conditional_response(response, last_modified=None):
+    """Add an ETag (and Last-Modified) to a full response and answer 304 if the client's copy is current."""
+    response.add_etag()
+    if last_modified is not None:
+        response.last_modified = datetime.utcfromtimestamp(int(last_modified))
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
+
 @app.route('/')
 def index():
-    return render_template('index.html')
+    if history_store is not None:
+        history_user_id()
+    with stage_timer("html_render"):
+        response = app.make_response(render_template('index.html'))
+    # The page only changes with the template and the asset build
+    template_path = os.path.join(app.root_path, app.template_folder, 'index.html')
+    mtimes = [os.path.getmtime(path) for path in (template_path, asset_manifest.path) if os.path.exists(path)]
+    return conditional_response(response, max(mtimes, default=None))
+
+@app.route('/history', methods=['GET'])
+def history_endpoint():
+    if history_store is None:
+        return jsonify({'error': 'Practice history is disabled'}), 404
+    limit = request.args.get('limit', 50, type=int)
+    attempts = history_store.attempts(
+        history_user_id(),
+        question=request.args.get('question'),
+        category=request.args.get('category'),
+        before=request.args.get('before', type=float),
+        limit=max(1, min(limit, 500)),
+    )
+    return jsonify({'attempts': attempts})
+
+@app.route('/progress', methods=['GET'])
+def progress_endpoint():
+    if history_store is None:
+        return jsonify({'error': 'Practice history is disabled'}), 404
+    days = request.args.get('days', type=float)
+    columns = history_store.columns(history_user_id(), since=time.time() - days * 86400 if days else None)
+    return jsonify(progress_report(columns))
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    PROMPTS.record_sizes()
+    return Response(metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.route('/usage', methods=['GET'])
+def usage_endpoint():
+    return jsonify({
+        'session': token_ledger.session_totals(get_session_id()),
+        'endpoints': token_ledger.endpoint_totals(),
+        'pricing': {'input_per_million': LLM_INPUT_PRICE_PER_M, 'output_per_million': LLM_OUTPUT_PRICE_PER_M}
+    })
+
+def store_job_inputs():
+    """Store the job description in the session for later use; the profile key is known before parsing."""
+    data = request.get_json()
+    session['job_desc'] = data.get('job_desc', '')
+    session['company_info'] = data.get('company_info', '')
+    key = JobProfileStore.key_for(session['job_desc'], session['company_info'])
+    if session.get('job_profile_key') != key:
+        # parsed_info belongs to the previous job description until the new one is parsed
+        session.pop('parsed_info', None)
+    session['job_profile_key'] = key
 
 @app.route('/analyze-info', methods=['POST'])
+@admission_controlled("analyze_info", weight=2.0)
+@async_capable("analyze_info", priority=JOB_PRIORITY_HIGH, before_enqueue=store_job_inputs)
 def analyze_info_endpoint():
     data = request.get_json()
     job_desc = data.get('job_desc', '')
     company_info = data.get('company_info', '')
     
-    parsed_info = interview_manager.analyzer.parse_job_info(job_desc, company_info)
-    
-    # Store in session for later use
-    session['job_desc'] = job_desc
-    session['company_info'] = company_info
-    session['parsed_info'] = parsed_info
+    store_job_inputs()
+    profile = interview_manager.job_profiles.get_or_create(job_desc, company_info, refresh_incomplete=True)
+    remember_job_profile(profile)
+    interview_manager.answer_skeletons.schedule(profile, data.get('resume', session.get('resume', '')),
+                                                standard_questions())
     
-    return jsonify(parsed_info)
+    return jsonify(profile.parsed_info)
 
 @app.route('/generate-questions', methods=['POST'])
 def generate_questions_endpoint():
@@ -752,28 +3872,111 @@ def generate_questions_endpoint():
     categorized_questions = generate_sample_questions(job_desc, company_info, resume)
     question_hints = get_question_hints()
     
+    # Prepared answers need a parsed job profile; never parse one here just for them
+    profile = cached_job_profile(job_desc)
+    if profile is not None:
+        interview_manager.answer_skeletons.schedule(profile, resume, standard_questions())
+        question_hints.update(interview_manager.answer_skeletons.hints(profile, resume, question_hints))
+    
     return jsonify({
         'questions': categorized_questions,
         'hints': question_hints
     })
 
+class AudioUploadError(Exception):
+    """A raw audio upload that cannot be accepted; status is the HTTP status to answer with."""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+def read_audio_body():
+    """Read a binary audio upload, inflating it if the browser gzip-compressed it.
+
+    The size limit is enforced before anything is buffered: from Content-Length when it is sent, and by
+    reading at most one byte past the limit otherwise.
+    """
+    if request.content_length is not None and request.content_length > MAX_AUDIO_UPLOAD_BYTES:
+        raise AudioUploadError(413, 'Audio upload too large')
+    body = request.stream.read(MAX_AUDIO_UPLOAD_BYTES + 1)
+    if len(body) > MAX_AUDIO_UPLOAD_BYTES:
+        raise AudioUploadError(413, 'Audio upload too large')
+    if request.headers.get('Content-Encoding', '').lower() != 'gzip':
+        return body
+    inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    try:
+        audio = inflater.decompress(body, MAX_AUDIO_UPLOAD_BYTES)
+    except zlib.error:
+        raise AudioUploadError(400, 'Audio upload is not valid gzip')
+    if inflater.unconsumed_tail:
+        raise AudioUploadError(413, 'Audio upload too large')
+    if not inflater.eof:
+        raise AudioUploadError(400, 'Audio upload is not valid gzip')
+    return audio
+
 @app.route('/speech-to-text', methods=['POST'])
 def speech_to_text_endpoint():
-    data = request.get_json()
-    audio_data = data.get('audio', '')
+    content_type = None
+    if request.mimetype.startswith('audio/'):
+        # Compact upload: the raw audio is the body and the other fields travel in the query string
+        data = request.args.to_dict()
+        try:
+            audio_data = read_audio_body()
+        except AudioUploadError as e:
+            return jsonify({'error': str(e)}), e.status
+        content_type = request.content_type
+    else:
+        data = request.get_json()
+        audio_data = data.get('audio', '')
     
     if not audio_data:
         return jsonify({'error': 'No audio data provided'}), 400
     
-    text = speech_to_text(audio_data)
-    return jsonify({'text': text})
+    text, speech_metrics = speech_to_text(audio_data, content_type)
+    
+    question = data.get('question', '')
+    if (PIPELINE_PREFETCH and text and not text.startswith("Speech recognition failed")
+            and admit_speculative("pipeline_start")):
+        start_session_pipeline(question, text, dict(data, speech_metrics=speech_metrics))
+    return jsonify({'text': text, 'speech_metrics': speech_metrics})
+
+def start_session_pipeline(question, answer_text, data):
+    """Kick off background evaluation, model answer and follow-ups for this session's latest answer."""
+    interview_manager.start_pipeline(
+        get_session_id(),
+        question,
+        answer_text,
+        data.get('job_desc', session.get('job_desc', '')),
+        data.get('company_info', session.get('company_info', '')),
+        data.get('resume', session.get('resume', '')),
+        data.get('company_values', ''),
+        sanitize_speech_metrics(data.get('speech_metrics')),
+    )
+
+@app.route('/pipeline/start', methods=['POST'])
+@admission_controlled("pipeline_start")
+def pipeline_start_endpoint():
+    data = request.get_json()
+    answer_text = data.get('answer_text', '')
+    if not answer_text.strip():
+        interview_manager.cancel_pipeline(get_session_id())
+        return jsonify({'stages': {}})
+    start_session_pipeline(data.get('question', ''), answer_text, data)
+    return jsonify({'stages': interview_manager.pipeline_status(get_session_id())}), 202
+
+@app.route('/pipeline/status', methods=['GET'])
+def pipeline_status_endpoint():
+    return jsonify({'stages': interview_manager.pipeline_status(get_session_id())})
 
 @app.route('/analyze-answer', methods=['POST'])
+@admission_controlled("analyze_answer", weight=2.0)
+@async_capable("analyze_answer")
 def analyze_answer_endpoint():
     data = request.get_json()
     voice_answer = data.get('answer_text', '')
+    question = data.get('question', '')
     job_desc = data.get('job_desc', session.get('job_desc', ''))
     company_values = data.get('company_values', '')
+    speech_metrics = sanitize_speech_metrics(data.get('speech_metrics'))
     
     # Input validation
     if not voice_answer:
@@ -785,7 +3988,19 @@ def analyze_answer_endpoint():
         })
     
     try:
-        scores, feedback = interview_manager.evaluator.evaluate_answer(voice_answer, job_desc, company_values)
+        prefetched = interview_manager.pipeline_result(
+            get_session_id(), "evaluation", question, voice_answer, job_desc, session.get('company_info', ''), '',
+            company_values, speech_metrics
+        )
+        if prefetched is not None:
+            scores, feedback = prefetched
+        else:
+            scores, feedback = interview_manager.evaluate(
+                voice_answer, job_desc, company_values, speech_metrics, current_job_profile(job_desc), get_session_id()
+            )
+        
+        if feedback and len(feedback.strip()) >= 10 and not is_llm_fallback(feedback) and all(scores.values()):
+            record_attempt(question, voice_answer, scores, feedback, speech_metrics)
         
         # Ensure feedback is not empty
         if not feedback or len(feedback.strip()) < 10:
@@ -815,7 +4030,7 @@ FEEDBACK:
             'formatted_output': combined_output
         })
     except Exception as e:
-        print(f"Error in analyze_answer_endpoint: {str(e)}")
+        log_event("analyze_answer_error", logging.ERROR, error=str(e))
         default_feedback = "I'm having trouble analyzing your answer right now. This might be due to a connection issue or server load. Please try again in a moment."
         scores = {'clarity': 5, 'relevance': 5, 'confidence': 5}
         stars = lambda score: "⭐" * score + "☆" * (10 - score)
@@ -833,7 +4048,54 @@ FEEDBACK:
             'formatted_output': combined_output
         })
 
+@app.route('/analyze-answers-batch', methods=['POST'])
+@admission_controlled("analyze_answers_batch",
+                      cost=lambda data: len(data['items']) / EVAL_PACK_MAX_ANSWERS if isinstance(data, dict) and isinstance(data.get('items'), list) else 1)
+def analyze_answers_batch_endpoint():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'error': 'Expected a JSON object with an items list'}), 400
+    items = data.get('items', [])
+    job_desc = data.get('job_desc', session.get('job_desc', ''))
+    company_values = data.get('company_values', '')
+    
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Provide a non-empty list of items with question and answer_text'}), 400
+    if len(items) > EVAL_BATCH_MAX_ITEMS:
+        return jsonify({'error': f'At most {EVAL_BATCH_MAX_ITEMS} items per batch'}), 400
+    for index, item in enumerate(items):
+        if not isinstance(item, dict):
+            return jsonify({'error': f'Item {index} must be an object with question and answer_text'}), 400
+        for field in ('question', 'answer_text'):
+            if not isinstance(item.get(field, ''), str):
+                return jsonify({'error': f'Item {index}: {field} must be a string'}), 400
+    
+    pairs = [(item.get('question', ''), item.get('answer_text', '')) for item in items]
+    answered = [pair for pair in pairs if pair[1].strip()]
+    job_context, _ = interview_manager.prepare_context(
+        job_desc, '', " ".join(question for question, _ in answered), current_job_profile(job_desc), get_session_id()
+    )
+    evaluations = iter(interview_manager.evaluator.evaluate_batch(answered, job_context, company_values))
+    
+    results = []
+    for question, answer in pairs:
+        if not answer.strip():
+            results.append({
+                'question': question,
+                'scores': {'clarity': 0, 'relevance': 0, 'confidence': 0},
+                'feedback': "No answer provided to analyze. Please record or type your answer."
+            })
+        else:
+            evaluation = next(evaluations)
+            if not is_llm_fallback(evaluation['feedback']) and all(evaluation['scores'].values()):
+                record_attempt(question, answer, evaluation['scores'], evaluation['feedback'])
+            results.append({'question': question, **evaluation})
+    
+    return jsonify({'results': results})
+
 @app.route('/generate-model-answer', methods=['POST'])
+@admission_controlled("generate_model_answer")
+@async_capable("generate_model_answer")
 def generate_model_answer_endpoint():
     data = request.get_json()
     question = data.get('question', '')
@@ -849,7 +4111,13 @@ def generate_model_answer_endpoint():
         })
     
     try:
-        model_answer = interview_manager.drafter.generate_answer(question, company_info, job_desc, resume, voice_answer)
+        model_answer = interview_manager.pipeline_result(
+            get_session_id(), "model_answer", question, voice_answer, job_desc, company_info, resume
+        )
+        if model_answer is None:
+            model_answer = interview_manager.draft_model_answer(
+                question, voice_answer, job_desc, company_info, resume, current_job_profile(job_desc), get_session_id()
+            )
         
         # Ensure model answer is not empty
         if not model_answer or len(model_answer.strip()) < 10:
@@ -870,7 +4138,7 @@ Here's a general structure you can follow:
         
         return jsonify({'model_answer': model_answer})
     except Exception as e:
-        print(f"Error in generate_model_answer_endpoint: {str(e)}")
+        log_event("generate_model_answer_error", logging.ERROR, error=str(e))
         default_answer = f"""I'm having trouble generating a sample answer for the question: "{question}"
 
 Here are some general tips for this type of question:
@@ -893,6 +4161,8 @@ def text_to_speech_endpoint():
     return jsonify({'audio': audio_base64})
 
 @app.route('/generate-follow-up-questions', methods=['POST'])
+@admission_controlled("generate_follow_up_questions")
+@async_capable("generate_follow_up_questions", priority=JOB_PRIORITY_LOW)
 def generate_follow_up_questions_endpoint():
     data = request.get_json()
     question = data.get('question', '')
@@ -906,13 +4176,22 @@ def generate_follow_up_questions_endpoint():
         })
     
     try:
-        follow_up_questions = interview_manager.follow_up_questioner.generate_follow_up_questions(
-            job_desc, resume, question, answer_text
+        follow_up_questions = interview_manager.pipeline_result(
+            get_session_id(), "follow_ups", question, answer_text, job_desc, session.get('company_info', ''), resume
         )
+        if follow_up_questions is not None:
+            interview_manager.follow_up_questioner.remember(get_session_id(), question, follow_up_questions)
+        else:
+            job_context, resume_context = interview_manager.prepare_context(
+                job_desc, resume, f"{question} {answer_text}", current_job_profile(job_desc), get_session_id()
+            )
+            follow_up_questions = interview_manager.follow_up_questioner.generate_follow_up_questions(
+                job_context, resume_context, question, answer_text, get_session_id()
+            )
         
         return jsonify({'follow_up_questions': follow_up_questions})
     except Exception as e:
-        print(f"Error generating follow-up questions: {str(e)}")
+        log_event("follow_up_questions_error", logging.ERROR, error=str(e))
         default_questions = [
             "Could you elaborate more on your experience in this area?",
             "How would you apply these skills in our company context?",
@@ -920,6 +4199,30 @@ def generate_follow_up_questions_endpoint():
         ]
         return jsonify({'follow_up_questions': default_questions})
 
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status_endpoint(job_id):
+    job = job_queue.get(job_id, get_session_id())
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    # Long polling: ?wait=N blocks up to N seconds for the job to finish
+    wait = min(request.args.get('wait', 0, type=float), 30)
+    if wait > 0:
+        job.done.wait(wait)
+    return jsonify(job.to_dict())
+
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def job_events_endpoint(job_id):
+    job = job_queue.get(job_id, get_session_id())
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+
+    def stream():
+        while not job.done.wait(15):
+            yield ": keepalive\n\n"
+        yield f"event: {job.status}\ndata: {json.dumps(job.to_dict())}\n\n"
+
+    return Response(stream(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
 @app.route('/save-to-html', methods=['POST'])
 def save_to_html_endpoint():
     data = request.get_json()
@@ -943,10 +4246,11 @@ def save_to_html_endpoint():
     position_title = data.get('position_title', parsed_info.get('position_title', ''))
     
     try:
-        html_file_path = save_to_html(
-            job_desc, company_info, resume, company_name, position_title, company_values, tech_skills, 
-            soft_skills, job_duties, selected_question, answer_text, feedback, model_answer, follow_up_questions
-        )
+        with stage_timer("html_render"):
+            html_file_path = save_to_html(
+                job_desc, company_info, resume, company_name, position_title, company_values, tech_skills, 
+                soft_skills, job_duties, selected_question, answer_text, feedback, model_answer, follow_up_questions
+            )
         
         # Generate a unique ID for this file for the frontend to request it
         file_id = str(uuid.uuid4())
@@ -954,7 +4258,7 @@ def save_to_html_endpoint():
         
         return jsonify({'file_id': file_id})
     except Exception as e:
-        print(f"Error saving to HTML: {str(e)}")
+        log_event("save_to_html_error", logging.ERROR, error=str(e))
         return jsonify({'error': 'An error occurred while generating the HTML file'}), 500
 
 @app.route('/download-html/<file_id>', methods=['GET'])
@@ -967,9 +4271,70 @@ def download_html(file_id):
     current_time = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
     download_name = f"interview_summary_{current_time}.html"
     
-    return send_file(file_path, as_attachment=True, download_name=download_name)
+    # Validators come from the file's mtime and size; repeat downloads are answered with 304
+    response = send_file(file_path, as_attachment=True, download_name=download_name, conditional=True,
+                         etag=True, last_modified=os.path.getmtime(file_path))
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+def _time_first_use():
+    """Load every lazy dependency and model in turn; returns (name, seconds) pairs.
+
+    Costs are incremental: a dependency shared with an earlier entry (numpy, say) is charged to that entry.
+    """
+    timings = []
+    for module in LazyModule.registry:
+        start = time.perf_counter()
+        module.load()
+        timings.append((f"import {module.__name__}", time.perf_counter() - start))
+    for name, load in (("MiniLM encoder", lambda: interview_manager.analyzer.encoder),
+                       (f"tokenizer {TOKENIZER_NAME}", get_tokenizer)):
+        start = time.perf_counter()
+        load()
+        timings.append((name, time.perf_counter() - start))
+    return timings
+
+def profile_startup(top=15):
+    """Print what a cold `import flask_app` costs, slowest imports first, then the first-use cost of each lazy dependency."""
+    import subprocess
+    here = os.path.dirname(os.path.abspath(__file__))
+    cold = subprocess.run([sys.executable, "-X", "importtime", "-c", "import flask_app"],
+                          cwd=here, capture_output=True, text=True)
+    # -X importtime lines are "import time: self [us] | cumulative | <indent>package"; children precede their parent
+    children, app_imports, app_total = [], [], None
+    for line in cold.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == "flask_app":
+                app_total, app_imports = int(cumulative), children
+            children = []
+        elif depth == 1:
+            children.append((int(cumulative), name.strip()))
+    if app_total is None:
+        print(cold.stderr.strip() or "import flask_app failed")
+        return 1
+    print(f"Cold import of flask_app: {app_total / 1000:.1f} ms")
+    for cumulative, name in sorted(app_imports, reverse=True)[:top]:
+        print(f"  {cumulative / 1000:>9.1f} ms  {name}")
+
+    code = "import json, flask_app; print(json.dumps(flask_app._time_first_use()))"
+    warm = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True)
+    if warm.returncode != 0:
+        print(warm.stderr.strip())
+        return 1
+    print("First use of lazily loaded dependencies (paid by the first request that needs them):")
+    for name, seconds in json.loads(warm.stdout.strip().splitlines()[-1]):
+        print(f"  {seconds * 1000:>9.1f} ms  {name}")
+    return 0
 
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        sys.exit(profile_startup())
+    
     # Create templates folder if it doesn't exist
     if not os.path.exists('templates'):
         os.makedirs('templates')
@@ -0,0 +1,124 @@
+"""Tests for the admission controller's token buckets and weighted fair queue."""
+import threading
+import time
+
+import pytest
+
+from flask_app import AdmissionController, AdmissionRejected
+
+ADDRESS = ("ip:10.0.0.1", 4.0)
+
+
+def tokens(controller, key, kind="answer"):
+    return controller._buckets.get((key, kind)).tokens
+
+
+def test_bucket_rejects_once_the_burst_is_spent():
+    controller = AdmissionController(limits={"answer": "1/2"})
+    controller.check_rate([("sid:a", 1.0)], "answer")
+    controller.check_rate([("sid:a", 1.0)], "answer")
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.check_rate([("sid:a", 1.0)], "answer")
+    assert rejected.value.status == 429
+    assert rejected.value.reason == "rate_limited"
+    assert rejected.value.retry_after > 0
+
+
+def test_new_session_shares_the_address_allowance():
+    controller = AdmissionController(limits={"answer": "1/1"})
+    for session in ("sid:a", "sid:b", "sid:c", "sid:d"):
+        controller.check_rate([ADDRESS, (session, 1.0)], "answer")
+
+    with pytest.raises(AdmissionRejected):
+        controller.check_rate([ADDRESS, ("sid:e", 1.0)], "answer")
+
+
+def test_rejected_request_takes_no_tokens_from_any_bucket():
+    controller = AdmissionController(limits={"answer": "1/1"})
+    controller.check_rate([ADDRESS, ("sid:a", 1.0)], "answer")
+
+    with pytest.raises(AdmissionRejected):
+        controller.check_rate([ADDRESS, ("sid:a", 1.0)], "answer")
+    assert tokens(controller, "ip:10.0.0.1") == pytest.approx(3.0, abs=0.01)
+
+
+def test_refund_returns_the_charged_tokens():
+    controller = AdmissionController(limits={"answer": "1/1"})
+    charged = controller.check_rate([ADDRESS, ("sid:a", 1.0)], "answer")
+    controller.refund(charged)
+
+    assert tokens(controller, "ip:10.0.0.1") == pytest.approx(4.0, abs=0.01)
+    assert tokens(controller, "sid:a") == pytest.approx(1.0, abs=0.01)
+
+
+def test_endpoint_without_a_limit_is_not_rate_limited():
+    controller = AdmissionController(limits={})
+    for _ in range(100):
+        assert controller.check_rate([ADDRESS], "answer") == []
+
+
+def wait_until(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_queue_grants_slots_in_fair_order():
+    controller = AdmissionController(max_active=1, max_waiting=10, max_waiting_per_client=5, queue_timeout=5)
+    controller.acquire("busy")
+    granted = []
+
+    def wait_for_slot(client, name):
+        controller.acquire(client)
+        granted.append(name)
+
+    # Client a queues two requests before b queues one; b is still served before a's second
+    threads = []
+    for client, name in (("a", "a1"), ("a", "a2"), ("b", "b1")):
+        waiting = sum(controller._waiting.values())
+        thread = threading.Thread(target=wait_for_slot, args=(client, name))
+        thread.start()
+        threads.append(thread)
+        wait_until(lambda: sum(controller._waiting.values()) == waiting + 1)
+
+    for expected in (1, 2, 3):
+        controller.release()
+        wait_until(lambda: len(granted) == expected)
+    for thread in threads:
+        thread.join()
+    assert granted == ["a1", "b1", "a2"]
+
+
+def test_client_with_a_waiting_request_is_told_it_is_busy():
+    controller = AdmissionController(max_active=1, max_waiting=10, max_waiting_per_client=1, queue_timeout=5)
+    controller.acquire("busy")
+    waiter = threading.Thread(target=controller.acquire, args=("a",))
+    waiter.start()
+    wait_until(lambda: controller._waiting["a"] == 1)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("a")
+    assert (rejected.value.status, rejected.value.reason) == (429, "client_busy")
+
+    controller.release()
+    waiter.join()
+
+
+def test_wait_longer_than_the_timeout_is_rejected():
+    controller = AdmissionController(max_active=1, queue_timeout=0.05)
+    controller.acquire("busy")
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        controller.acquire("a")
+    assert (rejected.value.status, rejected.value.reason) == (503, "timed_out")
+    assert not controller._waiting
+
+
+def test_slot_is_freed_when_nobody_waits():
+    controller = AdmissionController(max_active=1)
+    controller.acquire("a")
+    controller.release()
+
+    assert controller.acquire("b") == 0.0
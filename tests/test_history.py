@@ -0,0 +1,45 @@
+"""Regression tests for the practice history store."""
+import time
+
+import pytest
+
+import flask_app
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    history = flask_app.HistoryStore(str(tmp_path / "history.db"), flush_seconds=0.05)
+    monkeypatch.setattr(flask_app, "history_store", history)
+    return history
+
+
+def attempt(user_id, **overrides):
+    row = dict(user_id=user_id, created_at=time.time(), question="Tell me about yourself.", category="General",
+               clarity=7, relevance=6, confidence=8, answer_words=40, feedback="Good structure.")
+    row.update(overrides)
+    return row
+
+
+def test_non_numeric_speech_metrics_are_not_stored(store):
+    with flask_app.app.test_request_context("/analyze-answer", headers={"Cookie": f"husky_user={'a' * 32}"}):
+        flask_app.record_attempt("Tell me about yourself.", "I build services.",
+                                 {"clarity": 7, "relevance": 6, "confidence": 8}, "Good structure.",
+                                 {"words_per_minute": "fast", "filler_rate": [1]})
+    assert store.flush()
+
+    (row,) = store.attempts("a" * 32)
+    assert row["words_per_minute"] is None and row["filler_rate"] is None
+    report = flask_app.progress_report(store.columns("a" * 32))
+    assert report["attempts"] == 1
+    assert report["delivery"] == {"words_per_minute": None, "filler_rate": None}
+
+
+def test_bad_row_does_not_drop_the_rest_of_its_batch(store):
+    store.record(**attempt("good-user"))
+    store.record(**attempt("bad-user", filler_rate=[1]))
+    store.record(**attempt("other-user", words_per_minute=140.0))
+    assert store.flush()
+
+    assert len(store.attempts("good-user")) == 1
+    assert len(store.attempts("other-user")) == 1
+    assert store.attempts("bad-user") == []
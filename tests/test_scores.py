@@ -0,0 +1,84 @@
+"""Tests for reading scores out of evaluator output and re-asking for missing ones."""
+import pytest
+
+import flask_app
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Replace prompt_llm with scripted replies; the prompts it was sent are kept in llm.prompts."""
+    class ScriptedLLM:
+        def __init__(self):
+            self.replies = []
+            self.prompts = []
+
+        def __call__(self, prompt, show_cost=True, task=None, max_tokens=512):
+            self.prompts.append(prompt)
+            return self.replies.pop(0)
+
+    scripted = ScriptedLLM()
+    monkeypatch.setattr(flask_app, "prompt_llm", scripted)
+    return scripted
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Clarity: 8/10", 8),
+    ("**Clarity:** 8 / 10", 8),
+    ("Clarity - 8 out of 10", 8),
+    ("Clarity score (8/10)", 8),
+    ("clarity: 7.6/10", 8),
+    ("Clarity: 12/10", 10),
+    ('{"clarity": 8}', 8),
+])
+def test_score_formats(text, expected):
+    assert flask_app.extract_scores(text) == {"clarity": expected}
+
+
+def test_first_score_per_criterion_wins():
+    text = "Clarity: 6/10\nRelevance: 7/10\nConfidence: 8/10\n\nWith more practice clarity could reach 9/10."
+    assert flask_app.extract_scores(text) == {"clarity": 6, "relevance": 7, "confidence": 8}
+
+
+def test_scores_without_a_scale_are_not_read():
+    assert flask_app.extract_scores("Clarity was good, I'd say 8. Relevance: strong.") == {}
+
+
+def test_complete_scores_need_no_reask(llm):
+    llm.replies = ["Clarity: 7/10\nRelevance: 8/10\nConfidence: 6/10\n\nA well structured answer."]
+
+    scores, _ = flask_app.Evaluator().evaluate_answer("I led the migration.", "Backend engineer", "Ownership")
+
+    assert scores == {"clarity": 7, "relevance": 8, "confidence": 6}
+    assert len(llm.prompts) == 1
+
+
+def test_missing_scores_are_reasked_for_only(llm):
+    feedback = "Clarity: 7/10\n\nA well structured answer, but the impact is unclear."
+    llm.replies = [feedback, '{"relevance": 6, "confidence": 5}']
+
+    scores, returned_feedback = flask_app.Evaluator().evaluate_answer("I led the migration.", "Backend engineer",
+                                                                      "Ownership")
+
+    assert scores == {"clarity": 7, "relevance": 6, "confidence": 5}
+    assert returned_feedback == feedback
+    assert len(llm.prompts) == 2
+    assert "relevance, confidence" in llm.prompts[1]
+    assert feedback in llm.prompts[1]
+
+
+def test_failed_reask_leaves_missing_scores_at_zero(llm):
+    llm.replies = ["Clarity: 7/10\n\nA well structured answer.", "I cannot tell."]
+
+    scores, _ = flask_app.Evaluator().evaluate_answer("I led the migration.", "Backend engineer", "Ownership")
+
+    assert scores == {"clarity": 7, "relevance": 0, "confidence": 0}
+
+
+def test_fallback_reply_is_not_reasked(llm):
+    llm.replies = [flask_app.LLM_ERROR_REPLY]
+
+    scores, feedback = flask_app.Evaluator().evaluate_answer("I led the migration.", "Backend engineer", "Ownership")
+
+    assert scores == {"clarity": 0, "relevance": 0, "confidence": 0}
+    assert feedback == flask_app.LLM_ERROR_REPLY
+    assert len(llm.prompts) == 1